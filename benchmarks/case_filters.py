@@ -0,0 +1,91 @@
+"""Benchmark of the CaseSizeFilter and CaseBetweenTimeFilter.
+
+The pizza event log of the tests is replicated to simulate a large event log.
+The filters are compared with the previous implementation, a groupby filter with a Python lambda for each case.
+
+Example
+-------
+>>> python benchmarks/case_filters.py --scale 100
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from peppermining.peppermining import PepperMining  # noqa: E402
+from peppermining.filters.case_size_filter import CaseSizeFilter  # noqa: E402
+from peppermining.filters.case_between_time_filter import CaseBetweenTimeFilter  # noqa: E402
+from peppermining.utils.enum import EventColumn  # noqa: E402
+
+PIZZA_EVENT = os.path.join(os.path.dirname(__file__), '..', 'tests', 'data', 'pizza_event.csv')
+
+
+def scaled_event_log(scale: int) -> pd.DataFrame:
+    """Return the pizza event log replicated scale times, each copy with new cases.
+    """
+    df = pd.read_csv(PIZZA_EVENT, sep=';')
+    df[EventColumn.EVENT_TIME.value] = pd.to_datetime(df[EventColumn.EVENT_TIME.value], format='%d/%m/%Y %H:%M')
+    offset = df[EventColumn.CASE_ID.value].max() + 1
+    copies = []
+    for i in range(scale):
+        copy = df.copy()
+        copy[EventColumn.CASE_ID.value] = copy[EventColumn.CASE_ID.value] + i * offset
+        copies.append(copy)
+    return pd.concat(copies, ignore_index=True)
+
+
+def groupby_size_filter(event_log: pd.DataFrame, min_size: int, max_size: int) -> pd.DataFrame:
+    """Previous implementation of the CaseSizeFilter.
+    """
+    grouped = event_log.groupby(EventColumn.CASE_ID.value)
+    return grouped.filter(lambda x: (x[EventColumn.CASE_ID.value].count() >= min_size) and (x[EventColumn.CASE_ID.value].count() <= max_size))
+
+
+def groupby_between_time_filter(event_log: pd.DataFrame, start_time: np.datetime64, end_time: np.datetime64) -> pd.DataFrame:
+    """Previous implementation of the CaseBetweenTimeFilter.
+    """
+    grouped = event_log.groupby(EventColumn.CASE_ID.value)
+    return grouped.filter(lambda x: (x[EventColumn.EVENT_TIME.value].min() >= start_time) and (x[EventColumn.EVENT_TIME.value].min() <= end_time))
+
+
+def timed(function) -> tuple:
+    """Return the result and the elapsed seconds of a function.
+    """
+    start = time.perf_counter()
+    result = function()
+    return result, time.perf_counter() - start
+
+
+def main(scale: int) -> None:
+    event_log = scaled_event_log(scale)
+    pm = PepperMining()
+    pm.set_event_log(event_log.copy())
+    print(f"Events: {len(event_log)}  Cases: {event_log[EventColumn.CASE_ID.value].nunique()}")
+
+    min_size, max_size = 8, 10
+    start_time, end_time = np.datetime64('2018-06-15T00:00:00'), np.datetime64('2018-06-30T23:59:59')
+    cases = [
+        ('CaseSizeFilter',
+         lambda: groupby_size_filter(event_log, min_size, max_size),
+         lambda: CaseSizeFilter(pm, min_size, max_size).get_event_log()),
+        ('CaseBetweenTimeFilter',
+         lambda: groupby_between_time_filter(event_log, start_time, end_time),
+         lambda: CaseBetweenTimeFilter(pm, start_time, end_time).get_event_log()),
+    ]
+    print(f"{'Filter':<24}{'groupby (s)':>14}{'index (s)':>12}{'speedup':>10}")
+    for name, previous, current in cases:
+        expected, previous_time = timed(previous)
+        result, current_time = timed(current)
+        assert expected.index.equals(result.index), f"{name} returned different events."
+        print(f"{name:<24}{previous_time:>14.3f}{current_time:>12.3f}{previous_time / current_time:>9.1f}x")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Benchmark of the case size and case between time filters.')
+    parser.add_argument('--scale', type=int, default=100, help='Number of copies of the pizza event log.')
+    main(parser.parse_args().scale)
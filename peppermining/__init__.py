@@ -10,6 +10,10 @@ from peppermining.kpi.number_of_events import NumberOfEvents
 from peppermining.kpi.rework import Rework
 from peppermining.kpi.throughput_time import ThroughputTime
 
+from peppermining import discovery
+from peppermining.discovery.dfg import DFG
+from peppermining.discovery.variant_trie import VariantTrie
+
 from peppermining import filters
 from peppermining.filters.case_activity_filter import CaseActivityFilter
 from peppermining.filters.case_between_time_filter import CaseBetweenTimeFilter
@@ -21,6 +25,7 @@ from peppermining.filters.variant_filter import VariantFilter
 
 from peppermining import conformance
 from peppermining.conformance.conformance import Conformance
+from peppermining.conformance.alignment import Alignment
 from peppermining.conformance.process_model import ProcessModel
 from peppermining.conformance.root_cause_analysis import root_cause_analysis
 
@@ -1,6 +1,7 @@
 from peppermining.conformance import violation
-from peppermining.conformance import process_model, conformance, root_cause_analysis
+from peppermining.conformance import process_model, conformance, alignment, root_cause_analysis
 
 from peppermining.conformance.conformance import Conformance
+from peppermining.conformance.alignment import Alignment
 from peppermining.conformance.process_model import ProcessModel
 from peppermining.conformance.root_cause_analysis import root_cause_analysis
@@ -0,0 +1,323 @@
+import numpy as np
+import pandas as pd
+
+from typing import Union, Optional
+
+from peppermining.utils.enum import EventColumn, ModelColumn
+from peppermining.filters.pepper_filter import PepperFilter
+from peppermining.conformance.process_model import ProcessModel
+from peppermining.peppermining import PepperMining
+
+
+class Alignment():
+    """Alignment-based conformance checker.
+
+    Each case is aligned with the process models: the trace of the case is transformed into the sequence of a process model
+    with the minimum cost of insertions and deletions. An insertion is an activity of the model missing in the trace,
+    a deletion is an activity of the trace that is not in the model, the activities in both are synchronous and free.
+    The fitness of a case is 1 - cost / (cost of deleting the whole trace and inserting the whole model),
+    so 1 is a perfect fit and 0 is a trace without any activity of the model.
+    Each case is reported with the model of best fitness, identified by its position in the list of models
+    since the ProcessModel objects may have the same id.
+
+    The alignments are computed on the activity codes of the variants of the variant trie, so each variant is aligned
+    once per model and the result is broadcast to its cases. The results are memoized per trace and model,
+    and with a process pool (PepperMining n_jobs) the large alignments are computed in parallel.
+
+    Attributes
+    ----------
+    _component : pd.DataFrame
+        PepperMining or PepperFilter object.
+    _models : list
+        List of ProcessModel objects.
+    insertion_cost : float
+        Cost of an activity of the model missing in the trace.
+    deletion_cost : float
+        Cost of an activity of the trace that is not in the model.
+    _alignment_list : pd.DataFrame
+        DataFrame with alignment details.
+
+    Methods
+    -------
+    get_fitness
+        Return the alignment cost and the fitness per case.
+    get_deviations
+        Return the deviations per case.
+    get_summary
+        Return the fitness overview per model.
+
+    Example
+    -------
+    >>> pm = PepperMining()
+    >>> pm.read_event_log_csv("/tests/data/eventlog-example.csv", separator=';', format_date='%d/%m/%Y %H:%M')
+    >>> data = {'activity': ['register request', 'check ticket', 'examine casually', 'decide', 'pay compensation'], 'sorting': [1, 2, 3, 4, 5]}
+    >>> df = pd.DataFrame(data, columns=['activity', 'sorting'])
+    >>> md = ProcessModel()
+    >>> md.set_process_model(df)
+    >>> a = Alignment(pm, md)
+    >>> a.get_fitness()
+    >>> a.get_deviations()
+    >>> a.get_summary()
+    """
+    # Type of the deviations
+    INSERTION = 'insertion'
+    DELETION = 'deletion'
+    # Minimum number of cells of the dynamic programming matrices to use the process pool
+    MIN_PARALLEL_CELLS = 100000
+
+    def __init__(self, data: Union[PepperMining, PepperFilter], models: Union[ProcessModel, list],
+                 insertion_cost: Optional[float] = 1.0, deletion_cost: Optional[float] = 1.0) -> None:
+        """Alignment constructor.
+
+        Parameters
+        ----------
+        data : pd.DataFrame
+            PepperMining or PepperFilter object.
+        models : list
+            ProcessModel object or list of ProcessModel objects.
+        insertion_cost : float, Default: 1.0
+            Cost of an activity of the model missing in the trace.
+        deletion_cost : float, Default: 1.0
+            Cost of an activity of the trace that is not in the model.
+
+        Raises
+        ------
+        ValueError
+            (1) The costs must be positive.
+            (2) Not exists process model.
+        """
+        if not (insertion_cost > 0 and deletion_cost > 0):
+            raise TypeError("The insertion and deletion costs must be positive.")
+        self._component = data
+        self._models = models if isinstance(models, list) else [models]
+        self.insertion_cost = float(insertion_cost)
+        self.deletion_cost = float(deletion_cost)
+        self.__memo = {}
+        self.__names = None
+        self.__traces = []
+        self.__best = np.array([], dtype=np.intp)
+        self.__model_keys = []
+        self.__model_positions = []
+        self.__model_ids = []
+        self.__variant_deviations = None
+        self._alignment_list = self.__alignment_discovery()
+
+    def get_fitness(self) -> pd.DataFrame:
+        """Return the alignment cost and the fitness per case.
+
+        Returns
+        -------
+        DataFrame
+            DataFrame with the fitness data.
+            Columns:
+            case_id: Case identification
+            model: Position of the process model of best fitness in the list of models.
+            id: Identification of the process model of best fitness.
+            cost: Cost of the alignment with the process model.
+            fitness: Fitness of the case, between 0 and 1.
+        """
+        return self._alignment_list[[EventColumn.CASE_ID.value, 'model', ModelColumn.ID.value, 'cost', 'fitness']]
+
+    def get_deviations(self) -> pd.DataFrame:
+        """Return the deviations per case.
+
+        Returns
+        -------
+        DataFrame
+            DataFrame with the deviations data.
+            Columns:
+            case_id: Case identification
+            model: Position of the process model of best fitness in the list of models.
+            id: Identification of the process model of best fitness.
+            deviations: List of tuples (position, type, activity). The position is the position in the trace,
+                the type is 'insertion' for an activity of the model missing before the position,
+                or 'deletion' for the activity of the trace at the position that is not in the model.
+        """
+        variant_deviations = self.__get_variant_deviations()
+        deviations = self._alignment_list[[EventColumn.CASE_ID.value, 'model', ModelColumn.ID.value]].copy()
+        deviations['deviations'] = [variant_deviations[variant] for variant in self._alignment_list['variant']]
+        return deviations
+
+    def get_summary(self) -> pd.DataFrame:
+        """Return the fitness overview per model.
+
+        Returns
+        -------
+        DataFrame
+            DataFrame with the summary data.
+            Columns:
+            model: Position of the process model in the list of models, the process models without activities are not in the summary.
+            id: Identification of the process model.
+            cases: Number of cases of best fitness with the process model.
+            fitting_cases: Number of cases with fitness 1.
+            fitness: Average fitness of the cases.
+        """
+        # The models are grouped by position, since the ProcessModel objects may have the same id
+        summary = self._alignment_list.groupby('model').agg(**{'cases': (EventColumn.CASE_ID.value, 'size'),
+                                                               'fitting_cases': ('fitness', lambda fitness: int((fitness == 1).sum())),
+                                                               'fitness': ('fitness', 'mean')})
+        summary = summary.reindex(self.__model_positions).fillna({'cases': 0, 'fitting_cases': 0})
+        summary.insert(0, ModelColumn.ID.value, self.__model_ids)
+        return summary.astype({'cases': np.int64, 'fitting_cases': np.int64}).rename_axis('model').reset_index()
+
+    def __alignment_discovery(self) -> pd.DataFrame:
+        """Align the variants with the process models and broadcast the results to the cases.
+
+        Returns
+        -------
+        DataFrame
+            DataFrame with the alignment of each case with events, in the order of the Cases data.
+        """
+        columns = [EventColumn.CASE_ID.value, ModelColumn.ID.value, 'cost', 'fitness', 'model', 'variant']
+        models = self.__model_codes()
+        trie = self._component.get_variant_trie()
+        if trie is None:
+            return pd.DataFrame(columns=columns)
+        nodes = trie.variant_nodes()
+        self.__traces = [np.asarray(trie.trace(node), dtype=np.int64) for node in nodes.tolist()]
+        costs = self.__align_variants(models)
+        # Model of best fitness of each variant, the first model in a tie
+        trace_lengths = np.array([len(trace) for trace in self.__traces], dtype=np.float64)
+        model_lengths = np.array([len(model) for model in models], dtype=np.float64)
+        worst = trace_lengths[:, None] * self.deletion_cost + model_lengths[None, :] * self.insertion_cost
+        fitness = 1 - costs / np.maximum(worst, np.finfo(np.float64).tiny)
+        self.__best = np.argmax(fitness, axis=1)
+        variants = np.arange(len(nodes))
+        # Variant of each case of the Cases data
+        node_variant = np.full(len(trie), -1, dtype=np.intp)
+        node_variant[nodes] = variants
+        cases = self._component.get_cases()[EventColumn.CASE_ID.value]
+        case_codes = self._component.get_case_index().case_codes_of(cases)
+        case_node = np.where(case_codes >= 0, trie.case_node[case_codes], -1)
+        case_variant = np.where(case_node >= 0, node_variant[case_node], -1)
+        selected = case_variant >= 0
+        case_variant = case_variant[selected]
+        return pd.DataFrame({EventColumn.CASE_ID.value: cases[selected].to_numpy(),
+                             ModelColumn.ID.value: np.asarray(self.__model_ids)[self.__best[case_variant]],
+                             'cost': costs[case_variant, self.__best[case_variant]],
+                             'fitness': fitness[case_variant, self.__best[case_variant]],
+                             'model': np.asarray(self.__model_positions, dtype=np.int64)[self.__best[case_variant]],
+                             'variant': case_variant})
+
+    def __model_codes(self) -> tuple:
+        """Return the activity codes of each process model, and keep the position and the identification of each process model.
+
+        The activities of each model are sorted by the column sorting. The process models without activities are skipped.
+        """
+        self.__model_positions = [position for position, model in enumerate(self._models) if not (model.get_process_model().empty)]
+        frames = [self._models[position].get_process_model().sort_values(ModelColumn.SORTING.value, kind='stable')
+                  for position in self.__model_positions]
+        self.__model_ids = [frame[ModelColumn.ID.value].iloc[0] for frame in frames]
+        if len(frames) == 0:
+            raise TypeError("Not exists process model, it needs a process model with the columns activity and sorting.")
+        activities = self._component.get_activity_dictionary()
+        models, self.__names = _model_codes(pd.Index([], dtype=object) if activities is None else activities,
+                                            [frame[ModelColumn.ACTIVITY.value].tolist() for frame in frames])
+        return models
+
+    def __align_variants(self, models: list) -> np.ndarray:
+        """Return the cost of the alignment of each variant with each model.
+
+        The alignments not memoized are computed in the process pool if there are enough cells to compute.
+        """
+        pairs = list({(trace.tobytes(), model.tobytes()): (trace, model) for model in models for trace in self.__traces
+                      if not ((trace.tobytes(), model.tobytes()) in self.__memo)}.values())
+        backend = self._component.get_kpi_backend() if hasattr(self._component, 'get_kpi_backend') else None
+        cells = sum((len(trace) + 1) * (len(model) + 1) for trace, model in pairs)
+        if backend is not None and backend.n_jobs > 1 and cells >= self.MIN_PARALLEL_CELLS:
+            chunks = [(pairs[i::backend.n_jobs], self.insertion_cost, self.deletion_cost) for i in range(backend.n_jobs)]
+            for chunk, chunk_results in zip(chunks, backend.map(_align_chunk, chunks)):
+                self.__memo.update({(trace.tobytes(), model.tobytes()): result for (trace, model), result in zip(chunk[0], chunk_results)})
+        else:
+            for trace, model in pairs:
+                self.__memo[(trace.tobytes(), model.tobytes())] = align_trace(trace, model, self.insertion_cost, self.deletion_cost)
+        self.__model_keys = [model.tobytes() for model in models]
+        return np.array([[self.__memo[(trace.tobytes(), model.tobytes())][0] for model in models] for trace in self.__traces],
+                        dtype=np.float64).reshape(len(self.__traces), len(models))
+
+    def __get_variant_deviations(self) -> list:
+        """Return the deviations of each variant with its model of best fitness, materialized once.
+        """
+        if self.__variant_deviations is None:
+            self.__variant_deviations = []
+            for trace, best in zip(self.__traces, self.__best.tolist()):
+                _, records = self.__memo[(trace.tobytes(), self.__model_keys[best])]
+                self.__variant_deviations.append([(position, self.INSERTION, self.__names[expected]) if actual < 0 else
+                                                  (position, self.DELETION, self.__names[actual])
+                                                  for position, expected, actual in records.tolist()])
+        return self.__variant_deviations
+
+
+def align_trace(trace: np.ndarray, model: np.ndarray, insertion_cost: Optional[float] = 1.0, deletion_cost: Optional[float] = 1.0) -> tuple:
+    """Align a trace with a process model by dynamic programming on the activity codes.
+
+    Each row of the cost matrix is computed with NumPy from the previous row: the deletions and the synchronous moves
+    come from the previous row, and the insertions along the row are a cumulative minimum.
+    The deviations are found by backtracking from the last cell.
+
+    Parameters
+    ----------
+    trace : np.ndarray
+        Activity codes of the trace.
+    model : np.ndarray
+        Activity codes of the process model.
+    insertion_cost : float, Default: 1.0
+        Cost of an activity of the model missing in the trace.
+    deletion_cost : float, Default: 1.0
+        Cost of an activity of the trace that is not in the model.
+
+    Returns
+    -------
+    tuple
+        Cost of the alignment and array of deviations with the columns position, expected code and actual code.
+        An insertion has the actual code -1 and the position in the trace before which the activity is missing,
+        a deletion has the expected code -1 and the position of the activity in the trace.
+
+    Example
+    -------
+    >>> align_trace(np.array([0, 2, 1]), np.array([0, 1, 3]))
+    (2.0, array([[1, -1, 2], [3, 3, -1]]))
+    """
+    trace, model = np.asarray(trace, dtype=np.int64), np.asarray(model, dtype=np.int64)
+    n, m = len(trace), len(model)
+    steps = insertion_cost * np.arange(m + 1)
+    cost = np.empty((n + 1, m + 1))
+    cost[0] = steps
+    for i in range(1, n + 1):
+        candidate = cost[i - 1] + deletion_cost
+        candidate[1:] = np.minimum(candidate[1:], np.where(model == trace[i - 1], cost[i - 1, :-1], np.inf))
+        cost[i] = np.minimum.accumulate(candidate - steps) + steps
+    # Backtrack the deviations from the last cell, the synchronous moves are preferred
+    deviations = []
+    i, j = n, m
+    while i > 0 or j > 0:
+        if i > 0 and j > 0 and trace[i - 1] == model[j - 1] and np.isclose(cost[i, j], cost[i - 1, j - 1]):
+            i, j = i - 1, j - 1
+        elif i > 0 and np.isclose(cost[i, j], cost[i - 1, j] + deletion_cost):
+            i = i - 1
+            deviations.append((i, -1, trace[i]))
+        else:
+            j = j - 1
+            deviations.append((i, model[j], -1))
+    return float(cost[n, m]), np.array(deviations[::-1], dtype=np.int64).reshape(-1, 3)
+
+
+def _model_codes(activities: pd.Index, model_activities: list) -> tuple:
+    """Return the activity codes of each process model and the activity names of the codes.
+
+    The activities are coded with the activity dictionary of the event logs. The activities that are not in the event logs
+    have the next codes, so they never match an event and their names are kept.
+    """
+    names = pd.Index(np.concatenate([np.asarray(model, dtype=object) for model in model_activities] + [np.array([], dtype=object)]))
+    codes = activities.get_indexer(names)
+    unknown_codes, unknown = pd.factorize(names[codes < 0])
+    codes[codes < 0] = len(activities) + unknown_codes
+    models = np.split(codes.astype(np.int64), np.cumsum([len(model) for model in model_activities])[:-1])
+    return models, np.r_[np.asarray(activities, dtype=object), np.asarray(unknown, dtype=object)]
+
+
+def _align_chunk(task: tuple) -> list:
+    """Return the alignments of a list of pairs (trace, model), in a process of the pool.
+    """
+    pairs, insertion_cost, deletion_cost = task
+    return [align_trace(trace, model, insertion_cost, deletion_cost) for trace, model in pairs]
@@ -1,12 +1,15 @@
+import numpy as np
 import pandas as pd
 
-from deepdiff import DeepDiff
+import difflib
 from typing import Union, Optional
 
 from peppermining.utils.enum import EventColumn, ModelColumn
+from peppermining.utils.variant_discovery import _case_segments, _trace_codes
 from peppermining.filters.pepper_filter import PepperFilter
 from peppermining.filters.case_filter import CaseFilter
 from peppermining.conformance.process_model import ProcessModel
+from peppermining.conformance.alignment import _model_codes
 from peppermining.peppermining import PepperMining
 
 
@@ -16,6 +19,10 @@ class Conformance():
     The conformance checker allows you to automatically compare a reference process model with the actual process flows discovered from the data.
     The difference between the model and actual flows is returned in the dataframe with a diagnostics column.
 
+    The diagnostics are kept per variant as encoded deviation records (position, expected activity code, actual activity code),
+    computed from the activity codes with the same results as DeepDiff, and each case keeps the reference to its variant.
+    The DeepDiff dictionaries are only materialized for the cases requested to the method diagnostics.
+
     Attributes
     ----------
     _component : pd.DataFrame
@@ -23,7 +30,7 @@ class Conformance():
     _models : list
         List of ProcessModel objects.
     _conformance_list : pd.DataFrame
-        DataFrame with conformance details.
+        DataFrame with conformance details, the variant of each case.
 
     Methods
     -------
@@ -32,7 +39,7 @@ class Conformance():
     get_summary
         Return Conformance overview data.
     diagnostics
-        Return the diagnostic per case.
+        Return the diagnostic of the cases requested.
 
     Example
     -------
@@ -47,7 +54,12 @@ class Conformance():
     >>> c.get_cases()
     >>> c.get_summary()
     >>> c.diagnostics()
+    >>> c.diagnostics(page=0, page_size=100)
     """
+    # Kinds of the DeepDiff results of two lists
+    VALUES_CHANGED = 'values_changed'
+    ITEM_REMOVED = 'iterable_item_removed'
+    ITEM_ADDED = 'iterable_item_added'
 
     def __init__(self, data: Union[PepperMining, PepperFilter], models: Union[ProcessModel, list]) -> None:
         """Conformance constructor.
@@ -61,6 +73,9 @@ class Conformance():
         """
         self._component = data
         self._models = models
+        self.__names = np.array([], dtype=object)
+        self.__offsets = np.zeros(1, dtype=np.int64)
+        self.__records = np.zeros((0, 3), dtype=np.int32)
         self._conformance_list = self.__conformance_discovery()
 
     def get_cases(self, kpi: Optional[list] = None) -> pd.DataFrame:
@@ -95,8 +110,20 @@ class Conformance():
         """
         return self.__conformance_data().get_summary(kpi)
 
-    def diagnostics(self) -> pd.DataFrame:
-        """Return the diagnostic per case.
+    def diagnostics(self, case_list: Optional[list] = None, page: Optional[int] = None, page_size: Optional[int] = 1000) -> pd.DataFrame:
+        """Return the diagnostic of the cases requested.
+
+        The diagnostic is materialized from the deviation records of the variant of each case requested,
+        once per variant.
+
+        Parameters
+        ----------
+        case_list : list, Default: None
+            Cases requested. If None, all cases.
+        page : int, Default: None
+            Page of the cases requested, starting at 0. If None, all cases requested.
+        page_size : int, Default: 1000
+            Number of cases of a page.
 
         Returns
         -------
@@ -107,31 +134,117 @@ class Conformance():
             diagnostic: dictionary with DeepDiff results.
                 More information in: https://zepworks.com/deepdiff/current/index.html
         """
-        return self._conformance_list[[EventColumn.CASE_ID.value, 'diagnostic']]
+        conformance = self._conformance_list
+        if case_list is not None:
+            conformance = conformance[conformance[EventColumn.CASE_ID.value].isin(case_list if isinstance(case_list, list) else [case_list])]
+        if page is not None:
+            conformance = conformance.iloc[page * page_size:(page + 1) * page_size]
+        diagnostic = {variant: self.__diagnostic(variant) for variant in conformance['variant'].unique().tolist()}
+        return pd.DataFrame({EventColumn.CASE_ID.value: conformance[EventColumn.CASE_ID.value],
+                             'diagnostic': [diagnostic[variant] for variant in conformance['variant'].tolist()]})
 
     def __conformance_discovery(self) -> pd.DataFrame:
         """Compare process model with the event log and add a diagnostic.
 
+        The cases are grouped by variant, the trace of activity codes of each case in the order of the event logs.
+        Each variant is compared once with each process model and the result is broadcast to the cases of the variant.
+        A variant conforms to a process model if their activity codes are equal, the deviations are only computed for
+        the variants that do not conform. The deviations are merged by kind over the models, as the DeepDiff dictionaries.
+
         Returns
         -------
         DataFrame
             DataFrame with the Conformance analysis.
         """
-        # Prepare data
-        conf_list = self._component.get_event_log().groupby(EventColumn.CASE_ID.value, group_keys=False)[EventColumn.ACTIVITY.value].apply(list)
-        conf_list = conf_list.to_frame().reset_index()
-        conf_list['has_violation'] = 1
-        conf_list['diagnostic'] = None
+        event_log = self._component.get_event_log()
+        case_index = self._component.get_case_index()
+        # Cases in the order of the groupby of the event logs
+        cases = event_log.groupby(EventColumn.CASE_ID.value, observed=True).size().index
+        if case_index is None or len(cases) == 0:
+            return pd.DataFrame({EventColumn.CASE_ID.value: cases, 'has_violation': 1, 'variant': np.array([], dtype=np.intp)})
+        # Trace of each case in the order of the event logs, and variant of each case
+        positions = case_index.positions(event_log)
+        order = np.argsort(case_index.case_codes[positions], kind='stable')
+        case_codes = case_index.case_codes[positions][order]
+        activity_codes = case_index.activity_codes[positions][order]
+        starts, lengths = _case_segments(case_codes)
+        variant_codes = _trace_codes(activity_codes, starts, lengths)
+        _, representative = np.unique(variant_codes, return_index=True)
+        traces = [activity_codes[starts[case]:starts[case] + lengths[case]] for case in representative]
+        # The events without activity are not in the traces
+        traces = [trace[trace >= 0] for trace in traces]
+        # Activity codes of each process model
         model_list = self._models.get_process_model().groupby(ModelColumn.ID.value, group_keys=False)[ModelColumn.ACTIVITY.value].apply(list)
-        model_list = model_list.to_frame().reset_index()
-        # For each process model, compare process model with the event log using DeepDiff lib
-        for key, row in model_list.iterrows():
-            act_list = row[ModelColumn.ACTIVITY.value]
-            conf_list['diagnostic'] = conf_list.apply(lambda row: {**({} if (row['diagnostic'] is None)
-                                                                      else row['diagnostic']), **(DeepDiff(row[ModelColumn.ACTIVITY.value], act_list).to_dict())}, axis=1)
-            conf_list['has_violation'] = conf_list.apply(lambda row: len(DeepDiff(row[ModelColumn.ACTIVITY.value], act_list)) if (row['has_violation'] > 0) else 0, axis=1)
-        # Return the Conformance list
-        return conf_list
+        model_codes, self.__names = _model_codes(case_index.activities, model_list.tolist())
+        has_violation = np.ones(len(traces), dtype=np.int64)
+        diagnostic = [{} for _ in traces]
+        for codes in model_codes:
+            for variant, trace in enumerate(traces):
+                if len(trace) == len(codes) and (trace == codes).all():
+                    has_violation[variant] = 0
+                    continue
+                deviations = self.__deviations(trace, codes)
+                diagnostic[variant].update(deviations)
+                if has_violation[variant] > 0:
+                    has_violation[variant] = len(deviations)
+        # Deviation records of each variant, in the order of the kinds of the merged dictionary
+        records = [np.concatenate(list(kinds.values()) + [np.zeros((0, 3), dtype=np.int32)]) for kinds in diagnostic]
+        self.__offsets = np.r_[0, np.cumsum([len(variant_records) for variant_records in records])]
+        self.__records = np.concatenate(records)
+        # Reference of each case to its variant
+        case_variant = np.empty(len(case_index.case_ids), dtype=np.intp)
+        case_variant[case_codes[starts]] = variant_codes
+        case_variant = case_variant[case_index.case_codes_of(cases)]
+        return pd.DataFrame({EventColumn.CASE_ID.value: cases, 'has_violation': has_violation[case_variant], 'variant': case_variant})
+
+    def __deviations(self, trace: np.ndarray, codes: np.ndarray) -> dict:
+        """Return the deviation records of a trace against a process model, by kind of DeepDiff result.
+
+        The records are (position, expected code, actual code), as DeepDiff compares two lists: the opcodes of difflib are kept,
+        unless they report more than one deviation and not less than the comparison position by position.
+        The position is the index of the item in the trace, or in the process model for the items added. The expected code
+        is -1 for the items removed from the trace, and the actual code is -1 for the items added from the process model.
+        The items removed and added at the same position are values changed.
+        """
+        length = min(len(trace), len(codes))
+        # Positions in the trace and in the process model of the values changed, items removed and items added
+        actual, expected, removed, added = [], [], [], []
+        for tag, i1, i2, j1, j2 in difflib.SequenceMatcher(None, trace.tolist(), codes.tolist(), autojunk=False).get_opcodes():
+            common = min(i2 - i1, j2 - j1) if tag == 'replace' else 0
+            actual.extend(range(i1, i1 + common))
+            expected.extend(range(j1, j1 + common))
+            if tag in ('replace', 'delete'):
+                removed.extend(range(i1 + common, i2))
+            if tag in ('replace', 'insert'):
+                added.extend(range(j1 + common, j2))
+        changed = np.flatnonzero(trace[:length] != codes[:length])
+        count = len(actual) + len(removed) + len(added)
+        if count > 1 and count >= len(changed) + abs(len(trace) - len(codes)):
+            actual, expected = changed, changed
+            removed, added = range(length, len(trace)), range(length, len(codes))
+        actual, expected, removed, added = [np.asarray(positions, dtype=np.int64) for positions in (actual, expected, removed, added)]
+        mutual = np.intersect1d(removed, added)
+        removed, added = np.setdiff1d(removed, mutual), np.setdiff1d(added, mutual)
+        actual, expected = np.r_[actual, mutual], np.r_[expected, mutual]
+        order = np.argsort(actual, kind='stable')
+        records = {self.VALUES_CHANGED: np.stack([actual, codes[expected], trace[actual]], axis=1)[order],
+                   self.ITEM_ADDED: np.stack([added, codes[added], np.full(len(added), -1)], axis=1),
+                   self.ITEM_REMOVED: np.stack([removed, np.full(len(removed), -1), trace[removed]], axis=1)}
+        return {kind: kind_records.astype(np.int32) for kind, kind_records in records.items() if len(kind_records) > 0}
+
+    def __diagnostic(self, variant: int) -> dict:
+        """Return the DeepDiff dictionary of a variant, materialized from its deviation records.
+        """
+        diagnostic = {}
+        for position, expected, actual in self.__records[self.__offsets[variant]:self.__offsets[variant + 1]].tolist():
+            path = f"root[{position}]"
+            if expected < 0:
+                diagnostic.setdefault(self.ITEM_REMOVED, {})[path] = self.__names[actual]
+            elif actual < 0:
+                diagnostic.setdefault(self.ITEM_ADDED, {})[path] = self.__names[expected]
+            else:
+                diagnostic.setdefault(self.VALUES_CHANGED, {})[path] = {'new_value': self.__names[expected], 'old_value': self.__names[actual]}
+        return diagnostic
 
     def __conformance_data(self) -> CaseFilter:
         """Return the cases without violation.
@@ -33,7 +33,7 @@ def root_cause_analysis(data: Union[PepperMining, PepperFilter], top: Optional[i
     column_list = filter(lambda column: column not in [EventColumn.CASE_ID.value], list(case_data.columns))
     column_list = list(column_list)
     for col_name in column_list:
-        root_cause = case_data.groupby(col_name)[EventColumn.CASE_ID.value].count().reset_index(name='number_of_case').sort_values(['number_of_case'], ascending=False)
+        root_cause = case_data.groupby(col_name, observed=True)[EventColumn.CASE_ID.value].count().reset_index(name='number_of_case').sort_values(['number_of_case'], ascending=False)
         root_cause['percent_of_case'] = (root_cause[['number_of_case']] * 100) / sum(root_cause['number_of_case'])
         root_cause = root_cause.rename(columns={col_name: "values"})
         root_cause = root_cause.head(top)
@@ -1,10 +1,11 @@
+import numpy as np
 import pandas as pd
 
 from typing import Union, Optional
 
-from peppermining.utils.enum import ModelColumn, KpiColumn, ViolationColumn
+from peppermining.utils.enum import ModelColumn, ViolationColumn
 from peppermining.filters.pepper_filter import PepperFilter
-from peppermining.filters.case_filter import CaseFilter
+from peppermining.kpi.kpi_engine import KpiEngine
 from peppermining.peppermining import PepperMining
 from peppermining.conformance.process_model import ProcessModel
 
@@ -19,12 +20,20 @@ class PepperViolation():
     (4) UndesiredEnd - activity_x executed as END activity.
     (5) RunBySameUsers - activity_x and activity_y should be executed by two different users.
 
+    The violations found by the detection are appended to columnar buffers, and the violation list is built once
+    at the end of the detection. The violations added after the detection are added to the violation list by get_violation. The cases of the violations are kept as CSR arrays: the cases of the violation i
+    are case_ids[case_offsets[i]:case_offsets[i + 1]], and the lists of cases are only built by get_violation.
+
     Attributes
     ----------
     _type : str
         Type of violation.
     _violation_list : pd.DataFrame
-        DataFrame with violation details.
+        DataFrame with violation details, without the cases.
+    _case_offsets : np.ndarray
+        Offset in _case_ids of the cases of each violation, and the number of cases at the end.
+    _case_ids : np.ndarray
+        Cases of all violations, in the order of the violations.
     _component : pd.DataFrame
         PepperMining or PepperFilter object.
     _models : list
@@ -59,9 +68,15 @@ class PepperViolation():
         """
         self._type = violation_type
         self._violation_list = pd.DataFrame()
+        self._case_offsets = np.zeros(1, dtype=np.int64)
+        self._case_ids = np.array([], dtype=object)
         self._component = data
         self._models = models
+        self.__names = []
+        self.__activities = []
+        self.__cases = []
         self.detection()
+        self.__build_violation_list()
 
     def detection(self) -> None:
         """Method should be implement each violation to discovery the undesired events.
@@ -103,6 +118,9 @@ class PepperViolation():
     def add_violation(self, violation_name: str, activity, case) -> None:
         """Add a violation in a dataframe with a list of violations.
 
+        The violation is appended to the buffers, the buffers are added to the violation list at the end of the detection
+        and, for the violations added after the detection, by get_violation.
+
         Parameters
         ----------
         violation_name : str
@@ -112,12 +130,9 @@ class PepperViolation():
         case : pd.DataFrame
             Cases of validation.
         """
-        new_row = pd.DataFrame({ViolationColumn.TYPE.value: self._type,
-                                ViolationColumn.NAME.value: violation_name,
-                                ViolationColumn.ACTIVITY.value: [activity],
-                                ViolationColumn.CASES.value: [case]
-                                }, index=[0])
-        self._violation_list = pd.concat([new_row, self._violation_list.loc[:]]).reset_index(drop=True)
+        self.__names.append(violation_name)
+        self.__activities.append(activity)
+        self.__cases.append(case)
 
     def get_violation(self, kpi: Optional[list] = None) -> pd.DataFrame:
         """Return violations data with KPIs.
@@ -133,18 +148,49 @@ class PepperViolation():
         DataFrame
             DataFrame with the Violation data.
         """
-        return self._violation_list if kpi is None else self.__add_violation_kpi(kpi)
+        self.__build_violation_list()
+        violation_list = self.__get_violation_list()
+        return violation_list if kpi is None else self.__add_violation_kpi(violation_list, kpi)
+
+    def __build_violation_list(self) -> None:
+        """Add the violations of the buffers to the violation list and to the CSR arrays of the cases.
+
+        The last violation added is the first row of the violation list, so the violations of the buffers are
+        before the violations already in the violation list.
+        """
+        if len(self.__names) > 0:
+            violation_list = pd.DataFrame({ViolationColumn.TYPE.value: self._type,
+                                           ViolationColumn.NAME.value: self.__names[::-1],
+                                           ViolationColumn.ACTIVITY.value: self.__activities[::-1]})
+            if not self._violation_list.empty:
+                violation_list = pd.concat([violation_list, self._violation_list], ignore_index=True)
+            self._violation_list = violation_list
+            cases = [np.asarray(case) for case in self.__cases[::-1]]
+            case_offsets = np.r_[0, np.cumsum([len(case) for case in cases])]
+            self._case_offsets = np.r_[case_offsets, case_offsets[-1] + self._case_offsets[1:]].astype(np.int64)
+            self._case_ids = np.concatenate([case for case in cases + [self._case_ids] if len(case) > 0] or [np.array([], dtype=object)])
+        self.__names, self.__activities, self.__cases = [], [], []
+
+    def __get_violation_list(self) -> pd.DataFrame:
+        """Return the violation list with the list of cases of each violation.
+        """
+        if self._violation_list.empty:
+            return self._violation_list
+        violation_list = self._violation_list.copy()
+        violation_list[ViolationColumn.CASES.value] = [cases.tolist() for cases in np.split(self._case_ids, self._case_offsets[1:-1])]
+        return violation_list
 
-    def __add_violation_kpi(self, kpi_list) -> pd.DataFrame:
+    def __add_violation_kpi(self, violation_list: pd.DataFrame, kpi_list) -> pd.DataFrame:
         """Add KPIs per violation
 
+        The KPIs are the summary of the cases of each violation, as a CaseFilter of the cases would return.
+        They are computed for all violations in one grouped aggregation over the KPIs per case, with the CSR arrays of the cases.
         """
-        kpi_df = pd.DataFrame()
-        for key, row in self._violation_list.iterrows():
-            violation = CaseFilter(self._component, row[ViolationColumn.CASES.value])
-            kpi_values = violation.get_summary(kpi_list)[KpiColumn.VALUE.value]
-            kpi_values = kpi_values.to_frame().T
-            kpi_values = kpi_values.reset_index(drop=True).rename(index={0: key})
-            kpi_df = pd.concat([kpi_values, kpi_df.loc[:]])
+        if violation_list.empty:
+            return violation_list
+        try:
+            kpi_df = KpiEngine(self._component).get_group_summary(kpi_list, self._case_offsets, self._case_ids)
+        except Exception as e:
+            raise TypeError(f'Only Pepper KPI are allowed.[{type(e)}]')
         # Merge on index the dataframes Violation and KPI
-        return pd.merge(self._violation_list, kpi_df, left_index=True, right_index=True)
+        return pd.merge(violation_list, kpi_df, left_index=True, right_index=True)
@@ -51,11 +51,11 @@ class RunBySameUser(PepperViolation):
         if (self._user not in event_log.columns):
             raise TypeError(f"Not exists the column {self._user} in the event logs.")
         event_log = event_log[event_log[EventColumn.ACTIVITY.value].isin(self._activities)]
-        event_log = event_log.groupby(['case_id', 'user'], group_keys=False).activity.apply(list)
+        event_log = event_log.groupby(['case_id', 'user'], group_keys=False, observed=True).activity.apply(list)
         event_log = event_log.reset_index()
         event_log[EventColumn.ACTIVITY.value] = event_log.apply(lambda row: list(dict.fromkeys(row[EventColumn.ACTIVITY.value])), axis=1)
         event_log['number_activities'] = event_log.apply(lambda row: len(list(dict.fromkeys(row[EventColumn.ACTIVITY.value]))), axis=1)
         violation_log = event_log[event_log['number_activities'] > 1]
         # Add violation
-        for key, row in violation_log.groupby(self._user, group_keys=False)[EventColumn.CASE_ID.value].apply(list).reset_index(name=EventColumn.CASE_ID.value).iterrows():
+        for key, row in violation_log.groupby(self._user, group_keys=False, observed=True)[EventColumn.CASE_ID.value].apply(list).reset_index(name=EventColumn.CASE_ID.value).iterrows():
             self.add_violation(F'"{row[self._user]}" executed by two different activities', None, row[EventColumn.CASE_ID.value])
@@ -44,5 +44,5 @@ class UndesiredActivity(PepperViolation):
         violation_log = event_log[~event_log[EventColumn.ACTIVITY.value].isin(self.get_model_activities())][[EventColumn.ACTIVITY.value, EventColumn.CASE_ID.value]]
         violation_log = violation_log.drop_duplicates(violation_log)
         # Add violation
-        for key, row in violation_log.groupby(EventColumn.ACTIVITY.value, group_keys=False)[EventColumn.CASE_ID.value].apply(list).reset_index(name=EventColumn.CASE_ID.value).iterrows():
+        for key, row in violation_log.groupby(EventColumn.ACTIVITY.value, group_keys=False, observed=True)[EventColumn.CASE_ID.value].apply(list).reset_index(name=EventColumn.CASE_ID.value).iterrows():
             self.add_violation(F'"{row[EventColumn.ACTIVITY.value]}" is an undesired activity', [row[EventColumn.ACTIVITY.value]], row[EventColumn.CASE_ID.value])
@@ -2,7 +2,8 @@ import numpy as np
 
 from typing import Union
 
-from peppermining.utils.enum import EventColumn, ModelColumn
+from peppermining.utils.enum import ModelColumn
+from peppermining.discovery.dfg import DFG
 from peppermining.filters.pepper_filter import PepperFilter
 from peppermining.peppermining import PepperMining
 from peppermining.conformance.violation.pepper_violation import PepperViolation
@@ -42,25 +43,21 @@ class UndesiredConnection(PepperViolation):
     def detection(self) -> None:
         """Violation detection.
         """
-        # Get eventdata without undesired activity
-        event_log = self._component.get_event_log()
-        event_log['next_activity'] = event_log.groupby(EventColumn.CASE_ID.value)[EventColumn.ACTIVITY.value].shift(-1)
-        violation_log = event_log[event_log[EventColumn.ACTIVITY.value].isin(
-            self.get_model_activities()) & event_log['next_activity'].notnull()][[EventColumn.ACTIVITY.value, EventColumn.CASE_ID.value]]
-        # Check up new next activity
-        violation_log['next_activity'] = violation_log.groupby('case_id')[EventColumn.ACTIVITY.value].shift(-1)
-        violation_log = violation_log.replace(np.nan, None)
-        # Get process model
+        # Get eventdata without undesired activity and without the end events, sorted by case and event time
+        case_index = self._component.get_case_index()
+        positions = case_index.sorted_positions(self._component.get_event_log())
+        positions = positions[np.isin(case_index.activity_codes[positions], case_index.activity_codes_of(self.get_model_activities())) & (case_index.next_position[positions] >= 0)]
+        # Directly-Follows Graph of these events, the next activity is checked up among them
+        dfg = DFG(case_index, positions)
+        # Get process model transitions
         model_log = self.get_model_log()
         model_log['next_activity'] = model_log.groupby(ModelColumn.ID.value)[ModelColumn.ACTIVITY.value].shift(-1)
-        model_log = model_log.replace(np.nan, None)
+        model_log = model_log[model_log['next_activity'].notnull()]
+        transitions = set(zip(model_log[ModelColumn.ACTIVITY.value], model_log['next_activity']))
         # Discovery all transitions is not found in process models
-        violation_log = violation_log.merge(model_log, on=['activity', 'next_activity'], how='left', indicator=True).query('_merge == "left_only"')
-        violation_log = violation_log.drop(columns=['id', '_merge'])
-        violation_log = violation_log[violation_log['next_activity'].notnull()]
-        violation_log = violation_log.drop_duplicates()
+        activities = np.asarray(case_index.activities, dtype=object)
+        connections = [(activities[source], activities[target], source, target) for source, target in zip(dfg.source.tolist(), dfg.target.tolist())
+                       if source >= 0 and target >= 0 and (activities[source], activities[target]) not in transitions]
         # Add violation
-        for key, row in violation_log.groupby([EventColumn.ACTIVITY.value, 'next_activity'],
-                                              group_keys=False)[EventColumn.CASE_ID.value].apply(list).reset_index(name=EventColumn.CASE_ID.value).iterrows():
-            self.add_violation(f"{row[EventColumn.ACTIVITY.value]} is followed by {row['next_activity']}",
-                               [row[EventColumn.ACTIVITY.value], row['next_activity']], row[EventColumn.CASE_ID.value])
+        for activity, next_activity, source, target in sorted(connections):
+            self.add_violation(f"{activity} is followed by {next_activity}", [activity, next_activity], dfg.get_cases(source, target))
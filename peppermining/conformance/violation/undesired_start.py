@@ -43,13 +43,13 @@ class UndesiredStart(PepperViolation):
         """Violation detection.
         """
         event_log = self._component.get_event_log()
-        event_log['prev_activity'] = event_log.groupby(EventColumn.CASE_ID.value)[EventColumn.ACTIVITY.value].shift(1)
-        event_log = event_log.replace(np.nan, None)
+        case_index = self._component.get_case_index()
+        event_log = event_log[case_index.prev_position[case_index.positions(event_log)] < 0]
         model_log = self.get_model_log()
         model_log['prev_activity'] = model_log.groupby(ModelColumn.ID.value)[ModelColumn.ACTIVITY.value].shift(1)
         model_log = model_log.replace(np.nan, None)
         start_list = list(model_log[model_log['prev_activity'].isnull()][ModelColumn.ACTIVITY.value])
-        violation_log = event_log[(event_log['prev_activity'].isnull()) & (~event_log[EventColumn.ACTIVITY.value].isin(start_list))][[EventColumn.ACTIVITY.value, EventColumn.CASE_ID.value]]
+        violation_log = event_log[(~event_log[EventColumn.ACTIVITY.value].isin(start_list))][[EventColumn.ACTIVITY.value, EventColumn.CASE_ID.value]]
         # Add violation
-        for key, row in violation_log.groupby(EventColumn.ACTIVITY.value, group_keys=False)[EventColumn.CASE_ID.value].apply(list).reset_index(name=EventColumn.CASE_ID.value).iterrows():
+        for key, row in violation_log.groupby(EventColumn.ACTIVITY.value, group_keys=False, observed=True)[EventColumn.CASE_ID.value].apply(list).reset_index(name=EventColumn.CASE_ID.value).iterrows():
             self.add_violation(F'"{row[EventColumn.ACTIVITY.value]}" executed as START activity', [row[EventColumn.ACTIVITY.value]], row[EventColumn.CASE_ID.value])
@@ -0,0 +1,4 @@
+from peppermining.discovery import dfg, variant_trie
+
+from peppermining.discovery.dfg import DFG
+from peppermining.discovery.variant_trie import VariantTrie
@@ -0,0 +1,245 @@
+import numpy as np
+import pandas as pd
+
+from peppermining.utils.case_index import CaseIndex
+
+
+class DFG():
+    """Directly-Follows Graph of an event log.
+
+    The graph is computed once from the events sorted by case and event time, and it is reused by the drawing,
+    the process flow KPIs and the violations. Each edge is a pair of activity codes (source, target) where the
+    target event directly follows the source event in a case. The code -1 is the START in the source and the END in the target.
+    The edges are kept in sparse arrays (one row per edge found) and a dictionary gives the row of an edge in O(1).
+
+    Attributes
+    ----------
+    activities : pd.Index
+        Activity dictionary, the activity name of each activity code.
+    source : np.ndarray
+        Activity code of the source of each edge, -1 for START.
+    target : np.ndarray
+        Activity code of the target of each edge, -1 for END.
+    frequency : np.ndarray
+        Number of events of each edge.
+    case_count : np.ndarray
+        Number of cases of each edge.
+    duration : pd.DataFrame
+        Min, max, mean, median, sum and std of the durations in seconds of each edge.
+        The duration is the time until the next event, 0 for the END edges and undefined for the START edges.
+    start_count : np.ndarray
+        Number of cases that start with each activity code.
+    end_count : np.ndarray
+        Number of cases that end with each activity code.
+
+    Methods
+    -------
+    edge
+        Return the row of an edge.
+    get_frequency
+        Return the number of events of an edge.
+    get_case_count
+        Return the number of cases of an edge.
+    get_duration
+        Return a statistic of the durations of an edge.
+    get_durations
+        Return the durations of the events of an edge.
+    get_cases
+        Return the cases of an edge.
+    to_frame
+        Return the edges as a DataFrame.
+
+    Example
+    -------
+    >>> pm = PepperMining()
+    >>> pm.read_event_log_csv("tests/data/eventlog-example.csv", separator=';', format_date='%d/%m/%Y %H:%M')
+    >>> dfg = pm.get_dfg()
+    >>> dfg.get_case_count(dfg.START, pm.get_case_index().activity_code('register request'))
+    """
+    START = -1
+    END = -1
+    # Statistics of the durations of each edge
+    DURATION_STATISTICS = ['min', 'max', 'mean', 'median', 'sum', 'std']
+
+    def __init__(self, case_index: CaseIndex, positions: np.ndarray):
+        """Build the graph of the events of a case index.
+
+        Parameters
+        ----------
+        case_index : CaseIndex
+            Case-segmented index of the event logs.
+        positions : np.ndarray
+            Positions of the events sorted by case and event time.
+            The directly-follows relation is computed among these events, so a subset of events is a projection of the event log.
+        """
+        self.activities = case_index.activities
+        self.__case_ids = case_index.case_ids
+        positions = np.asarray(positions, dtype=np.intp)
+        case_codes = case_index.case_codes[positions]
+        activity_codes = case_index.activity_codes[positions]
+        # Next event of the same case among the positions, -1 for the last event
+        same_case = case_codes[1:] == case_codes[:-1]
+        next_index = np.full(len(positions), -1, dtype=np.intp)
+        next_index[:-1] = np.where(same_case, np.arange(1, len(positions)), -1)
+        first = np.r_[True, ~same_case] if len(positions) else np.array([], dtype=bool)
+        next_activity = np.where(next_index >= 0, activity_codes[next_index], -1)
+        time = pd.Series(case_index.event_time[positions])
+        next_time = pd.Series(case_index.event_time[positions[next_index]])
+        durations = np.where(next_index < 0, 0.0, (next_time - time).dt.seconds)
+        # One row per START flow and per event, the events without activity are not in the graph
+        start = first & (activity_codes >= 0)
+        event = activity_codes >= 0
+        source = np.r_[np.full(start.sum(), self.START), activity_codes[event]]
+        target = np.r_[activity_codes[start], next_activity[event]]
+        cases = np.r_[case_codes[start], case_codes[event]]
+        durations = np.r_[np.full(start.sum(), np.nan), durations[event]]
+        flow_positions = np.r_[positions[start], positions[event]]
+        # Edge of each row
+        width = len(self.activities) + 1
+        edge_keys, edge_ids = np.unique((source + 1) * width + (target + 1), return_inverse=True)
+        self.source = edge_keys // width - 1
+        self.target = edge_keys % width - 1
+        self.frequency = np.bincount(edge_ids, minlength=len(edge_keys))
+        # Cases of each edge, sorted and without duplicates
+        edge_cases = np.unique(edge_ids.astype(np.int64) * len(self.__case_ids) + cases)
+        self.__case_codes = edge_cases % max(len(self.__case_ids), 1)
+        self.case_count = np.bincount(edge_cases // max(len(self.__case_ids), 1), minlength=len(edge_keys))
+        self.__case_offsets = np.r_[0, np.cumsum(self.case_count)]
+        # Durations of each edge in the order of the event logs
+        order = np.lexsort((flow_positions, edge_ids))
+        self.__durations = durations[order]
+        self.__duration_offsets = np.r_[0, np.cumsum(self.frequency)]
+        self.duration = pd.Series(self.__durations).groupby(edge_ids[order]).agg(self.DURATION_STATISTICS).reindex(range(len(edge_keys)))
+        self.start_count = np.bincount(activity_codes[start], minlength=len(self.activities))
+        self.end_count = np.bincount(activity_codes[event & (next_index < 0)], minlength=len(self.activities))
+        self.__edges = dict(zip(zip(self.source.tolist(), self.target.tolist()), range(len(edge_keys))))
+
+    def __len__(self) -> int:
+        return len(self.source)
+
+    def edge(self, source: int, target: int) -> int:
+        """Return the row of an edge.
+
+        Parameters
+        ----------
+        source : int
+            Activity code of the source, -1 for START.
+        target : int
+            Activity code of the target, -1 for END.
+
+        Returns
+        -------
+        int
+            Row of the edge in the arrays of the graph, -1 if the edge is not in the graph.
+        """
+        return self.__edges.get((source, target), -1)
+
+    def get_frequency(self, source: int, target: int) -> int:
+        """Return the number of events of an edge.
+
+        Parameters
+        ----------
+        source : int
+            Activity code of the source, -1 for START.
+        target : int
+            Activity code of the target, -1 for END.
+
+        Returns
+        -------
+        int
+            Number of events, 0 if the edge is not in the graph.
+        """
+        row = self.edge(source, target)
+        return int(self.frequency[row]) if row >= 0 else 0
+
+    def get_case_count(self, source: int, target: int) -> int:
+        """Return the number of cases of an edge.
+
+        Parameters
+        ----------
+        source : int
+            Activity code of the source, -1 for START.
+        target : int
+            Activity code of the target, -1 for END.
+
+        Returns
+        -------
+        int
+            Number of cases, 0 if the edge is not in the graph.
+        """
+        row = self.edge(source, target)
+        return int(self.case_count[row]) if row >= 0 else 0
+
+    def get_duration(self, source: int, target: int, statistic: str) -> float:
+        """Return a statistic of the durations of an edge.
+
+        Parameters
+        ----------
+        source : int
+            Activity code of the source.
+        target : int
+            Activity code of the target, -1 for END.
+        statistic : str
+            min | max | mean | median | sum | std
+
+        Returns
+        -------
+        float
+            Statistic in seconds, NaN if the edge is not in the graph.
+        """
+        row = self.edge(source, target)
+        return self.duration[statistic].iloc[row] if row >= 0 else np.nan
+
+    def get_durations(self, source: int, target: int) -> pd.Series:
+        """Return the durations of the events of an edge.
+
+        Parameters
+        ----------
+        source : int
+            Activity code of the source.
+        target : int
+            Activity code of the target, -1 for END.
+
+        Returns
+        -------
+        pd.Series
+            Durations in seconds in the order of the event logs, empty if the edge is not in the graph.
+        """
+        row = self.edge(source, target)
+        if row < 0:
+            return pd.Series([], dtype=float)
+        return pd.Series(self.__durations[self.__duration_offsets[row]:self.__duration_offsets[row + 1]])
+
+    def get_cases(self, source: int, target: int) -> list:
+        """Return the cases of an edge.
+
+        Parameters
+        ----------
+        source : int
+            Activity code of the source, -1 for START.
+        target : int
+            Activity code of the target, -1 for END.
+
+        Returns
+        -------
+        list
+            List of cases, sorted and without duplicates.
+        """
+        row = self.edge(source, target)
+        if row < 0:
+            return []
+        return self.__case_ids[self.__case_codes[self.__case_offsets[row]:self.__case_offsets[row + 1]]].tolist()
+
+    def to_frame(self) -> pd.DataFrame:
+        """Return the edges as a DataFrame.
+
+        Returns
+        -------
+        DataFrame
+            DataFrame with the source, target, frequency, case_count and the duration statistics of each edge.
+            The source and target are activity names, None for START and END.
+        """
+        names = np.r_[np.asarray(self.activities, dtype=object), None]
+        edges = pd.DataFrame({'source': names[self.source], 'target': names[self.target],
+                              'frequency': self.frequency, 'case_count': self.case_count})
+        return pd.concat([edges, self.duration.reset_index(drop=True)], axis=1)
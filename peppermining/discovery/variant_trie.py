@@ -0,0 +1,493 @@
+import numpy as np
+import pandas as pd
+
+from peppermining.utils.enum import Variant
+from peppermining.utils.case_index import CaseIndex
+from peppermining.utils.variant_discovery import _case_segments, _trace_codes, _variant_key
+
+
+class VariantTrie():
+    """Prefix tree of the traces of the cases.
+
+    Each node is a prefix of activity codes, the root is the empty trace. Each case is in the node of its trace,
+    so a variant is a node with cases. When a case gets new events after its last event, it moves from its node
+    to a descendant node, and only the changed cases are touched.
+
+    The trie is built from the variants: the cases are grouped by trace with the hashes of variant_discovery,
+    and only one trace of each variant is inserted. The variants share the nodes of their common prefixes, so each
+    prefix is kept once, and the cases starting with a prefix are the cases of the subtree of its node.
+    The duration statistics of the nodes are computed on demand from the events and kept until the trie changes.
+
+    Attributes
+    ----------
+    activities : pd.Index
+        Activity dictionary, the activity name of each activity code.
+    case_ids : np.ndarray
+        Case identifier of each case code.
+    parent : list
+        Parent node of each node, -1 for the root.
+    activity : list
+        Activity code of the last activity of each node, -1 for the root.
+    depth : list
+        Number of activities of each node.
+    case_count : list
+        Number of cases in each node.
+    prefix_count : list
+        Number of cases in the subtree of each node, i.e. the cases starting with the prefix of the node.
+    case_node : np.ndarray
+        Node of each case code, -1 if the case has not events.
+
+    Methods
+    -------
+    child
+        Return the child of a node with an activity.
+    insert
+        Return the node of a trace, the missing nodes are created.
+    find
+        Return the node of a trace.
+    path
+        Return the nodes from the root to a node.
+    trace
+        Return the activity codes of a node.
+    trace_activities
+        Return the activity names of a node.
+    key
+        Return the variant key of a node.
+    nodes_of_keys
+        Return the nodes of a list of variant keys.
+    subtree
+        Return the nodes of the subtree of a node.
+    cases_with_prefix
+        Return the cases whose trace starts with a list of activities.
+    count_with_prefix
+        Return the number of cases whose trace starts with a list of activities.
+    node_statistics
+        Return the case counts and the duration statistics of each node.
+    move_case
+        Move a case to a node.
+    update
+        Move the cases with new events of the case index to their new nodes.
+    variant_nodes
+        Return the nodes with cases.
+    to_frame
+        Return the Variants data.
+    """
+    ROOT = 0
+    # Statistics of the durations of each node
+    DURATION_STATISTICS = ['min', 'max', 'mean', 'median', 'sum', 'std']
+
+    def __init__(self, case_index: CaseIndex, positions: np.ndarray):
+        """Build the trie of the events of a case index.
+
+        Parameters
+        ----------
+        case_index : CaseIndex
+            Case-segmented index of the event logs.
+        positions : np.ndarray
+            Positions of the events sorted by case and event time.
+        """
+        self.activities = case_index.activities
+        self.case_ids = case_index.case_ids
+        self.__names = np.asarray(self.activities).astype(str)
+        self.parent = [-1]
+        self.activity = [-1]
+        self.depth = [0]
+        self.case_count = [0]
+        self.prefix_count = [0]
+        self.case_node = np.full(len(self.case_ids), -1, dtype=np.intp)
+        self.__children = {}
+        self.__child_nodes = [[]]
+        self.__keys = {}
+        self.__key_nodes = None
+        self.__statistics = None
+        self.__case_index = case_index
+        # The events without activity are not in the traces
+        positions = np.asarray(positions, dtype=np.intp)
+        self.__positions = positions = positions[case_index.activity_codes[positions] >= 0]
+        if len(positions) == 0:
+            return
+        case_codes = case_index.case_codes[positions]
+        activity_codes = case_index.activity_codes[positions]
+        starts, lengths = _case_segments(case_codes)
+        variant_codes = _trace_codes(activity_codes, starts, lengths)
+        # Insert one trace of each variant
+        _, representative = np.unique(variant_codes, return_index=True)
+        nodes = np.array([self.insert(activity_codes[starts[case]:starts[case] + lengths[case]]) for case in representative], dtype=np.intp)
+        self.case_node[case_codes[starts]] = nodes[variant_codes]
+        for node, count in zip(nodes, np.bincount(variant_codes)):
+            self.case_count[node] += int(count)
+        # The children are created after their parent, so the subtrees are summed from the last node
+        self.prefix_count = list(self.case_count)
+        for node in range(len(self.parent) - 1, self.ROOT, -1):
+            self.prefix_count[self.parent[node]] += self.prefix_count[node]
+
+    def __len__(self) -> int:
+        return len(self.parent)
+
+    def child(self, node: int, activity_code: int, create: bool = True) -> int:
+        """Return the child of a node with an activity.
+
+        Parameters
+        ----------
+        node : int
+            Parent node.
+        activity_code : int
+            Activity code of the child.
+        create : bool, Default: True
+            If True, the child is created if it is not in the trie.
+
+        Returns
+        -------
+        int
+            Child node, -1 if it is not in the trie and create is False.
+        """
+        child = self.__children.get((node, activity_code), -1)
+        if child < 0 and create:
+            child = len(self.parent)
+            self.__children[(node, activity_code)] = child
+            self.parent.append(node)
+            self.activity.append(activity_code)
+            self.depth.append(self.depth[node] + 1)
+            self.case_count.append(0)
+            self.prefix_count.append(0)
+            self.__child_nodes.append([])
+            self.__child_nodes[node].append(child)
+        return child
+
+    def insert(self, activity_codes: np.ndarray, node: int = ROOT) -> int:
+        """Return the node of a trace, the missing nodes are created.
+
+        Parameters
+        ----------
+        activity_codes : np.ndarray
+            Activity codes of the trace.
+        node : int, Default: ROOT
+            Node of the prefix of the trace.
+
+        Returns
+        -------
+        int
+            Node of the trace.
+        """
+        for activity_code in np.asarray(activity_codes).tolist():
+            node = self.child(node, activity_code)
+        return node
+
+    def find(self, activity_codes: np.ndarray) -> int:
+        """Return the node of a trace.
+
+        Parameters
+        ----------
+        activity_codes : np.ndarray
+            Activity codes of the trace.
+
+        Returns
+        -------
+        int
+            Node of the trace, -1 if the trace is not in the trie.
+        """
+        node = self.ROOT
+        for activity_code in np.asarray(activity_codes).tolist():
+            node = self.child(node, activity_code, create=False)
+            if node < 0:
+                break
+        return node
+
+    def path(self, node: int) -> list:
+        """Return the nodes from the root to a node.
+
+        Parameters
+        ----------
+        node : int
+            Node.
+
+        Returns
+        -------
+        list
+            Nodes from the first activity to the node, the root is not included.
+        """
+        nodes = []
+        while node > self.ROOT:
+            nodes.append(node)
+            node = self.parent[node]
+        return nodes[::-1]
+
+    def trace(self, node: int) -> list:
+        """Return the activity codes of a node.
+
+        Parameters
+        ----------
+        node : int
+            Node.
+
+        Returns
+        -------
+        list
+            Activity codes from the root to the node.
+        """
+        return [self.activity[child] for child in self.path(node)]
+
+    def trace_activities(self, node: int) -> list:
+        """Return the activity names of a node.
+
+        Parameters
+        ----------
+        node : int
+            Node.
+
+        Returns
+        -------
+        list
+            Activity names from the root to the node.
+        """
+        return self.__names[self.trace(node)].tolist()
+
+    def key(self, node: int) -> str:
+        """Return the variant key of a node.
+
+        Parameters
+        ----------
+        node : int
+            Node.
+
+        Returns
+        -------
+        str
+            Activities of the node joined by '->'.
+        """
+        if not (node in self.__keys):
+            self.__keys[node] = _variant_key(self.trace_activities(node))
+        return self.__keys[node]
+
+    def nodes_of_keys(self, keys: list) -> np.ndarray:
+        """Return the nodes of a list of variant keys.
+
+        Parameters
+        ----------
+        keys : list
+            List of variant keys.
+
+        Returns
+        -------
+        np.ndarray
+            Node of each key, -1 if the key is not a variant of the trie.
+        """
+        if self.__key_nodes is None:
+            self.__key_nodes = {self.key(node): node for node in self.variant_nodes().tolist()}
+        return np.array([self.__key_nodes.get(key, -1) for key in keys], dtype=np.intp)
+
+    def subtree(self, node: int) -> np.ndarray:
+        """Return the nodes of the subtree of a node.
+
+        Parameters
+        ----------
+        node : int
+            Node.
+
+        Returns
+        -------
+        np.ndarray
+            The node and its descendants.
+        """
+        nodes = [node]
+        for child in nodes:
+            nodes.extend(self.__child_nodes[child])
+        return np.array(nodes, dtype=np.intp)
+
+    def cases_with_prefix(self, activities: list) -> list:
+        """Return the cases whose trace starts with a list of activities.
+
+        Parameters
+        ----------
+        activities : list
+            List of activity names of the prefix.
+
+        Returns
+        -------
+        list
+            List of cases, sorted.
+        """
+        node = self.__prefix_node(activities)
+        if node < 0:
+            return []
+        return self.case_ids[np.isin(self.case_node, self.subtree(node))].tolist()
+
+    def count_with_prefix(self, activities: list) -> int:
+        """Return the number of cases whose trace starts with a list of activities.
+
+        Parameters
+        ----------
+        activities : list
+            List of activity names of the prefix.
+
+        Returns
+        -------
+        int
+            Number of cases.
+        """
+        node = self.__prefix_node(activities)
+        return self.prefix_count[node] if node >= 0 else 0
+
+    def __prefix_node(self, activities: list) -> int:
+        """Return the node of a list of activity names, -1 if it is not in the trie.
+        """
+        activity_codes = self.activities.get_indexer(pd.Index(activities, dtype=object))
+        return -1 if (activity_codes < 0).any() else self.find(activity_codes)
+
+    def node_statistics(self) -> pd.DataFrame:
+        """Return the case counts and the duration statistics of each node.
+
+        The duration of a case is the time in seconds from its first to its last event, the statistics of a node
+        are over the cases of the node. The prefix duration is the time in seconds from the first event of a case
+        to the event of the node, the statistics are over the cases starting with the prefix of the node.
+
+        Returns
+        -------
+        DataFrame
+            DataFrame indexed by node with the activity, depth, case_count, prefix_count, duration_<statistic>
+            and prefix_duration_<statistic> of each node. The activity of the root is None.
+        """
+        if self.__statistics is None:
+            self.__statistics = self.__node_statistics()
+        return self.__statistics
+
+    def __node_statistics(self) -> pd.DataFrame:
+        """Compute the statistics of node_statistics from the events of the trie.
+        """
+        names = np.r_[np.asarray(self.activities, dtype=object), None]
+        statistics = pd.DataFrame({'activity': names[self.activity], 'depth': self.depth,
+                                   'case_count': self.case_count, 'prefix_count': self.prefix_count})
+        positions = self.__positions
+        case_codes = self.__case_index.case_codes[positions]
+        starts, lengths = _case_segments(case_codes)
+        # Node of each event, from the path of the node of its case
+        nodes = self.variant_nodes()
+        variant = np.full(len(self), -1, dtype=np.intp)
+        variant[nodes] = np.arange(len(nodes))
+        paths = [self.path(node) for node in nodes.tolist()]
+        path_offsets = np.r_[0, np.cumsum([len(path) for path in paths])].astype(np.intp)
+        path_nodes = np.array([node for path in paths for node in path], dtype=np.intp)
+        segment_nodes = self.case_node[case_codes[starts]] if len(positions) else np.array([], dtype=np.intp)
+        offset = np.arange(len(positions)) - np.repeat(starts, lengths)
+        event_nodes = path_nodes[np.repeat(path_offsets[variant[segment_nodes]], lengths) + offset]
+        # Time from the first event of the case
+        time = pd.Series(self.__case_index.event_time[positions])
+        elapsed = (time - time.iloc[np.repeat(starts, lengths)].reset_index(drop=True)).dt.total_seconds()
+        durations = elapsed.iloc[starts + lengths - 1].reset_index(drop=True)
+        duration = durations.groupby(segment_nodes).agg(self.DURATION_STATISTICS).reindex(range(len(self)))
+        prefix_duration = elapsed.groupby(event_nodes).agg(self.DURATION_STATISTICS).reindex(range(len(self)))
+        return pd.concat([statistics, duration.add_prefix('duration_'), prefix_duration.add_prefix('prefix_duration_')], axis=1)
+
+    def move_case(self, case_code: int, node: int) -> None:
+        """Move a case to a node.
+
+        Parameters
+        ----------
+        case_code : int
+            Case code.
+        node : int
+            New node of the case.
+        """
+        old_node = self.case_node[case_code]
+        if old_node >= 0:
+            self.case_count[old_node] -= 1
+            for ancestor in [self.ROOT] + self.path(old_node):
+                self.prefix_count[ancestor] -= 1
+        self.case_node[case_code] = node
+        self.case_count[node] += 1
+        for ancestor in [self.ROOT] + self.path(node):
+            self.prefix_count[ancestor] += 1
+        self.__key_nodes = None
+        self.__statistics = None
+
+    def update(self, case_index: CaseIndex, case_codes: np.ndarray, first_new_position: int) -> tuple:
+        """Move the cases with new events of the case index to their new nodes.
+
+        If the new events of a case are after its events already in the trie, the case moves from its node
+        down to a descendant node. Otherwise (e.g. a new event before the last event) the trace is inserted again from the root.
+
+        Parameters
+        ----------
+        case_index : CaseIndex
+            Case-segmented index with the new events appended.
+        case_codes : np.ndarray
+            Case codes of the cases with new events.
+        first_new_position : int
+            Position of the first new event, the events before it are already in the trie.
+
+        Returns
+        -------
+        tuple
+            Old node (-1 for a new case) and new node of each case.
+        """
+        if not (np.array_equal(self.case_ids, case_index.case_ids)):
+            # The cases were recoded by the case index
+            case_node = np.full(len(case_index.case_ids), -1, dtype=np.intp)
+            case_node[case_index.case_codes_of(self.case_ids)] = self.case_node
+            self.case_node = case_node
+            self.case_ids = case_index.case_ids
+        self.activities = case_index.activities
+        self.__names = np.asarray(self.activities).astype(str)
+        self.__case_index = case_index
+        self.__positions = case_index.order[case_index.activity_codes[case_index.order] >= 0]
+        self.__statistics = None
+        old_nodes = self.case_node[case_codes].copy()
+        new_nodes = np.empty(len(case_codes), dtype=np.intp)
+        for i, (case_code, node) in enumerate(zip(np.asarray(case_codes).tolist(), old_nodes.tolist())):
+            start = case_index.starts[case_code]
+            positions = case_index.order[start:start + case_index.lengths[case_code]]
+            positions = positions[case_index.activity_codes[positions] >= 0]
+            depth = self.depth[node] if node >= 0 else 0
+            if node >= 0 and (positions[:depth] < first_new_position).all() and (positions[depth:] >= first_new_position).all():
+                new_node = self.insert(case_index.activity_codes[positions[depth:]], node)
+            else:
+                new_node = self.insert(case_index.activity_codes[positions])
+            self.move_case(case_code, new_node)
+            new_nodes[i] = new_node
+        return old_nodes, new_nodes
+
+    def variant_nodes(self, sort: bool = False) -> np.ndarray:
+        """Return the nodes with cases.
+
+        Parameters
+        ----------
+        sort : bool, Default: False
+            If True, the nodes are in the order of the Variants data, otherwise in the order of the nodes.
+
+        Returns
+        -------
+        np.ndarray
+            Nodes with at least one case.
+        """
+        nodes = np.flatnonzero(np.asarray(self.case_count) > 0)
+        if sort:
+            keys = [Variant.SPLIT_SEP.value.join(self.trace_activities(node)) for node in nodes.tolist()]
+            nodes = nodes[np.argsort(np.array(keys, dtype=object), kind='stable')]
+        return nodes
+
+    def to_frame(self) -> pd.DataFrame:
+        """Return the Variants data.
+
+        Returns
+        -------
+        DataFrame
+            DataFrame with the Variants data, as in variant_discovery.
+            Columns:
+            key: Activities of the variant joined by '->'.
+            cases: List of cases of the variant.
+            activities: List of activities of the variant.
+        """
+        nodes = self.variant_nodes()
+        if len(nodes) == 0:
+            return pd.DataFrame(columns=[Variant.KEY.value, Variant.CASES.value, Variant.ACTIVITIES.value])
+        # Cases of each variant, sorted by case
+        case_codes = np.flatnonzero(self.case_node >= 0)
+        case_codes = case_codes[np.argsort(self.case_node[case_codes], kind='stable')]
+        cases = np.split(self.case_ids[case_codes], np.cumsum(np.asarray(self.case_count)[nodes])[:-1])
+        keys = [Variant.SPLIT_SEP.value.join(self.trace_activities(node)) for node in nodes.tolist()]
+        variant = pd.DataFrame({Variant.KEY.value: keys,
+                                Variant.CASES.value: [case_list.tolist() for case_list in cases]})
+        variant = variant.sort_values(Variant.KEY.value, kind='stable').reset_index(drop=True)
+        variant[Variant.ACTIVITIES.value] = variant[Variant.KEY.value].str.split(Variant.SPLIT_SEP.value)
+        variant[Variant.KEY.value] = variant[Variant.KEY.value].str.replace(Variant.SPLIT_SEP.value, Variant.ACT_CONN.value, regex=False)
+        return variant
@@ -1,8 +1,9 @@
+import numpy as np
+
 from typing import Union, Optional
 
 from peppermining.filters.pepper_filter import PepperFilter
 from peppermining.peppermining import PepperMining
-from peppermining.utils.enum import EventColumn
 
 
 class CaseActivityFilter(PepperFilter):
@@ -14,6 +15,8 @@ class CaseActivityFilter(PepperFilter):
     -------
     get_filter
         Return the filters apply in the object.
+    get_filter_mask
+        Return the boolean mask of the cases selected by this filter.
 
     Example
     -------
@@ -43,9 +46,6 @@ class CaseActivityFilter(PepperFilter):
 
         self._activities = activities
         self._mode = mode
-        case_list = list(data.get_event_log()[(data.get_event_log()[EventColumn.ACTIVITY.value].isin(activities))][EventColumn.CASE_ID.value])
-        self.set_event_data_by_case_list(case_list)
-        self.set_case_data_by_case_list(case_list)
 
     def get_filter(self) -> str:
         """Return the filters apply in the object.
@@ -56,3 +56,16 @@ class CaseActivityFilter(PepperFilter):
             String with list the filters.
         """
         return f"{self.component.get_filter()} [Filter by activity {('', 'not')[self._mode == 'not contain']}({', '.join(self._activities)})]"
+
+    def get_filter_mask(self) -> np.ndarray:
+        """Return the boolean mask of the cases selected by this filter.
+
+        Returns
+        -------
+        np.ndarray
+            Boolean mask over the cases of the case index.
+        """
+        case_index = self.get_case_index()
+        # The cases with any of the activities
+        positions = np.flatnonzero(np.isin(case_index.activity_codes, case_index.activity_codes_of(self._activities)))
+        return self.mode_mask(case_index.case_mask_of_events(positions))
@@ -5,7 +5,6 @@ from typing import Union
 
 from peppermining.filters.pepper_filter import PepperFilter
 from peppermining.peppermining import PepperMining
-from peppermining.utils.enum import EventColumn
 
 
 class CaseBetweenTimeFilter(PepperFilter):
@@ -17,6 +16,8 @@ class CaseBetweenTimeFilter(PepperFilter):
     -------
     get_filter
         Return the filters apply in the object.
+    get_filter_mask
+        Return the boolean mask of the cases selected by this filter.
 
     Example
     -------
@@ -46,9 +47,6 @@ class CaseBetweenTimeFilter(PepperFilter):
         super().__init__(data)
         self._start_time = np.datetime64(start_time)
         self._end_time = np.datetime64(end_time)
-        grouped = data.get_event_log().groupby(EventColumn.CASE_ID.value)
-        self.event_data = grouped.filter(lambda x: (x[EventColumn.EVENT_TIME.value].min() >= self._start_time) and (x[EventColumn.EVENT_TIME.value].min() <= self._end_time))
-        self.case_data = data.get_cases()[data.get_cases().case_id.isin(list(self.event_data[EventColumn.CASE_ID.value].drop_duplicates()))]
 
     def get_filter(self) -> str:
         """Return the filters apply in the object.
@@ -59,3 +57,15 @@ class CaseBetweenTimeFilter(PepperFilter):
             String with list the filters.
         """
         return f"{self.component.get_filter()} [Filter cases between {self._start_time} and {self._end_time}]"
+
+    def get_filter_mask(self) -> np.ndarray:
+        """Return the boolean mask of the cases selected by this filter.
+
+        Returns
+        -------
+        np.ndarray
+            Boolean mask over the cases of the case index.
+        """
+        # The start time of each case is computed once in the case index
+        start_time = self.get_case_index().start_time
+        return (start_time >= self._start_time) & (start_time <= self._end_time)
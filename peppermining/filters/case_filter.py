@@ -1,3 +1,5 @@
+import numpy as np
+
 from typing import Union, Optional
 
 from peppermining.filters.pepper_filter import PepperFilter
@@ -13,6 +15,8 @@ class CaseFilter(PepperFilter):
     -------
     get_filter
         Return the filters apply in the object.
+    get_filter_mask
+        Return the boolean mask of the cases selected by this filter.
 
     Example
     -------
@@ -42,8 +46,6 @@ class CaseFilter(PepperFilter):
         # Filter event and case data by case ID
         self.cases = case_list
         self._mode = mode
-        self.set_event_data_by_case_list(case_list)
-        self.set_case_data_by_case_list(case_list)
 
     def get_filter(self) -> str:
         """Return the filters apply in the object.
@@ -54,3 +56,13 @@ class CaseFilter(PepperFilter):
             String with list the filters.
         """
         return f"{self.component.get_filter()} [Filter by case {('', 'not')[self._mode == 'not contain']}({len(self.cases)} cases)]"
+
+    def get_filter_mask(self) -> np.ndarray:
+        """Return the boolean mask of the cases selected by this filter.
+
+        Returns
+        -------
+        np.ndarray
+            Boolean mask over the cases of the case index.
+        """
+        return self.case_mask_by_case_list(self.cases)
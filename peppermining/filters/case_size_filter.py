@@ -1,9 +1,10 @@
+import numpy as np
+
 from decimal import Decimal
 from typing import Union, Optional
 
 from peppermining.filters.pepper_filter import PepperFilter
 from peppermining.peppermining import PepperMining
-from peppermining.utils.enum import EventColumn
 
 
 class CaseSizeFilter(PepperFilter):
@@ -15,6 +16,8 @@ class CaseSizeFilter(PepperFilter):
     -------
     get_filter
         Return the filters apply in the object.
+    get_filter_mask
+        Return the boolean mask of the cases selected by this filter.
 
     Example
     -------
@@ -44,9 +47,6 @@ class CaseSizeFilter(PepperFilter):
         super().__init__(data)
         self._min_size = min_size
         self._max_size = max_size
-        grouped = data.get_event_log().groupby(EventColumn.CASE_ID.value)
-        self.event_data = grouped.filter(lambda x: (x[EventColumn.CASE_ID.value].count() >= min_size) and (x[EventColumn.CASE_ID.value].count() <= max_size))
-        self.case_data = data.get_cases()[data.get_cases().case_id.isin(list(self.event_data[EventColumn.CASE_ID.value].drop_duplicates()))]
 
     def get_filter(self) -> str:
         """Return the filters apply in the object.
@@ -57,3 +57,15 @@ class CaseSizeFilter(PepperFilter):
             String with list the filters.
         """
         return f"{self.component.get_filter()} [Filter by case size ({self._min_size}, {self._max_size})]"
+
+    def get_filter_mask(self) -> np.ndarray:
+        """Return the boolean mask of the cases selected by this filter.
+
+        Returns
+        -------
+        np.ndarray
+            Boolean mask over the cases of the case index.
+        """
+        # The number of events of each case is the length of its segment in the case index
+        lengths = self.get_case_index().lengths
+        return (lengths >= float(self._min_size)) & (lengths <= float(self._max_size))
@@ -5,7 +5,6 @@ from typing import Union, Optional
 
 from peppermining.filters.pepper_filter import PepperFilter
 from peppermining.peppermining import PepperMining
-from peppermining.utils.enum import EventColumn
 
 
 class CaseStartActivityFilter(PepperFilter):
@@ -17,6 +16,8 @@ class CaseStartActivityFilter(PepperFilter):
     -------
     get_filter
         Return the filters apply in the object.
+    get_filter_mask
+        Return the boolean mask of the cases selected by this filter.
 
     Example
     -------
@@ -45,14 +46,6 @@ class CaseStartActivityFilter(PepperFilter):
         super().__init__(data)
         self._activities = activities
         self._mode = mode
-        # Data preparation
-        eventlog = data.get_event_log().copy()
-        eventlog['prev_activity'] = eventlog.groupby(EventColumn.CASE_ID.value).activity.shift(1)
-        eventlog = eventlog.replace(np.nan, None)
-        # Filter activities
-        case_list = list(eventlog[(eventlog['prev_activity'].isnull()) & (eventlog[EventColumn.ACTIVITY.value].isin(activities))][EventColumn.CASE_ID.value])
-        self.set_event_data_by_case_list(case_list)
-        self.set_case_data_by_case_list(case_list)
 
     def get_filter(self) -> str:
         """Return the filters apply in the object.
@@ -63,3 +56,15 @@ class CaseStartActivityFilter(PepperFilter):
             String with list the filters.
         """
         return f"{self.component.get_filter()} [Filter by START activity {('', 'not')[self._mode == 'not contain']}({', '.join(self._activities)})]"
+
+    def get_filter_mask(self) -> np.ndarray:
+        """Return the boolean mask of the cases selected by this filter.
+
+        Returns
+        -------
+        np.ndarray
+            Boolean mask over the cases of the case index.
+        """
+        case_index = self.get_case_index()
+        # The start activity of each case
+        return self.mode_mask(np.isin(case_index.activity_codes[case_index.first_position], case_index.activity_codes_of(self._activities)))
@@ -1,11 +1,30 @@
-from typing import Union
+import numpy as np
+import pandas as pd
+
+from typing import Union, Optional
 
 from peppermining.pepper import Pepper
+from peppermining.discovery.dfg import DFG
+from peppermining.discovery.variant_trie import VariantTrie
+from peppermining.utils.enum import EventColumn
+from peppermining.utils.case_index import CaseIndex
+from peppermining.utils.kpi_cache import KpiCache
+from peppermining.utils.parallel_backend import ParallelBackend
 
 
 class PepperFilter(Pepper):
     """ The PepperFilter declares common operations for the Filters of PepperMining.
 
+    The filters are lazy. The constructor of a filter only keeps its parameters, a chain of filters is a filter plan.
+    The plan is evaluated when get_event_log or get_cases is called: the masks of all filters of the chain are combined
+    in one boolean case mask, and it is applied once to the event logs and cases of PepperMining.
+    The intermediate filters of a chain never copy the event logs.
+
+    The masks are boolean arrays over the cases of the case index, so they are combined with cheap array operations:
+    a chain of filters is the AND of the masks, the modality 'not contain' is the NOT of the mask,
+    and a list of activities selects the cases with any of the activities (OR).
+    The plan is evaluated again when the data version of PepperMining changes, e.g. after append_events.
+
     PepperMining has various specific methods to filter an event log:
     (1) Case Filter: The case filter keeps only the cases included in a list.
     (2) Case Size Filter: The case size filter keeps only the cases in the log with a number of events included in a range specified.
@@ -21,6 +40,8 @@ class PepperFilter(Pepper):
         PepperMining or PepperFilter object.
     _mode : str
         Modality of filtering ('contain' or 'not contain').
+    _data_version : int
+        Data version of PepperMining of the evaluation of the filter plan.
 
     Methods
     -------
@@ -28,6 +49,38 @@ class PepperFilter(Pepper):
         The Decorator delegates all work to the wrapped component.
     get_filter
         Decorator (get_filter) that call parent implementation of the operation, instead of calling the wrapped object directly.
+    get_event_log
+        Return the Event logs data of the filter plan.
+    get_cases
+        Return the Cases data of the filter plan.
+    get_activities
+        Return the Activities data of the filter plan.
+    get_variants
+        Return the Variants data of the filter plan.
+    get_dfg
+        Return the Directly-Follows Graph of the filter plan.
+    get_variant_trie
+        Return the prefix tree of the traces of the filter plan.
+    get_variant_id
+        Return the variant of each row of the Cases data of the filter plan.
+    get_root
+        Return the PepperMining object of the filter plan.
+    get_case_mask
+        Return the boolean mask of the cases selected by the filter plan.
+    get_filter_mask
+        Return the boolean mask of the cases selected by this filter.
+    case_mask_by_case_list
+        Return the boolean mask of the cases included in case list.
+    mode_mask
+        Return the boolean mask in the modality of filtering.
+    get_activity_dictionary
+        Return the activity dictionary of the wrapped object.
+    get_case_index
+        Return the case-segmented index of the wrapped object.
+    get_kpi_cache
+        Return the KPI cache of the wrapped object.
+    get_kpi_backend
+        Return the process pool of the KPI aggregations of the wrapped object.
     set_event_data_by_case_list
         Filters the event log that keeps only the cases included in case list.
     set_case_data_by_case_list
@@ -52,6 +105,10 @@ class PepperFilter(Pepper):
         super().__init__()
         self._component = pepper_data
         self._mode = 'contain'
+        self._case_list = None
+        self._case_mask = None
+        self._evaluated = False
+        self._data_version = self.get_root().data_version
 
     @property
     def component(self) -> Pepper:
@@ -74,24 +131,282 @@ class PepperFilter(Pepper):
         """
         return self._component.get_filter()
 
+    def get_event_log(self) -> pd.DataFrame:
+        """Return the Event logs data of the filter plan.
+
+        The filter plan is evaluated in the first call.
+
+        Returns
+        -------
+        DataFrame
+            DataFrame with the event logs data.
+        """
+        self.__evaluate()
+        return self.event_data
+
+    def get_cases(self, kpi: Optional[list] = None) -> pd.DataFrame:
+        """Return the Cases data of the filter plan.
+
+        The filter plan is evaluated in the first call.
+
+        Parameters
+        ----------
+        kpi : list(str)
+            The a KPIs list. Choose the KPIs allow for the case data.
+            kpi = ['NumberOfEvents', 'NumberOfActivities', 'ThroughputTime', 'Rework']
+
+        Returns
+        -------
+        DataFrame
+            DataFrame with the Cases data.
+        """
+        self.__evaluate()
+        return super().get_cases(kpi)
+
+    def get_activities(self, kpi: Optional[list] = None) -> pd.DataFrame:
+        """Return the Activities data of the filter plan.
+
+        Parameters
+        ----------
+        kpi : list(str)
+            The a KPIs list. Choose the KPIs allow for the activities data.
+            kpi = ['NumberOfEvents', 'NumberOfCases', 'ThroughputTime', 'Rework']
+
+        Returns
+        -------
+        DataFrame
+            DataFrame with the Activities data.
+        """
+        self.__refresh()
+        return super().get_activities(kpi)
+
+    def get_variants(self, kpi: Optional[list] = None) -> pd.DataFrame:
+        """Return the Variants data of the filter plan.
+
+        Parameters
+        ----------
+        kpi: list(str)
+            The a KPIs list. Choose the KPIs allow for the variants.
+            kpi = ['NumberOfEvents', 'NumberOfActivities', 'NumberOfCases', 'ThroughputTime']
+
+        Returns
+        -------
+        DataFrame
+            DataFrame with the Variants data.
+        """
+        self.__refresh()
+        return super().get_variants(kpi)
+
+    def get_dfg(self) -> DFG:
+        """Return the Directly-Follows Graph of the filter plan.
+
+        Returns
+        -------
+        DFG
+            Directly-Follows Graph of the event logs of the filter plan.
+        """
+        self.__refresh()
+        return super().get_dfg()
+
+    def get_variant_trie(self) -> VariantTrie:
+        """Return the prefix tree of the traces of the filter plan.
+
+        Returns
+        -------
+        VariantTrie
+            Prefix tree of the traces of the cases of the filter plan.
+        """
+        self.__refresh()
+        return super().get_variant_trie()
+
+    def get_variant_id(self) -> np.ndarray:
+        """Return the variant of each row of the Cases data of the filter plan.
+
+        Returns
+        -------
+        np.ndarray
+            Variant id of each row of the Cases data, -1 for the cases without events.
+        """
+        self.__refresh()
+        return super().get_variant_id()
+
+    def get_root(self) -> Pepper:
+        """Return the PepperMining object of the filter plan.
+
+        Returns
+        -------
+        Pepper
+            PepperMining object.
+        """
+        return self._component.get_root()
+
+    def get_case_mask(self) -> np.ndarray:
+        """Return the boolean mask of the cases selected by the filter plan.
+
+        The mask of the wrapped object is combined with the mask of this filter.
+
+        Returns
+        -------
+        np.ndarray
+            Boolean mask over the cases of the case index.
+        """
+        self.__refresh()
+        if self._case_mask is None:
+            self._case_mask = self._component.get_case_mask() & self.get_filter_mask()
+        return self._case_mask
+
+    def get_filter_mask(self) -> np.ndarray:
+        """Return the boolean mask of the cases selected by this filter.
+
+        The mask is computed on the event logs of PepperMining, every filter selects the cases by a property of the case.
+        Each Filter implements this method. By default, it is the mask of the case list informed in set_event_data_by_case_list.
+
+        Returns
+        -------
+        np.ndarray
+            Boolean mask over the cases of the case index.
+        """
+        if self._case_list is None:
+            return self._component.get_case_mask()
+        return self.case_mask_by_case_list(self._case_list)
+
+    def case_mask_by_case_list(self, case_list: Union[int, str]) -> np.ndarray:
+        """Return the boolean mask of the cases included in case list.
+
+        The mask is inverted in the modality 'not contain'.
+
+        Parameters
+        ----------
+        case_list: Union[int, str]
+            List of cases that gonna filter.
+
+        Returns
+        -------
+        np.ndarray
+            Boolean mask over the cases of the case index.
+        """
+        return self.mode_mask(self.get_case_index().case_mask(case_list))
+
+    def mode_mask(self, mask: np.ndarray) -> np.ndarray:
+        """Return the boolean mask in the modality of filtering.
+
+        Parameters
+        ----------
+        mask: np.ndarray
+            Boolean mask over the cases of the case index with the cases that contain the filter condition.
+
+        Returns
+        -------
+        np.ndarray
+            The same mask in the modality 'contain', the inverted mask (NOT) in the modality 'not contain'.
+        """
+        return (mask, ~mask)[self._mode == 'not contain']
+
+    def get_activity_dictionary(self) -> pd.Index:
+        """Return the activity dictionary of the wrapped object.
+
+        Returns
+        -------
+        Index
+            Index with the activities.
+        """
+        return self._component.get_activity_dictionary()
+
+    def get_case_index(self) -> CaseIndex:
+        """Return the case-segmented index of the wrapped object.
+
+        Returns
+        -------
+        CaseIndex
+            Case-segmented index of the event logs.
+        """
+        return self._component.get_case_index()
+
+    def get_kpi_cache(self) -> KpiCache:
+        """Return the KPI cache of the wrapped object.
+
+        Returns
+        -------
+        KpiCache
+            Memoized KPI results of the event logs.
+        """
+        return self._component.get_kpi_cache()
+
+    def get_kpi_backend(self) -> ParallelBackend:
+        """Return the process pool of the KPI aggregations of the wrapped object.
+
+        Returns
+        -------
+        ParallelBackend
+            Process pool partitioned by case, None if the KPIs are aggregated in this process.
+        """
+        return self._component.get_kpi_backend()
+
     def set_event_data_by_case_list(self, case_list: Union[int, str]) -> None:
         """Filters the event log that keeps only the cases included in case list.
 
+        The case list is kept in the filter, the event log is filtered when the filter plan is evaluated.
+
         Parameters
         ----------
         case_list: Union[int, str]
             List of cases that gonna filter.
         """
-        self.event_data = self._component.get_event_log()[(self._component.get_event_log().case_id.isin(case_list),
-                                                           ~self._component.get_event_log().case_id.isin(case_list))[self._mode == 'not contain']]
+        self._case_list = case_list
+        self.__reset()
 
     def set_case_data_by_case_list(self, case_list: Union[int, str]) -> None:
         """Filters the cases data that included in case list.
 
+        The case list is kept in the filter, the cases data is filtered when the filter plan is evaluated.
+
         Parameters
         ----------
         case_list: Union[int, str]
             List of cases that gonna filter.
         """
-        self.case_data = self._component.get_cases()[(self._component.get_cases().case_id.isin(case_list),
-                                                      ~self._component.get_cases().case_id.isin(case_list))[self._mode == 'not contain']]
+        self._case_list = case_list
+        self.__reset()
+
+    def __reset(self) -> None:
+        """Reset the evaluation of the filter plan and the data computed from it.
+        """
+        self._case_mask = None
+        self._evaluated = False
+        self.activity_data = pd.DataFrame()
+        self.variant_data = pd.DataFrame()
+        self.dfg_data = None
+        self.variant_trie = None
+        self.variant_id = None
+
+    def __refresh(self) -> None:
+        """Reset the evaluation of the filter plan if the data version of PepperMining changed.
+
+        The masks are over the case codes of the case index, so they are computed again after the data changes.
+        """
+        data_version = self.get_root().data_version
+        if self._data_version != data_version:
+            self.__reset()
+            self._data_version = data_version
+
+    def __evaluate(self) -> None:
+        """Evaluate the filter plan.
+
+        The case mask of the plan is applied once to the event logs and cases of PepperMining.
+        The rows keep the index of PepperMining.
+        """
+        self.__refresh()
+        if self._evaluated:
+            return
+        root = self.get_root()
+        case_index = root.get_case_index()
+        if case_index is None:
+            self.event_data = root.get_event_log()
+            self.case_data = root.get_cases()
+        else:
+            mask = self.get_case_mask()
+            event_log = root.get_event_log()
+            self.event_data = event_log[case_index.event_mask(event_log, mask)]
+            cases = root.get_cases()
+            self.case_data = cases[case_index.cases_mask(cases[EventColumn.CASE_ID.value], mask)]
+        self._evaluated = True
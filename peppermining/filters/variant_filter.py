@@ -1,8 +1,11 @@
+import numpy as np
+import pandas as pd
+
 from typing import Union, Optional
 
 from peppermining.filters.pepper_filter import PepperFilter
 from peppermining.peppermining import PepperMining
-from peppermining.utils.enum import EventColumn, Variant
+from peppermining.utils.enum import Variant
 
 
 class VariantFilter(PepperFilter):
@@ -12,8 +15,12 @@ class VariantFilter(PepperFilter):
 
     Methods
     -------
+    variant
+        Return the variants of the wrapped object selected by the filter.
     get_filter
         Return the filters apply in the object.
+    get_filter_mask
+        Return the boolean mask of the cases selected by this filter.
 
     Example
     -------
@@ -45,14 +52,18 @@ class VariantFilter(PepperFilter):
         super().__init__(data)
         self._mode = mode
         self.variant_list = variant_list
-        # Data preparation
+
+    @property
+    def variant(self) -> pd.DataFrame:
+        """Return the variants of the wrapped object selected by the filter.
+
+        Returns
+        -------
+        DataFrame
+            DataFrame with the Variants data.
+        """
         variants = self._component.get_variants().copy()
-        self.variant = variants[(variants[Variant.KEY.value].isin(variant_list), ~variants[Variant.KEY.value].isin(variant_list))[self._mode == 'not contain']]
-        variants = variants.explode(Variant.CASES.value).reset_index(drop=True).rename(columns={Variant.CASES.value: EventColumn.CASE_ID.value})[[Variant.KEY.value, EventColumn.CASE_ID.value]]
-        # Filter event and case data by Variant
-        case_list = list(variants[variants[Variant.KEY.value].isin(variant_list)][EventColumn.CASE_ID.value])
-        self.set_event_data_by_case_list(case_list)
-        self.set_case_data_by_case_list(case_list)
+        return variants[(variants[Variant.KEY.value].isin(self.variant_list), ~variants[Variant.KEY.value].isin(self.variant_list))[self._mode == 'not contain']]
 
     def get_filter(self) -> str:
         """Return the filters apply in the object.
@@ -63,3 +74,19 @@ class VariantFilter(PepperFilter):
             String with list the filters.
         """
         return f"{self.component.get_filter()} [Filter by variant {('', 'not')[self._mode == 'not contain']}({len(self.variant_list)} variants)]"
+
+    def get_filter_mask(self) -> np.ndarray:
+        """Return the boolean mask of the cases selected by this filter.
+
+        The variants of a case do not depend on the others filters, so the variant ids of PepperMining are used:
+        the cases selected are the cases with the variant id of a variant of the list.
+
+        Returns
+        -------
+        np.ndarray
+            Boolean mask over the cases of the case index.
+        """
+        root = self.get_root()
+        selected = root.get_variants()[Variant.KEY.value].isin(self.variant_list).to_numpy()
+        case_variants = root.get_case_variants()
+        return self.mode_mask((case_variants >= 0) & selected[case_variants])
@@ -1,6 +1,6 @@
 import pandas as pd
 
-from peppermining.kpi.pepper_kpi import PepperKpi
+from peppermining.kpi.pepper_kpi import PepperKpi, cached_kpi
 
 
 class AverageEventsPerCase(PepperKpi):
@@ -35,6 +35,7 @@ class AverageEventsPerCase(PepperKpi):
         self._kpi_id = "AverageEventsPerCase"
         self._kpi_name = "Average events per case"
 
+    @cached_kpi
     def get_kpi(self) -> pd.DataFrame:
         """Return summary of KPI.
 
@@ -0,0 +1,509 @@
+import numpy as np
+import pandas as pd
+
+from peppermining.kpi.pepper_kpi import PepperKpi
+from peppermining.kpi.number_of_cases import NumberOfCases
+from peppermining.kpi.throughput_time import ThroughputTime
+from peppermining.kpi.average_events_per_case import AverageEventsPerCase
+from peppermining.kpi.number_of_events import NumberOfEvents
+from peppermining.kpi.number_of_activities import NumberOfActivities
+from peppermining.kpi.rework import Rework
+from peppermining.utils.enum import EventColumn, Variant
+
+# Aggregations required by each KPI per grain.
+# A KPI without aggregations for a grain is not available for that grain.
+KPI_AGGREGATIONS = {
+    'NumberOfEvents': {'summary': ['size'], 'case': ['size'], 'activity': ['size'], 'variant': ['size']},
+    'NumberOfActivities': {'summary': ['number_of_activities'], 'case': ['nunique_activity'], 'variant': ['length']},
+    'NumberOfCases': {'summary': ['number_of_cases'], 'activity': ['nunique_case'], 'variant': ['number_of_cases']},
+    'AverageEventsPerCase': {'summary': ['size', 'number_of_cases']},
+    'ThroughputTime': {'summary': ['throughput_time'], 'case': ['throughput_time'], 'activity': ['throughput_time'], 'variant': ['throughput_time']},
+    'Rework': {'summary': ['rework'], 'case': ['rework'], 'activity': ['size', 'nunique_case']},
+}
+
+KPI_CLASSES = {kpi.__name__: kpi for kpi in [NumberOfEvents, NumberOfActivities, NumberOfCases, AverageEventsPerCase, ThroughputTime, Rework]}
+
+
+class KpiEngine():
+    """Single-pass aggregation engine for the KPIs of Pepper Mining.
+
+    The engine collects the aggregations that every requested KPI needs in a grain (case, activity, variant or summary),
+    computes all of them in a single pass over the event logs with the case index,
+    and assembles the KPI columns of the grain in one DataFrame.
+    The aggregations of a grain are computed once and shared by all KPIs of the engine.
+    The summaries of groups of cases, e.g. the cases of each violation, are grouped aggregations of the aggregations per case.
+    If the component has a parallel backend, the aggregations per case and per activity of large event logs
+    are computed by a process pool partitioned by case.
+
+    Attributes
+    ----------
+    _component
+        PepperMining or PepperFilter object.
+
+    Methods
+    -------
+    get_summary
+        Return the summary of a list of KPIs.
+    get_cases
+        Return the KPI values per case of a list of KPIs.
+    get_activities
+        Return the KPI values per activity of a list of KPIs.
+    get_variants
+        Return the KPI values per variant of a list of KPIs.
+    get_group_summary
+        Return the summary of a list of KPIs for each group of cases.
+    summary_aggregates
+        Return the aggregations of the event logs.
+    case_aggregates
+        Return the aggregations per case.
+    activity_aggregates
+        Return the aggregations per activity.
+    variant_aggregates
+        Return the aggregations per variant.
+    group_aggregates
+        Return the aggregations of each group of cases.
+
+    Example
+    -------
+    >>> pm = PepperMining()
+    >>> pm.read_event_log_csv("tests/data/eventlog-example.csv", separator=';', format_date='%d/%m/%Y %H:%M')
+    >>> engine = KpiEngine(pm)
+    >>> engine.get_cases(['NumberOfEvents', 'ThroughputTime', 'Rework'])
+    """
+
+    def __init__(self, pepper_data):
+        """KpiEngine constructor.
+
+        Parameters
+        ----------
+        pepper_data
+            It this should be a PepperMining or PepperFilter object.
+        """
+        self._component = pepper_data
+        self.__aggregates = {}
+
+    def get_summary(self, kpi_list: list) -> pd.DataFrame:
+        """Return the summary of a list of KPIs.
+
+        Parameters
+        ----------
+        kpi_list : list(str)
+            The a KPIs list.
+
+        Returns
+        -------
+        DataFrame
+            DataFrame with the KPI values, the last KPI of the list is the first row.
+        """
+        aggregates = self.summary_aggregates(self.__aggregations(kpi_list, 'summary'))
+        summary = []
+        for kpi_id in kpi_list:
+            kpi = self.__kpi(kpi_id)
+            if kpi_id == 'ThroughputTime':
+                summary.append(kpi.get_statistics_df(aggregates['throughput_time']))
+            elif kpi_id == 'AverageEventsPerCase':
+                summary.append(kpi.get_summary_df(aggregates['size'] / aggregates['number_of_cases']))
+            else:
+                summary.append(kpi.get_summary_df(aggregates[KPI_AGGREGATIONS[kpi_id]['summary'][0]]))
+        return pd.concat(summary[::-1]) if summary else pd.DataFrame()
+
+    def get_cases(self, kpi_list: list) -> pd.DataFrame:
+        """Return the KPI values per case of a list of KPIs.
+
+        Parameters
+        ----------
+        kpi_list : list(str)
+            The a KPIs list.
+
+        Returns
+        -------
+        DataFrame
+            DataFrame with the column 'case_id' and a column for each KPI.
+        """
+        aggregates = self.case_aggregates(self.__aggregations(kpi_list, 'case'))
+        df = aggregates[[EventColumn.CASE_ID.value]].copy()
+        for kpi_id in kpi_list:
+            if kpi_id == 'NumberOfEvents':
+                df[kpi_id] = aggregates['size']
+            elif kpi_id == 'NumberOfActivities':
+                df[kpi_id] = aggregates['nunique_activity']
+            elif kpi_id == 'ThroughputTime':
+                df[kpi_id] = aggregates['throughput_time']
+            elif kpi_id == 'Rework':
+                df[kpi_id] = aggregates['rework']
+        return df
+
+    def get_activities(self, kpi_list: list) -> pd.DataFrame:
+        """Return the KPI values per activity of a list of KPIs.
+
+        Parameters
+        ----------
+        kpi_list : list(str)
+            The a KPIs list.
+
+        Returns
+        -------
+        DataFrame
+            DataFrame with the column 'activity' and the columns of each KPI.
+        """
+        aggregates = self.activity_aggregates(self.__aggregations(kpi_list, 'activity'))
+        df = aggregates[[EventColumn.ACTIVITY.value]].copy()
+        for kpi_id in kpi_list:
+            if kpi_id == 'NumberOfEvents':
+                df[kpi_id] = aggregates['size']
+            elif kpi_id == 'NumberOfCases':
+                df[kpi_id] = aggregates['nunique_case']
+            elif kpi_id == 'Rework':
+                df[kpi_id] = aggregates['size'] - aggregates['nunique_case']
+            elif kpi_id == 'ThroughputTime':
+                for column in ThroughputTime.STATISTICS:
+                    df[kpi_id + column] = aggregates[kpi_id + column]
+        return df
+
+    def get_variants(self, kpi_list: list) -> pd.DataFrame:
+        """Return the KPI values per variant of a list of KPIs.
+
+        Parameters
+        ----------
+        kpi_list : list(str)
+            The a KPIs list.
+
+        Returns
+        -------
+        DataFrame
+            DataFrame with the column 'key' and the columns of each KPI.
+        """
+        aggregates = self.variant_aggregates(self.__aggregations(kpi_list, 'variant'))
+        df = aggregates[[Variant.KEY.value]].copy()
+        for kpi_id in kpi_list:
+            if kpi_id == 'NumberOfEvents':
+                df[kpi_id] = aggregates['size']
+            elif kpi_id == 'NumberOfActivities':
+                df[kpi_id] = aggregates['length']
+            elif kpi_id == 'NumberOfCases':
+                df[kpi_id] = aggregates['number_of_cases']
+            elif kpi_id == 'ThroughputTime':
+                for column in ThroughputTime.STATISTICS:
+                    df[kpi_id + column] = aggregates[kpi_id + column]
+        return df
+
+    def get_group_summary(self, kpi_list: list, offsets: np.ndarray, case_ids: np.ndarray) -> pd.DataFrame:
+        """Return the summary of a list of KPIs for each group of cases.
+
+        The KPI values of a group are the values of get_summary for a CaseFilter of the cases of the group,
+        and they are computed for all groups at once.
+
+        Parameters
+        ----------
+        kpi_list : list(str)
+            The a KPIs list.
+        offsets : np.ndarray
+            Offset in case_ids of the cases of each group, and the number of cases at the end.
+        case_ids : np.ndarray
+            Cases of all groups, the cases of the group i are case_ids[offsets[i]:offsets[i + 1]].
+
+        Returns
+        -------
+        DataFrame
+            DataFrame with a row per group and a column per KPI value, in the order of the rows of get_summary.
+        """
+        aggregates = self.group_aggregates(self.__aggregations(kpi_list, 'summary'), offsets, case_ids)
+        columns = {}
+        for kpi_id in kpi_list[::-1]:
+            if kpi_id == 'ThroughputTime':
+                for column in ['Max', 'Min', 'Mean', 'Median', 'Sum', 'StDev']:
+                    columns[kpi_id + column] = aggregates['throughput_time'][column].to_numpy()
+            elif kpi_id == 'AverageEventsPerCase':
+                columns[kpi_id] = aggregates['size'] / np.where(aggregates['number_of_cases'] > 0, aggregates['number_of_cases'], np.nan)
+            else:
+                columns[kpi_id] = aggregates[KPI_AGGREGATIONS[kpi_id]['summary'][0]]
+        # The values of the summary are one column, so the KPIs of a group have the same type
+        dtype = np.result_type(*[values.dtype for values in columns.values()]) if columns else np.float64
+        return pd.DataFrame({column: values.astype(dtype) for column, values in columns.items()}, index=range(len(offsets) - 1))
+
+    def summary_aggregates(self, aggregations: list) -> dict:
+        """Return the aggregations of the event logs.
+
+        Parameters
+        ----------
+        aggregations : list(str)
+            Aggregations: 'size', 'number_of_activities', 'number_of_cases', 'throughput_time', 'rework'.
+
+        Returns
+        -------
+        dict
+            Value of each aggregation, the 'throughput_time' is the Series of the throughput time per case.
+        """
+        aggregates = {}
+        if 'size' in aggregations:
+            aggregates['size'] = len(self._component.get_event_log())
+        if 'number_of_activities' in aggregations:
+            aggregates['number_of_activities'] = len(self.activity_aggregates([]))
+        if 'number_of_cases' in aggregations:
+            aggregates['number_of_cases'] = len(self._component.get_cases())
+        if 'throughput_time' in aggregations:
+            aggregates['throughput_time'] = self.case_aggregates(['throughput_time'])['throughput_time']
+        if 'rework' in aggregations:
+            aggregates['rework'] = self.case_aggregates(['rework'])['rework'].sum()
+        return aggregates
+
+    def case_aggregates(self, aggregations: list) -> pd.DataFrame:
+        """Return the aggregations per case.
+
+        The aggregations are computed in one pass over the case codes of the event logs.
+        The filters keep whole cases, so the segments of the case index are the cases of the event logs.
+
+        Parameters
+        ----------
+        aggregations : list(str)
+            Aggregations: 'size', 'nunique_activity', 'throughput_time', 'rework'.
+
+        Returns
+        -------
+        DataFrame
+            DataFrame with the column 'case_id' and a column for each aggregation, sorted by case.
+        """
+        if 'case' not in self.__aggregates:
+            self.__aggregates['case'] = self.__case_aggregates()
+        return self.__aggregates['case'][[EventColumn.CASE_ID.value] + [aggregation for aggregation in ['size', 'nunique_activity', 'throughput_time', 'rework'] if aggregation in aggregations]]
+
+    def activity_aggregates(self, aggregations: list) -> pd.DataFrame:
+        """Return the aggregations per activity.
+
+        The aggregations are computed in one pass over the activity codes of the event logs.
+
+        Parameters
+        ----------
+        aggregations : list(str)
+            Aggregations: 'size', 'nunique_case', 'throughput_time'.
+
+        Returns
+        -------
+        DataFrame
+            DataFrame with the column 'activity' and the columns of each aggregation, sorted by activity code.
+        """
+        if 'activity' not in self.__aggregates:
+            self.__aggregates['activity'] = self.__activity_aggregates()
+        columns = [aggregation for aggregation in ['size', 'nunique_case'] if aggregation in aggregations]
+        if 'throughput_time' in aggregations:
+            columns += ['ThroughputTime' + column for column in ThroughputTime.STATISTICS]
+        return self.__aggregates['activity'][[EventColumn.ACTIVITY.value] + columns]
+
+    def variant_aggregates(self, aggregations: list) -> pd.DataFrame:
+        """Return the aggregations per variant.
+
+        The aggregations per case are aggregated in one pass over the cases of the variants.
+
+        Parameters
+        ----------
+        aggregations : list(str)
+            Aggregations: 'size', 'length', 'number_of_cases', 'throughput_time'.
+
+        Returns
+        -------
+        DataFrame
+            DataFrame with the column 'key' and the columns of each aggregation.
+        """
+        if 'variant' not in self.__aggregates:
+            self.__aggregates['variant'] = self.__variant_aggregates()
+        columns = [aggregation for aggregation in ['size', 'length', 'number_of_cases'] if aggregation in aggregations]
+        if 'throughput_time' in aggregations:
+            columns += ['ThroughputTime' + column for column in ThroughputTime.STATISTICS]
+        return self.__aggregates['variant'][[Variant.KEY.value] + columns]
+
+    def group_aggregates(self, aggregations: list, offsets: np.ndarray, case_ids: np.ndarray) -> dict:
+        """Return the aggregations of each group of cases.
+
+        The groups are expanded to a long table of the pairs (group, case) of the cases of the event logs, each pair once.
+        Each aggregation is a grouped aggregation over this table of the aggregations per case,
+        and the number of activities is counted over the pairs (group, activity) of the activities of the cases.
+
+        Parameters
+        ----------
+        aggregations : list(str)
+            Aggregations: 'size', 'number_of_activities', 'number_of_cases', 'throughput_time', 'rework'.
+        offsets : np.ndarray
+            Offset in case_ids of the cases of each group, and the number of cases at the end.
+        case_ids : np.ndarray
+            Cases of all groups, the cases of the group i are case_ids[offsets[i]:offsets[i + 1]].
+
+        Returns
+        -------
+        dict
+            Array of each aggregation by group, the 'throughput_time' is the DataFrame of the statistics
+            of the throughput time per case by group.
+        """
+        n_groups = len(offsets) - 1
+        case_index = self._component.get_case_index()
+        n_cases = max(len(case_index.case_ids), 1)
+        # Long table of the pairs (group, row of the aggregations per case)
+        case = self.case_aggregates(['size', 'nunique_activity', 'throughput_time', 'rework'])
+        case_rows = np.full(n_cases, -1, dtype=np.intp)
+        case_rows[case_index.case_codes_of(case[EventColumn.CASE_ID.value])] = np.arange(len(case))
+        codes = case_index.case_codes_of(pd.Index(case_ids))
+        codes = np.where(codes >= 0, case_rows[codes], -1)
+        groups = np.repeat(np.arange(n_groups, dtype=np.int64), np.diff(offsets))
+        pairs = np.unique(groups[codes >= 0] * len(case) + codes[codes >= 0])
+        groups, rows = pairs // max(len(case), 1), pairs % max(len(case), 1)
+        aggregates = {}
+        if 'size' in aggregations:
+            aggregates['size'] = np.bincount(groups, weights=case['size'].to_numpy()[rows], minlength=n_groups).astype(np.int64)
+        if 'number_of_cases' in aggregations:
+            # Rows of the Cases data of each case
+            cases = case_index.case_codes_of(self._component.get_cases()[EventColumn.CASE_ID.value])
+            cases = case_rows[cases[cases >= 0]]
+            number_of_rows = np.bincount(cases[cases >= 0], minlength=len(case))
+            aggregates['number_of_cases'] = np.bincount(groups, weights=number_of_rows[rows], minlength=n_groups).astype(np.int64)
+        if 'number_of_activities' in aggregations:
+            aggregates['number_of_activities'] = self.__group_nunique_activity(case_rows, len(case), groups, rows, n_groups)
+        if 'throughput_time' in aggregations:
+            statistics = case['throughput_time'].iloc[rows].reset_index(drop=True).groupby(groups)
+            statistics = statistics.agg([(column, statistic) for column, statistic in ThroughputTime.STATISTICS.items()]).reindex(range(n_groups))
+            statistics['Sum'] = statistics['Sum'].fillna(0)
+            aggregates['throughput_time'] = statistics
+        if 'rework' in aggregations:
+            aggregates['rework'] = np.bincount(groups, weights=case['rework'].to_numpy()[rows], minlength=n_groups).astype(np.int64)
+        return aggregates
+
+    def __group_nunique_activity(self, case_rows: np.ndarray, n_rows: int, groups: np.ndarray, rows: np.ndarray, n_groups: int) -> np.ndarray:
+        """Return the number of distinct activities of each group of cases.
+
+        The pairs (case, activity) of the events are expanded over the pairs (group, case), and the pairs (group, activity) are counted once.
+        """
+        case_index = self._component.get_case_index()
+        n_activities = max(len(case_index.activities), 1)
+        positions = case_index.positions(self._component.get_event_log())
+        activity_codes = case_index.activity_codes[positions]
+        valid = activity_codes >= 0
+        # Distinct activities of each row of the aggregations per case, sorted by row
+        case_activity = np.unique(case_rows[case_index.case_codes[positions][valid]].astype(np.int64) * n_activities + activity_codes[valid])
+        starts = np.searchsorted(case_activity // n_activities, np.arange(n_rows))
+        counts = np.diff(np.r_[starts, len(case_activity)])[rows]
+        # Activities of the cases of each pair (group, case)
+        index = np.repeat(starts[rows] - np.cumsum(counts) + counts, counts) + np.arange(counts.sum())
+        group_activity = np.unique(np.repeat(groups, counts) * n_activities + case_activity[index] % n_activities)
+        return np.bincount(group_activity // n_activities, minlength=n_groups)
+
+    def __case_aggregates(self) -> pd.DataFrame:
+        """Compute all aggregations per case.
+        """
+        event_log = self._component.get_event_log()
+        case_index = self._component.get_case_index()
+        positions = case_index.positions(event_log)
+        case_codes = case_index.case_codes[positions]
+        activity_codes = case_index.activity_codes[positions]
+        codes = np.flatnonzero(np.bincount(case_codes, minlength=len(case_index.case_ids)))
+        partition_aggregates = self.__partition_aggregates()
+        df = pd.DataFrame({EventColumn.CASE_ID.value: pd.Series(case_index.case_ids[codes]).astype(event_log[EventColumn.CASE_ID.value].dtype)})
+        if partition_aggregates is not None:
+            df['size'] = partition_aggregates['case_size'][codes]
+            df['nunique_activity'] = partition_aggregates['nunique_activity'][codes]
+            throughput_time = partition_aggregates['throughput_time'][codes]
+            df['throughput_time'] = throughput_time if np.isnan(throughput_time).any() else throughput_time.astype(np.int64)
+            valid_size = partition_aggregates['valid_size'][codes]
+        else:
+            # Number of distinct activities, the pairs (case, activity) are unique
+            valid = activity_codes >= 0
+            pairs = np.unique(case_codes[valid].astype(np.int64) * len(case_index.activities) + activity_codes[valid])
+            df['size'] = case_index.lengths[codes].astype(np.int64)
+            df['nunique_activity'] = np.bincount(pairs // len(case_index.activities), minlength=len(case_index.case_ids))[codes]
+            df['throughput_time'] = (pd.Series(case_index.start_time[codes]) - pd.Series(case_index.end_time[codes])).dt.seconds
+            valid_size = np.bincount(case_codes[valid], minlength=len(case_index.case_ids))[codes]
+        # The events without activity are not repetitions of an activity
+        df['rework'] = valid_size - df['nunique_activity'].to_numpy()
+        return df
+
+    def __activity_aggregates(self) -> pd.DataFrame:
+        """Compute all aggregations per activity.
+        """
+        event_log = self._component.get_event_log()
+        case_index = self._component.get_case_index()
+        positions = case_index.positions(event_log)
+        activity_codes = case_index.activity_codes[positions]
+        partition_aggregates = self.__partition_aggregates()
+        if partition_aggregates is not None:
+            codes = np.flatnonzero(partition_aggregates['size'])
+            df = pd.DataFrame({EventColumn.ACTIVITY.value: pd.Series(np.asarray(case_index.activities, dtype=object)[codes]).astype(event_log[EventColumn.ACTIVITY.value].dtype),
+                               'size': partition_aggregates['size'][codes],
+                               'nunique_case': partition_aggregates['nunique_case'][codes]})
+            for column, statistic in ThroughputTime.STATISTICS.items():
+                df['ThroughputTime' + column] = partition_aggregates[statistic][codes]
+            return df
+        valid = activity_codes >= 0
+        positions, activity_codes = positions[valid], activity_codes[valid]
+        size = np.bincount(activity_codes, minlength=len(case_index.activities))
+        codes = np.flatnonzero(size)
+        # Number of distinct cases, the pairs (activity, case) are unique
+        pairs = np.unique(activity_codes.astype(np.int64) * len(case_index.case_ids) + case_index.case_codes[positions])
+        nunique_case = np.bincount(pairs // len(case_index.case_ids), minlength=len(case_index.activities))
+        df = pd.DataFrame({EventColumn.ACTIVITY.value: pd.Series(np.asarray(case_index.activities, dtype=object)[codes]).astype(event_log[EventColumn.ACTIVITY.value].dtype),
+                           'size': size[codes].astype(np.int64),
+                           'nunique_case': nunique_case[codes]})
+        # Throughput time of each event until the next event of the case
+        next_position = case_index.next_position[positions]
+        time = pd.Series(case_index.event_time[positions])
+        next_time = pd.Series(case_index.event_time[next_position])
+        throughput_time = pd.Series(np.where(next_position < 0, 0.0, (next_time - time).dt.seconds))
+        statistics = throughput_time.groupby(activity_codes).agg([(column, statistic) for column, statistic in ThroughputTime.STATISTICS.items()])
+        for column in ThroughputTime.STATISTICS:
+            df['ThroughputTime' + column] = statistics[column].reindex(codes).to_numpy()
+        return df
+
+    def __variant_aggregates(self) -> pd.DataFrame:
+        """Compute all aggregations per variant.
+        """
+        variants = self._component.get_variants()
+        case_variants = self._component.get_case_variants()
+        # Variant of each case of the aggregations per case, the cases without activities have not a variant
+        case_aggregates = self.case_aggregates(['size', 'throughput_time'])
+        rows = case_variants[self._component.get_case_index().case_codes_of(case_aggregates[EventColumn.CASE_ID.value])] if len(case_aggregates) else np.array([], dtype=np.intp)
+        case_aggregates, rows = case_aggregates[rows >= 0], rows[rows >= 0]
+        number_of_cases = np.bincount(rows, minlength=len(variants))
+        size = np.bincount(rows, weights=case_aggregates['size'], minlength=len(variants)).astype(np.int64)
+        # The length of a variant is the number of activities of its trace, the events without activity are not in the trace
+        df = pd.DataFrame({Variant.KEY.value: variants[Variant.KEY.value],
+                           'length': variants[Variant.ACTIVITIES.value].map(len).astype(np.int64),
+                           'number_of_cases': number_of_cases,
+                           'size': size})
+        statistics = case_aggregates['throughput_time'].groupby(rows).agg([(column, statistic) for column, statistic in ThroughputTime.STATISTICS.items()])
+        statistics = statistics.reindex(range(len(variants))).replace(np.nan, None)
+        for column in ThroughputTime.STATISTICS:
+            df['ThroughputTime' + column] = statistics[column].to_numpy()
+        return df
+
+    def __partition_aggregates(self) -> dict:
+        """Return the aggregations per case and per activity of the parallel backend.
+
+        Returns
+        -------
+        dict
+            Aggregations of ParallelBackend.aggregate, None if the event logs are aggregated in this process.
+        """
+        if 'partition' not in self.__aggregates:
+            backend = self._component.get_kpi_backend() if hasattr(self._component, 'get_kpi_backend') else None
+            case_index = self._component.get_case_index()
+            positions = case_index.positions(self._component.get_event_log())
+            self.__aggregates['partition'] = backend.aggregate(case_index, positions) if backend is not None and backend.accepts(len(positions)) else None
+        return self.__aggregates['partition']
+
+    def __aggregations(self, kpi_list: list, grain: str) -> list:
+        """Return the aggregations required by a list of KPIs in a grain.
+
+        Raises
+        ------
+        KeyError
+            The KPI is not a Pepper KPI.
+        TypeError
+            The KPI is not available for the grain.
+        """
+        aggregations = []
+        for kpi_id in kpi_list:
+            if grain not in KPI_AGGREGATIONS[kpi_id]:
+                raise TypeError(f"Method not implemented for this KPI [{kpi_id}].")
+            aggregations += [aggregation for aggregation in KPI_AGGREGATIONS[kpi_id][grain] if aggregation not in aggregations]
+        return aggregations
+
+    def __kpi(self, kpi_id: str) -> PepperKpi:
+        """Return the PepperKpi object of a KPI.
+        """
+        return KPI_CLASSES[kpi_id](self._component)
@@ -1,6 +1,7 @@
+import numpy as np
 import pandas as pd
 
-from peppermining.kpi.pepper_kpi import PepperKpi
+from peppermining.kpi.pepper_kpi import PepperKpi, cached_kpi
 from peppermining.utils.enum import EventColumn, Variant
 
 
@@ -42,6 +43,7 @@ class NumberOfActivities(PepperKpi):
         self._kpi_id = "NumberOfActivities"
         self._kpi_name = "Number of activities"
 
+    @cached_kpi
     def get_kpi(self) -> pd.DataFrame:
         """Return summary of KPI.
 
@@ -50,8 +52,9 @@ class NumberOfActivities(PepperKpi):
         DataFrame
             DataFrame with the summary data.
         """
-        return self.get_summary_df(len(self._component.get_event_log().groupby(EventColumn.ACTIVITY.value).nunique()))
+        return self.get_summary_df(len(self._component.get_event_log().groupby(EventColumn.ACTIVITY.value, observed=True).nunique()))
 
+    @cached_kpi
     def get_kpi_cases(self) -> pd.DataFrame:
         """Return KPI value per case.
 
@@ -60,18 +63,19 @@ class NumberOfActivities(PepperKpi):
         DataFrame
             DataFrame with the cases and and KPI data.
         """
-        return self._component.get_event_log().groupby([EventColumn.CASE_ID.value])[EventColumn.ACTIVITY.value].nunique().reset_index(name=self._kpi_id)
+        return self._component.get_event_log().groupby([EventColumn.CASE_ID.value], observed=True)[EventColumn.ACTIVITY.value].nunique().reset_index(name=self._kpi_id)
 
+    @cached_kpi
     def get_kpi_variants(self) -> pd.DataFrame:
         """Return KPI value per variant.
 
+        The number of activities of a variant is the length of its trace, the events without activity are not in the trace.
+
         Returns
         -------
         DataFrame
             DataFrame with the variants and and KPI data.
         """
-        if not ("get_variants" in dir(self._component)):
-            raise TypeError("This object is not a PepperVariant.")
-        variants = self._component.get_variants().copy()
-        variants[self._kpi_id] = variants.apply(lambda row: (len(row[Variant.ACTIVITIES.value])), axis=1)
-        return variants[[Variant.KEY.value, self._kpi_id]]
+        variants = self._component.get_variants()
+        return pd.DataFrame({Variant.KEY.value: variants[Variant.KEY.value],
+                             self._kpi_id: variants[Variant.ACTIVITIES.value].map(len).astype(np.int64)})
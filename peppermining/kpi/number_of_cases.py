@@ -1,8 +1,8 @@
 import numpy as np
 import pandas as pd
 
-from peppermining.kpi.pepper_kpi import PepperKpi
-from peppermining.utils.enum import EventColumn, Variant, Flowchart
+from peppermining.kpi.pepper_kpi import PepperKpi, cached_kpi
+from peppermining.utils.enum import EventColumn, Flowchart
 
 
 class NumberOfCases(PepperKpi):
@@ -51,6 +51,7 @@ class NumberOfCases(PepperKpi):
         self._kpi_id = "NumberOfCases"
         self._kpi_name = "Number of cases"
 
+    @cached_kpi
     def get_kpi(self) -> pd.DataFrame:
         """Return summary of KPI.
 
@@ -61,6 +62,7 @@ class NumberOfCases(PepperKpi):
         """
         return self.get_summary_df(len(self._component.get_cases()))
 
+    @cached_kpi
     def get_kpi_activities(self) -> pd.DataFrame:
         """Return KPI value per activity.
 
@@ -70,8 +72,9 @@ class NumberOfCases(PepperKpi):
             DataFrame with the activities and KPI data.
         """
         return self._component.get_event_log()[[EventColumn.CASE_ID.value, EventColumn.ACTIVITY.value]].\
-            drop_duplicates().value_counts([EventColumn.ACTIVITY.value]).reset_index(name=self._kpi_id)
+            drop_duplicates().groupby([EventColumn.ACTIVITY.value], observed=True).size().sort_values(ascending=False).reset_index(name=self._kpi_id)
 
+    @cached_kpi
     def get_kpi_variants(self) -> pd.DataFrame:
         """Return KPI value per variant.
 
@@ -80,12 +83,11 @@ class NumberOfCases(PepperKpi):
         DataFrame
             DataFrame with the variants and and KPI data.
         """
-        if not ("get_variants" in dir(self._component)):
-            raise TypeError("This object is not a PepperVariant.")
-        variants = self._component.get_variants().copy()
-        variants[self._kpi_id] = variants.apply(lambda row: (len(row[Variant.CASES.value])), axis=1)
-        return variants[[Variant.KEY.value, self._kpi_id]]
+        variants, case_variants = self.get_variant_cases()
+        variants[self._kpi_id] = np.bincount(case_variants[case_variants >= 0], minlength=len(variants)).astype(np.int64)
+        return variants
 
+    @cached_kpi
     def get_kpi_per_year(self) -> pd.DataFrame:
         """Return KPI value per year.
 
@@ -94,10 +96,11 @@ class NumberOfCases(PepperKpi):
         DataFrame
             DataFrame with the year and and KPI data.
         """
-        return pd.DataFrame({'year': self._component.get_event_log().groupby([EventColumn.CASE_ID.value]).
+        return pd.DataFrame({'year': self._component.get_event_log().groupby([EventColumn.CASE_ID.value], observed=True).
                              agg({EventColumn.EVENT_TIME.value: ['min']})[EventColumn.EVENT_TIME.value]['min'].dt.year}
                             ).groupby(['year'])['year'].count()
 
+    @cached_kpi
     def get_kpi_per_month(self) -> pd.DataFrame:
         """Return KPI value per month.
 
@@ -106,11 +109,12 @@ class NumberOfCases(PepperKpi):
         DataFrame
             DataFrame with the month and and KPI data.
         """
-        df = self._component.get_event_log().groupby([EventColumn.CASE_ID.value]).agg({EventColumn.EVENT_TIME.value: ['min']})[EventColumn.EVENT_TIME.value]['min']
+        df = self._component.get_event_log().groupby([EventColumn.CASE_ID.value], observed=True).agg({EventColumn.EVENT_TIME.value: ['min']})[EventColumn.EVENT_TIME.value]['min']
         return pd.DataFrame({'year': df.dt.year,
                              'month': df.dt.month}
                             ).groupby(['year', 'month'])['month'].count()
 
+    @cached_kpi
     def get_kpi_per_day(self) -> pd.DataFrame:
         """Return KPI value per day.
 
@@ -119,12 +123,13 @@ class NumberOfCases(PepperKpi):
         DataFrame
             DataFrame with the day and and KPI data.
         """
-        df = self._component.get_event_log().groupby([EventColumn.CASE_ID.value]).agg({EventColumn.EVENT_TIME.value: ['min']})[EventColumn.EVENT_TIME.value]['min']
+        df = self._component.get_event_log().groupby([EventColumn.CASE_ID.value], observed=True).agg({EventColumn.EVENT_TIME.value: ['min']})[EventColumn.EVENT_TIME.value]['min']
         return pd.DataFrame({'year': df.dt.year,
                              'month': df.dt.month,
                              'day': df.dt.day}
                             ).groupby(['year', 'month', 'day'])['day'].count()
 
+    @cached_kpi
     def get_kpi_process_flow(self, activity_from, activity_to) -> pd.DataFrame:
         """Return the number of cases the a activity is followed by another specified activity.
 
@@ -140,12 +145,10 @@ class NumberOfCases(PepperKpi):
         DataFrame
             DataFrame with the number of cases values.
         """
-        _df = self._component.get_event_log().copy()
+        # The number of cases of each edge is in the Directly-Follows Graph
+        case_index = self._component.get_case_index()
+        dfg = self._component.get_dfg()
         if activity_from == Flowchart.PROCESS_START.value:
-            _df[Flowchart.ACTIVITY_FROM.value] = _df.groupby(EventColumn.CASE_ID.value)[EventColumn.ACTIVITY.value].shift(1).replace(np.nan, Flowchart.PROCESS_START.value)
-            flow_filter = (_df[Flowchart.ACTIVITY_FROM.value] == activity_from) & (_df[Flowchart.ACTIVITY.value] == activity_to)
-        else:
-            _df[Flowchart.ACTIVITY_TO.value] = _df.groupby(EventColumn.CASE_ID.value)[EventColumn.ACTIVITY.value].shift(-1).replace(np.nan, Flowchart.PROCESS_END.value)
-            flow_filter = (_df[EventColumn.ACTIVITY.value] == activity_from) & (_df[Flowchart.ACTIVITY_TO.value] == activity_to)
-        _df = _df[flow_filter]
-        return self.get_summary_df(len(_df[EventColumn.CASE_ID.value].drop_duplicates()))
+            return self.get_summary_df(dfg.get_case_count(dfg.START, case_index.activity_code(activity_to)))
+        code_to = dfg.END if activity_to == Flowchart.PROCESS_END.value else case_index.activity_code(activity_to)
+        return self.get_summary_df(dfg.get_case_count(case_index.activity_code(activity_from), code_to))
@@ -1,7 +1,8 @@
+import numpy as np
 import pandas as pd
 
-from peppermining.kpi.pepper_kpi import PepperKpi
-from peppermining.utils.enum import EventColumn, Variant
+from peppermining.kpi.pepper_kpi import PepperKpi, cached_kpi
+from peppermining.utils.enum import EventColumn
 
 
 class NumberOfEvents(PepperKpi):
@@ -50,6 +51,7 @@ class NumberOfEvents(PepperKpi):
         self._kpi_id = "NumberOfEvents"
         self._kpi_name = "Number of events"
 
+    @cached_kpi
     def get_kpi(self) -> pd.DataFrame:
         """Return summary of KPI.
 
@@ -60,6 +62,7 @@ class NumberOfEvents(PepperKpi):
         """
         return self.get_summary_df(len(self._component.get_event_log()))
 
+    @cached_kpi
     def get_kpi_cases(self) -> pd.DataFrame:
         """Return KPI value per case.
 
@@ -68,8 +71,9 @@ class NumberOfEvents(PepperKpi):
         DataFrame
             DataFrame with the cases and and KPI data.
         """
-        return self._component.get_event_log().value_counts([EventColumn.CASE_ID.value]).reset_index(name=self._kpi_id)
+        return self._component.get_event_log().groupby([EventColumn.CASE_ID.value], observed=True).size().sort_values(ascending=False).reset_index(name=self._kpi_id)
 
+    @cached_kpi
     def get_kpi_activities(self) -> pd.DataFrame:
         """Return KPI value per activity.
 
@@ -78,8 +82,9 @@ class NumberOfEvents(PepperKpi):
         DataFrame
             DataFrame with the activities and KPI data.
         """
-        return self._component.get_event_log().value_counts([EventColumn.ACTIVITY.value]).reset_index(name=self._kpi_id)
+        return self._component.get_event_log().groupby([EventColumn.ACTIVITY.value], observed=True).size().sort_values(ascending=False).reset_index(name=self._kpi_id)
 
+    @cached_kpi
     def get_kpi_variants(self) -> pd.DataFrame:
         """Return KPI value per variant.
 
@@ -88,13 +93,14 @@ class NumberOfEvents(PepperKpi):
         DataFrame
             DataFrame with the variants and and KPI data.
         """
-        if not ("get_variants" in dir(self._component)):
-            raise TypeError("This object is not a PepperVariant.")
-        variants = self._component.get_variants().copy()
-        event_log = self._component.get_event_log()
-        variants[self._kpi_id] = variants.apply(lambda row: event_log.case_id.isin(row[Variant.CASES.value]).value_counts()[True], axis=1)
-        return variants[[Variant.KEY.value, self._kpi_id]]
-
+        variants, case_variants = self.get_variant_cases()
+        case_index = self._component.get_case_index()
+        events = np.array([], dtype=np.intp) if case_index is None else case_variants[case_index.case_codes[case_index.positions(self._component.get_event_log())]]
+        # The events of the cases without activities have not a variant
+        variants[self._kpi_id] = np.bincount(events[events >= 0], minlength=len(variants)).astype(np.int64)
+        return variants
+
+    @cached_kpi
     def get_kpi_per_year(self) -> pd.DataFrame:
         """Return KPI value per year.
 
@@ -106,6 +112,7 @@ class NumberOfEvents(PepperKpi):
         return pd.DataFrame({'year': self._component.get_event_log()[EventColumn.EVENT_TIME.value].dt.year}
                             ).groupby(['year'])['year'].count()
 
+    @cached_kpi
     def get_kpi_per_month(self) -> pd.DataFrame:
         """Return KPI value per month.
 
@@ -118,6 +125,7 @@ class NumberOfEvents(PepperKpi):
                              'month': self._component.get_event_log()[EventColumn.EVENT_TIME.value].dt.month}
                             ).groupby(['year', 'month'])['month'].count()
 
+    @cached_kpi
     def get_kpi_per_day(self) -> pd.DataFrame:
         """Return KPI value per day.
 
@@ -1,6 +1,23 @@
+import functools
 import pandas as pd
 
-from peppermining.utils.enum import KpiColumn
+from peppermining.utils.enum import KpiColumn, Variant
+
+
+def cached_kpi(method):
+    """Decorator that memoizes the result of a KPI method in the KPI cache of PepperMining.
+
+    The key is the fingerprint of the data, the filter chain, the KPI, the method (grain) and its parameters.
+    Without KPI cache, the method is always computed.
+    """
+    @functools.wraps(method)
+    def wrapper(self, *args):
+        cache = self._component.get_kpi_cache() if hasattr(self._component, 'get_kpi_cache') else None
+        if cache is None:
+            return method(self, *args)
+        key = (self._component.get_fingerprint(), self._component.get_filter(), self._kpi_id, method.__name__, args)
+        return cache.get_or_compute(key, lambda: method(self, *args))
+    return wrapper
 
 
 class PepperKpi():
@@ -9,6 +26,7 @@ class PepperKpi():
     In Pepper Mining, it is possible to calculate different statistics and KPI on top of event logs and cases.
     The PepperKpi declares common operations for the KPIs of Pepper Mining.
     Each implementation of PepperKpi it can has several specific methods.
+    The methods decorated with cached_kpi are memoized in the KPI cache of PepperMining.
     The Pepper Mining has various kpis implemented, such:
     (1) NumberOfEvents: Number of events per: Summary, Cases, Activities, Date (day, month, year), and Variant.
     (2) NumberOfActivities: Number of activities per: Summary, Cases, and Variant.
@@ -40,6 +58,8 @@ class PepperKpi():
         Return KPI value per activity.
     get_summary_df
         Return standard DataFrame of summary.
+    get_variant_cases
+        Return the variants and the row of the variant of each case.
     """
     # TODO: KPI - Number of variants (summary).
     # TODO: KPI - Total throughput time in days.
@@ -147,3 +167,24 @@ class PepperKpi():
         """
         return pd.DataFrame({KpiColumn.KPI.value: self._kpi_name,
                             KpiColumn.VALUE.value: kpi_value}, index=[self._kpi_id])
+
+    def get_variant_cases(self) -> tuple:
+        """Return the variants and the row of the variant of each case.
+
+        The cases are mapped to their variant once, so the KPIs per variant are a bincount or a groupby
+        over the rows of the variants instead of a scan of the event logs per variant.
+
+        Returns
+        -------
+        tuple
+            DataFrame with the column 'key' of the Variants data,
+            and the row of the variant of each case code of the case index (-1 for the cases not in the event logs).
+
+        Raises
+        ------
+        ValueError
+            This object is not a PepperVariant.
+        """
+        if not ("get_variants" in dir(self._component)):
+            raise TypeError("This object is not a PepperVariant.")
+        return self._component.get_variants()[[Variant.KEY.value]].copy(), self._component.get_case_variants()
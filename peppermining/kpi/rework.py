@@ -1,6 +1,6 @@
 import pandas as pd
 
-from peppermining.kpi.pepper_kpi import PepperKpi
+from peppermining.kpi.pepper_kpi import PepperKpi, cached_kpi
 from peppermining.utils.enum import EventColumn
 
 
@@ -42,6 +42,7 @@ class Rework(PepperKpi):
         self._kpi_id = "Rework"
         self._kpi_name = "Rework"
 
+    @cached_kpi
     def get_kpi(self) -> pd.DataFrame:
         """Return summary of KPI.
 
@@ -54,6 +55,7 @@ class Rework(PepperKpi):
         """
         return self.get_summary_df(sum(self.__rework_df()[self._kpi_id]))
 
+    @cached_kpi
     def get_kpi_cases(self) -> pd.DataFrame:
         """Return KPI Rework per case.
 
@@ -64,8 +66,9 @@ class Rework(PepperKpi):
         DataFrame
             DataFrame with the cases and and KPI data.
         """
-        return self.__rework_df().groupby([EventColumn.CASE_ID.value]).sum().reset_index()
+        return self.__rework_df().groupby([EventColumn.CASE_ID.value], observed=True).sum().reset_index()
 
+    @cached_kpi
     def get_kpi_activities(self) -> pd.DataFrame:
         """Compute KPI Rework per Activity
 
@@ -77,7 +80,7 @@ class Rework(PepperKpi):
         DataFrame
             DataFrame with the activities and KPI data.
         """
-        return self.__rework_df().groupby([EventColumn.ACTIVITY.value])[self._kpi_id].sum().reset_index()
+        return self.__rework_df().groupby([EventColumn.ACTIVITY.value], observed=True)[self._kpi_id].sum().reset_index()
 
     def __rework_df(self) -> pd.DataFrame:
         """Compute the rework.
@@ -87,6 +90,6 @@ class Rework(PepperKpi):
         DataFrame
             DataFrame with the reworks data.
         """
-        df = self._component.get_event_log().groupby([EventColumn.CASE_ID.value, EventColumn.ACTIVITY.value]).size().reset_index(name=self._kpi_id)
+        df = self._component.get_event_log().groupby([EventColumn.CASE_ID.value, EventColumn.ACTIVITY.value], observed=True).size().reset_index(name=self._kpi_id)
         df[self._kpi_id] = df[self._kpi_id] - 1
         return df
@@ -1,7 +1,7 @@
 import numpy as np
 import pandas as pd
 
-from peppermining.kpi.pepper_kpi import PepperKpi
+from peppermining.kpi.pepper_kpi import PepperKpi, cached_kpi
 from peppermining.utils.enum import EventColumn, KpiColumn, Variant, Flowchart
 
 
@@ -26,6 +26,8 @@ class ThroughputTime(PepperKpi):
         Return KPI value per activity.
     get_kpi_process_flow
         Return the Throughput Time the a activity is followed by another specified activity.
+    get_statistics_df
+        Return the summary DataFrame with the statistics of throughput times.
 
     Example
     -------
@@ -38,6 +40,8 @@ class ThroughputTime(PepperKpi):
     >>> kp2 = ThroughputTime(f1)
     >>> kp2.get_kpi()
     """
+    # Statistics of the throughput time per activity and variant, column suffix and aggregation
+    STATISTICS = {'Min': 'min', 'Max': 'max', 'Mean': 'mean', 'Median': 'median', 'Sum': 'sum', 'StDev': 'std'}
 
     def __init__(self, pepper_data):
         """Constructor.
@@ -51,6 +55,7 @@ class ThroughputTime(PepperKpi):
         self._kpi_id = "ThroughputTime"
         self._kpi_name = "Throughput time"
 
+    @cached_kpi
     def get_kpi(self) -> pd.DataFrame:
         """Return summary of KPI.
 
@@ -59,13 +64,9 @@ class ThroughputTime(PepperKpi):
         DataFrame
             DataFrame with the summary data.
         """
-        _df = self.get_kpi_cases()[self._kpi_id]
-        _id = self._kpi_id
-        _nm = self._kpi_name
-        return pd.DataFrame({KpiColumn.KPI.value: [_nm + ' (Max)', _nm + ' (Min)', _nm + ' (Mean)', _nm + ' (Median)', _nm + ' (Sum)', _nm + ' (StDev)'],
-                             KpiColumn.VALUE.value: [_df.max(), _df.min(), _df.mean(), _df.median(), _df.sum(), _df.std()]},
-                            index=[_id + 'Max', _id + 'Min', _id + 'Mean', _id + 'Median', _id + 'Sum', _id + 'StDev'])
+        return self.get_statistics_df(self.get_kpi_cases()[self._kpi_id])
 
+    @cached_kpi
     def get_kpi_event_log(self) -> pd.DataFrame:
         """Return KPI value per event log.
 
@@ -75,10 +76,16 @@ class ThroughputTime(PepperKpi):
             DataFrame with the event log and KPI data.
         """
         df = self._component.get_event_log().copy()
-        df['next_'] = df.groupby(EventColumn.CASE_ID.value)[EventColumn.EVENT_TIME.value].shift(-1)
-        df[self._kpi_id] = np.where(df.next_.isnull(), 0, (df.next_ - df[EventColumn.EVENT_TIME.value]).dt.seconds)
-        return df.replace({np.nan: None}).drop(columns=['next_'])
-
+        # Next event of the same case from the case index
+        case_index = self._component.get_case_index()
+        positions = case_index.positions(df)
+        next_position = case_index.next_position[positions]
+        time = pd.Series(case_index.event_time[positions], index=df.index)
+        next_time = pd.Series(case_index.event_time[next_position], index=df.index)
+        df[self._kpi_id] = np.where(next_position < 0, 0.0, (next_time - time).dt.seconds)
+        return df.replace({np.nan: None})
+
+    @cached_kpi
     def get_kpi_cases(self) -> pd.DataFrame:
         """Return KPI value per case.
 
@@ -87,24 +94,40 @@ class ThroughputTime(PepperKpi):
         DataFrame
             DataFrame with the cases and and KPI data.
         """
-        df_min = self._component.get_event_log().groupby(EventColumn.CASE_ID.value)[EventColumn.EVENT_TIME.value].min().reset_index(name='min_')
-        df_max = self._component.get_event_log().groupby(EventColumn.CASE_ID.value)[EventColumn.EVENT_TIME.value].max().reset_index(name='max_')
+        df_min = self._component.get_event_log().groupby(EventColumn.CASE_ID.value, observed=True)[EventColumn.EVENT_TIME.value].min().reset_index(name='min_')
+        df_max = self._component.get_event_log().groupby(EventColumn.CASE_ID.value, observed=True)[EventColumn.EVENT_TIME.value].max().reset_index(name='max_')
         df = df_min.merge(df_max, how='left', on=EventColumn.CASE_ID.value).replace(np.nan, None)
         df[self._kpi_id] = (df.min_ - df.max_).dt.seconds
         return df[[EventColumn.CASE_ID.value, self._kpi_id]]
 
+    @cached_kpi
     def get_kpi_activities(self) -> pd.DataFrame:
         """Return KPI Throughput time per activity.
 
+        If PepperMining has a parallel backend, the statistics of large event logs are computed by a process pool partitioned by case.
+
         Returns
         -------
         DataFrame
             DataFrame with the activities and KPI data.
         """
-        return self.get_kpi_event_log()[[EventColumn.ACTIVITY.value, self._kpi_id]].groupby([EventColumn.ACTIVITY.value]).\
+        event_log = self._component.get_event_log()
+        backend = self._component.get_kpi_backend() if hasattr(self._component, 'get_kpi_backend') else None
+        if backend is not None and backend.accepts(len(event_log)):
+            case_index = self._component.get_case_index()
+            aggregates = backend.aggregate(case_index, case_index.positions(event_log))
+            codes = np.flatnonzero(aggregates['size'])
+            df = pd.DataFrame({EventColumn.ACTIVITY.value: pd.Series(np.asarray(case_index.activities, dtype=object)[codes]).astype(event_log[EventColumn.ACTIVITY.value].dtype)})
+            for column, statistic in self.STATISTICS.items():
+                df[self._kpi_id + column] = aggregates[statistic][codes]
+            # Activities in the order of the groupby of the event logs
+            order = event_log.groupby(EventColumn.ACTIVITY.value, observed=True).size().index
+            return df.set_index(EventColumn.ACTIVITY.value).reindex(order).reset_index()
+        return self.get_kpi_event_log()[[EventColumn.ACTIVITY.value, self._kpi_id]].groupby([EventColumn.ACTIVITY.value], observed=True).\
             ThroughputTime.agg([("ThroughputTimeMin", "min"), ("ThroughputTimeMax", "max"), ("ThroughputTimeMean", "mean"),
                                 ("ThroughputTimeMedian", "median"), ("ThroughputTimeSum", "sum"), ("ThroughputTimeStDev", "std")]).reset_index()
 
+    @cached_kpi
     def get_kpi_variants(self) -> pd.DataFrame:
         """Return KPI value per variant.
 
@@ -113,18 +136,20 @@ class ThroughputTime(PepperKpi):
         DataFrame
             DataFrame with the variants and and KPI data.
         """
-        if not ("get_variants" in dir(self._component)):
-            raise TypeError("This object is not a PepperVariant.")
-        # Explode variants per Case
-        variants = self._component.get_variants().copy()
-        variants = variants.explode(Variant.CASES.value).reset_index(drop=True).rename(columns={Variant.CASES.value: EventColumn.CASE_ID.value})[[Variant.KEY.value, EventColumn.CASE_ID.value]]
-        # Join value Throughput Time per Case
-        variants = variants.merge(self.get_kpi_cases(), how='left', on=EventColumn.CASE_ID.value).replace(np.nan, None)
+        variants, case_variants = self.get_variant_cases()
+        # Variant of the Throughput Time per Case
+        cases = self.get_kpi_cases()
+        rows = case_variants[self._component.get_case_index().case_codes_of(cases[EventColumn.CASE_ID.value])] if len(cases) else np.array([], dtype=np.intp)
+        # The cases without activities have not a variant
+        cases, rows = cases[rows >= 0], rows[rows >= 0]
         # Calculate
-        return variants[[Variant.KEY.value, self._kpi_id]].groupby([Variant.KEY.value]).ThroughputTime.\
+        statistics = cases[self._kpi_id].groupby(rows).\
             agg([("ThroughputTimeMin", "min"), ("ThroughputTimeMax", "max"), ("ThroughputTimeMean", "mean"), ("ThroughputTimeMedian", "median"),
-                 ("ThroughputTimeSum", "sum"), ("ThroughputTimeStDev", "std")]).replace(np.nan, None).reset_index()
+                 ("ThroughputTimeSum", "sum"), ("ThroughputTimeStDev", "std")])
+        statistics.index = variants[Variant.KEY.value].to_numpy()[statistics.index]
+        return statistics.rename_axis(Variant.KEY.value).sort_index().replace(np.nan, None).reset_index()
 
+    @cached_kpi
     def get_kpi_process_flow(self, activity_from, activity_to) -> pd.DataFrame:
         """Return the Throughput Time the a activity is followed by another specified activity.
 
@@ -140,12 +165,27 @@ class ThroughputTime(PepperKpi):
         DataFrame
             DataFrame with the Throughput Time values.
         """
-        _df = self.get_kpi_event_log()
+        # The throughput times of each edge are in the Directly-Follows Graph, the END activity has not a next event
+        case_index = self._component.get_case_index()
+        dfg = self._component.get_dfg()
+        code_to = dfg.END if activity_to == Flowchart.PROCESS_END.value else case_index.activity_code(activity_to)
+        return self.get_statistics_df(dfg.get_durations(case_index.activity_code(activity_from), code_to))
+
+    def get_statistics_df(self, values: pd.Series) -> pd.DataFrame:
+        """Return the summary DataFrame with the statistics of throughput times.
+
+        Parameters
+        ----------
+        values : pd.Series
+            Throughput times in seconds.
+
+        Returns
+        -------
+        DataFrame
+            DataFrame with the Max, Min, Mean, Median, Sum and StDev of the throughput times.
+        """
         _id = self._kpi_id
         _nm = self._kpi_name
-        _df[Flowchart.ACTIVITY_TO.value] = _df.groupby(EventColumn.CASE_ID.value)[EventColumn.ACTIVITY.value].shift(-1).replace(np.nan, Flowchart.PROCESS_END.value)
-        # Filter process flow
-        _df = _df[(_df[EventColumn.ACTIVITY.value] == activity_from) & (_df[Flowchart.ACTIVITY_TO.value] == activity_to)][self._kpi_id]
         return pd.DataFrame({KpiColumn.KPI.value: [_nm + ' (Max)', _nm + ' (Min)', _nm + ' (Mean)', _nm + ' (Median)', _nm + ' (Sum)', _nm + ' (StDev)'],
-                             KpiColumn.VALUE.value: [_df.max(), _df.min(), _df.mean(), _df.median(), _df.sum(), _df.std()]},
+                             KpiColumn.VALUE.value: [values.max(), values.min(), values.mean(), values.median(), values.sum(), values.std()]},
                             index=[_id + 'Max', _id + 'Min', _id + 'Mean', _id + 'Median', _id + 'Sum', _id + 'StDev'])
@@ -1,3 +1,4 @@
+import hashlib
 import numpy as np
 import pandas as pd
 import pydot
@@ -6,14 +7,15 @@ from typing import Optional
 from datetime import timedelta
 
 from peppermining.utils.enum import EventColumn, Variant, Flowchart
-from peppermining.kpi.pepper_kpi import PepperKpi
-# TODO: Call the KPIs class of a dynamically imported module (__kpi)
+from peppermining.utils.variant_discovery import variant_discovery
+from peppermining.utils.case_index import CaseIndex
+from peppermining.utils.kpi_cache import KpiCache
+from peppermining.utils.parallel_backend import ParallelBackend
+from peppermining.discovery.dfg import DFG
+from peppermining.discovery.variant_trie import VariantTrie
+from peppermining.kpi.kpi_engine import KpiEngine
 from peppermining.kpi.number_of_cases import NumberOfCases
 from peppermining.kpi.throughput_time import ThroughputTime
-from peppermining.kpi.average_events_per_case import AverageEventsPerCase
-from peppermining.kpi.number_of_events import NumberOfEvents
-from peppermining.kpi.number_of_activities import NumberOfActivities
-from peppermining.kpi.rework import Rework
 
 
 class Pepper():
@@ -31,6 +33,22 @@ class Pepper():
         Activities data.
     variant_data : pd.DataFrame
         Variants data.
+    dfg_data : DFG
+        Directly-Follows Graph of the event logs, computed once on the first use.
+    variant_trie : VariantTrie
+        Prefix tree of the traces of the cases, computed once on the first use.
+    variant_id : np.ndarray
+        Variant of each row of the Cases data, computed with the Variants data on the first use.
+    activity_dictionary : pd.Index
+        Activities dictionary, the position of each activity is the activity code.
+    case_index : CaseIndex
+        Case-segmented index of the event logs.
+    kpi_cache : KpiCache
+        Memoized KPI results of the event logs.
+    kpi_backend : ParallelBackend
+        Process pool of the KPI aggregations, None to aggregate in this process.
+    data_version : int
+        Version of the event logs and cases, it changes when the data changes.
 
     Methods
     -------
@@ -44,8 +62,30 @@ class Pepper():
         Return summary the events and cases.
     get_variants
         Return Variants data.
+    get_dfg
+        Return the Directly-Follows Graph of the event logs.
+    get_variant_trie
+        Return the prefix tree of the traces of the cases.
+    get_variant_id
+        Return the variant of each row of the Cases data.
+    get_case_variants
+        Return the row in the Variants data of each case code.
     get_filter
         Return the filter used.
+    get_activity_dictionary
+        Return the activity dictionary shared by the event logs.
+    get_case_index
+        Return the case-segmented index shared by the event logs.
+    get_root
+        Return the PepperMining object with the event logs.
+    get_case_mask
+        Return the boolean mask of the cases selected.
+    get_kpi_cache
+        Return the KPI cache shared by the event logs.
+    get_kpi_backend
+        Return the process pool of the KPI aggregations.
+    get_fingerprint
+        Return the fingerprint of the data.
     drawing
         Return the activity interaction graph of event data.
     """
@@ -57,6 +97,14 @@ class Pepper():
         self.case_data = pd.DataFrame()
         self.activity_data = pd.DataFrame()
         self.variant_data = pd.DataFrame()
+        self.dfg_data = None
+        self.variant_trie = None
+        self.variant_id = None
+        self.activity_dictionary = pd.Index([])
+        self.case_index = None
+        self.kpi_cache = None
+        self.kpi_backend = None
+        self.data_version = 0
 
     def get_event_log(self) -> pd.DataFrame:
         """Return Event Logs data.
@@ -103,7 +151,8 @@ class Pepper():
             DataFrame with the Activities data.
         """
         if self.activity_data.empty:
-            self.activity_data = self.get_event_log()[EventColumn.ACTIVITY.value].drop_duplicates().reset_index(drop=True).to_frame()
+            # The events without activity are not an activity
+            self.activity_data = self.get_event_log()[EventColumn.ACTIVITY.value].dropna().drop_duplicates().reset_index(drop=True).to_frame()
         return self.activity_data if kpi is None else self.__add_activity_kpi(kpi)
 
     def get_summary(self, kpi: Optional[list] = ['NumberOfEvents']) -> pd.DataFrame:
@@ -138,8 +187,85 @@ class Pepper():
         """
         if self.variant_data.empty:
             self.variant_data = self.__set_variants()
+            self.variant_id = None
         return self.variant_data if kpi is None else self.__add_variant_kpi(kpi)
 
+    def get_dfg(self) -> DFG:
+        """Return the Directly-Follows Graph of the event logs.
+
+        The graph is computed once and reused by the drawing, the process flow KPIs and the violations.
+
+        Returns
+        -------
+        DFG
+            Directly-Follows Graph of the event logs, None if there is not event logs.
+        """
+        if self.dfg_data is None and self.get_case_index() is not None:
+            case_index = self.get_case_index()
+            self.dfg_data = DFG(case_index, case_index.sorted_positions(self.get_event_log()))
+        return self.dfg_data
+
+    def get_variant_trie(self) -> VariantTrie:
+        """Return the prefix tree of the traces of the cases.
+
+        The variants are the nodes of the trie with cases. The trie is computed once and PepperMining keeps it
+        up to date when new events are appended.
+
+        Returns
+        -------
+        VariantTrie
+            Prefix tree of the traces of the cases, None if there is not event logs.
+        """
+        if self.variant_trie is None and self.get_case_index() is not None:
+            case_index = self.get_case_index()
+            self.variant_trie = VariantTrie(case_index, case_index.sorted_positions(self.get_event_log()))
+        return self.variant_trie
+
+    def get_variant_id(self) -> np.ndarray:
+        """Return the variant of each row of the Cases data.
+
+        The variant id is the row of the variant in the Variants data. It is computed once with the Variants data
+        and kept until the event logs or the cases change, so the cases of a variant are an integer mask.
+
+        Returns
+        -------
+        np.ndarray
+            Variant id of each row of the Cases data, -1 for the cases without events.
+        """
+        if self.variant_id is None:
+            variants = self.get_variants()
+            trie = self.get_variant_trie()
+            if trie is None:
+                self.variant_id = np.full(len(self.get_cases()), -1, dtype=np.intp)
+                return self.variant_id
+            nodes = trie.nodes_of_keys(variants[Variant.KEY.value].tolist())
+            node_variant = np.full(len(trie), -1, dtype=np.intp)
+            node_variant[nodes[nodes >= 0]] = np.flatnonzero(nodes >= 0)
+            case_codes = self.get_case_index().case_codes_of(self.get_cases()[EventColumn.CASE_ID.value])
+            case_node = np.where(case_codes >= 0, trie.case_node[case_codes], -1)
+            self.variant_id = np.where(case_node >= 0, node_variant[case_node], -1)
+        return self.variant_id
+
+    def get_case_variants(self) -> np.ndarray:
+        """Return the row in the Variants data of each case code.
+
+        The variant id of the Cases data by case code of the case index. The KPIs per variant aggregate the cases
+        with this mapping in one pass, instead of a scan per variant.
+
+        Returns
+        -------
+        np.ndarray
+            Variant id of each case code of the case index, -1 for the cases not in the event logs.
+        """
+        case_index = self.get_case_index()
+        if case_index is None:
+            return np.array([], dtype=np.intp)
+        variant_id = self.get_variant_id()
+        case_codes = case_index.case_codes_of(self.get_cases()[EventColumn.CASE_ID.value])
+        case_variants = np.full(len(case_index.case_ids), -1, dtype=np.intp)
+        case_variants[case_codes[case_codes >= 0]] = variant_id[case_codes >= 0]
+        return case_variants
+
     def get_filter(self) -> str:
         """Return the filter used.
 
@@ -150,6 +276,91 @@ class Pepper():
         """
         return "[None]"
 
+    def get_activity_dictionary(self) -> pd.Index:
+        """Return the activity dictionary shared by the event logs.
+
+        The position of each activity in the dictionary is the integer code of the activity.
+        In the compact storage mode, it is the categories of the column 'activity'.
+
+        Returns
+        -------
+        Index
+            Index with the activities.
+        """
+        return self.activity_dictionary
+
+    def get_case_index(self) -> CaseIndex:
+        """Return the case-segmented index shared by the event logs.
+
+        The index is built once when the event logs are loaded.
+
+        Returns
+        -------
+        CaseIndex
+            Case-segmented index of the event logs.
+        """
+        return self.case_index
+
+    def get_root(self) -> 'Pepper':
+        """Return the PepperMining object with the event logs.
+
+        The filters are evaluated on the event logs of this object.
+
+        Returns
+        -------
+        Pepper
+            PepperMining object.
+        """
+        return self
+
+    def get_case_mask(self) -> np.ndarray:
+        """Return the boolean mask of the cases selected.
+
+        PepperMining selects all cases of the case index.
+
+        Returns
+        -------
+        np.ndarray
+            Boolean mask over the cases of the case index.
+        """
+        if self.case_index is None:
+            return np.array([], dtype=bool)
+        return np.ones(len(self.case_index.case_ids), dtype=bool)
+
+    def get_kpi_cache(self) -> KpiCache:
+        """Return the KPI cache shared by the event logs.
+
+        Returns
+        -------
+        KpiCache
+            Memoized KPI results, None if the cache is disabled.
+        """
+        return self.kpi_cache
+
+    def get_kpi_backend(self) -> ParallelBackend:
+        """Return the process pool of the KPI aggregations.
+
+        Returns
+        -------
+        ParallelBackend
+            Process pool partitioned by case, None if the KPIs are aggregated in this process.
+        """
+        return self.kpi_backend
+
+    def get_fingerprint(self) -> tuple:
+        """Return the fingerprint of the data.
+
+        The fingerprint is the version of the event logs and a digest of the case mask,
+        two objects with the same fingerprint have the same event logs and cases.
+
+        Returns
+        -------
+        tuple
+            Version of the event logs, number of cases and digest of the case mask.
+        """
+        mask = self.get_case_mask()
+        return self.get_root().data_version, len(mask), hashlib.blake2b(np.packbits(mask).tobytes(), digest_size=16).hexdigest()
+
     def drawing(self, label_kpi: Optional[str] = 'NumberOfCases') -> pydot.Dot:
         """Return the activity interaction graph of event data.
 
@@ -185,80 +396,78 @@ class Pepper():
         --------
         https://pypi.org/project/pydot/
         """
+        # All edge values are taken from the Directly-Follows Graph
+        dfg = self.get_dfg()
+        activity_names = set(self.get_activities()[EventColumn.ACTIVITY.value])
+        case_index = self.get_case_index()
+
         def edge_label(activity_from: str, activity_to: str) -> str:
             """Return edge label.
             """
+            code_to = DFG.END if activity_to == Flowchart.PROCESS_END.value else case_index.activity_code(activity_to)
             if label_kpi == 'NumberOfCases':
-                kpi_number_of_cases = NumberOfCases(self)
-                kpi_edge = kpi_number_of_cases.get_kpi_process_flow(activity_from, activity_to)
-                return str(kpi_edge.Value.values[0])
+                if activity_from == Flowchart.PROCESS_START.value:
+                    return str(dfg.get_case_count(DFG.START, case_index.activity_code(activity_to)))
+                return str(dfg.get_case_count(case_index.activity_code(activity_from), code_to))
             # Verify if exists the activities
-            if not (activity_from in list(self.get_activities()[EventColumn.ACTIVITY.value])) or not (activity_to in list(self.get_activities()[EventColumn.ACTIVITY.value])):
+            if not (activity_from in activity_names) or not (activity_to in activity_names):
                 return ""
             # Take the throughput time
-            kpi_throughput_time = ThroughputTime(self)
-            kpi_edge = kpi_throughput_time.get_kpi_process_flow(activity_from, activity_to)
-            throughput_time = kpi_edge.filter(items=[label_kpi], axis=0).Value.values[0]
-            return str(timedelta(seconds=throughput_time))
-
-        # Extract variant data
-        graph_data = self.get_variants().copy()
-        # Transform variant data
-        graph_data = graph_data.explode(Variant.ACTIVITIES.value).reset_index(drop=True).rename(columns={Variant.ACTIVITIES.value: Flowchart.ACTIVITY.value})
+            throughput_time = dfg.get_duration(case_index.activity_code(activity_from), code_to, ThroughputTime.STATISTICS[label_kpi[len('ThroughputTime'):]])
+            return "" if pd.isna(throughput_time) else str(timedelta(seconds=throughput_time))
+
+        # The activities and connections are taken from the traces of the variant trie, in the order of the Variants data
+        trie = self.get_variant_trie()
+        traces = [] if trie is None else [trie.trace_activities(node) for node in trie.variant_nodes(sort=True).tolist()]
         # CREATE GRAPH
         graph = pydot.Dot('pepper_graph', graph_type='digraph', bgcolor='white', directed=True, rankdir='LR')
         # ADD NODE
         # Add activities in flowchart in 3 steps. For the activity ever is NumberOfCases in box.
         # Step 1. Add START activity
         kpi_node = NumberOfCases(self)
+        number_of_cases = str(kpi_node.get_kpi().Value.values[0])
+        node_values = kpi_node.get_kpi_activities().set_index(EventColumn.ACTIVITY.value)['NumberOfCases']
         graph.add_node(pydot.Node(Flowchart.PROCESS_START.value,
-                                  label=Flowchart.PROCESS_START.value + '(' + str(kpi_node.get_kpi().Value.values[0]) + ')',
+                                  label=Flowchart.PROCESS_START.value + '(' + number_of_cases + ')',
                                   shape=Flowchart.START_SHAPE.value))
         # Step 2. Add activities
-        activities = graph_data.drop_duplicates(subset=[Flowchart.ACTIVITY.value])
-        for index, act in activities.iterrows():
-            value = act[Flowchart.ACTIVITY.value]
+        for value in dict.fromkeys(activity for trace in traces for activity in trace):
             graph.add_node(pydot.Node(value,
-                                      label=value + '(' + str(kpi_node.get_kpi_activities().query("activity == @value").NumberOfCases.values[0]) + ')',
+                                      label=value + '(' + str(node_values[value]) + ')',
                                       shape=Flowchart.ACTIVITY_SHAPE.value))
         # Step 3. Add END activity
         graph.add_node(pydot.Node(Flowchart.PROCESS_END.value,
-                                  label=Flowchart.PROCESS_END.value + '(' + str(kpi_node.get_kpi().Value.values[0]) + ')',
+                                  label=Flowchart.PROCESS_END.value + '(' + number_of_cases + ')',
                                   shape=Flowchart.END_SHAPE.value))
         # ADD EDGE
         # Add connections in flowchart in 3 steps
         # Step 1. Add START edge
-        graph_data[Flowchart.ACTIVITY_FROM.value] = graph_data.groupby(Variant.KEY.value)[Flowchart.ACTIVITY.value].shift(1).replace(np.nan, Flowchart.PROCESS_START.value)
-        conn_start = graph_data[graph_data[Flowchart.ACTIVITY_FROM.value] == Flowchart.PROCESS_START.value].drop_duplicates(subset=[Flowchart.ACTIVITY.value])[[Flowchart.ACTIVITY.value]]
-        for index, edge in conn_start.iterrows():
+        for activity in dict.fromkeys(trace[0] for trace in traces):
             graph.add_edge(pydot.Edge(Flowchart.PROCESS_START.value,
-                                      edge[Flowchart.ACTIVITY.value],
-                                      label=edge_label(Flowchart.PROCESS_START.value, edge[Flowchart.ACTIVITY.value]),
+                                      activity,
+                                      label=edge_label(Flowchart.PROCESS_START.value, activity),
                                       penwidth=Flowchart.EDGE_PENWIDTH.value,
-                                      id=Flowchart.PROCESS_START.value + '->' + edge[Flowchart.ACTIVITY.value],
+                                      id=Flowchart.PROCESS_START.value + '->' + activity,
                                       color=Flowchart.EDGE_COLOR.value,
                                       arrowhead=Flowchart.EDGE_ARROWHEAD.value,
                                       arrowsize=Flowchart.EDGE_ARROWSIZE.value))
         # Step 2. Add edge
-        connection = graph_data[graph_data[Flowchart.ACTIVITY_FROM.value] != Flowchart.PROCESS_START.value].drop_duplicates(subset=[Flowchart.ACTIVITY_FROM.value, Flowchart.ACTIVITY.value])
-        for index, edge in connection.iterrows():
-            graph.add_edge(pydot.Edge(edge[Flowchart.ACTIVITY_FROM.value],
-                                      edge[Flowchart.ACTIVITY.value],
-                                      label=edge_label(edge[Flowchart.ACTIVITY_FROM.value], edge[Flowchart.ACTIVITY.value]),
+        for activity_from, activity in dict.fromkeys(edge for trace in traces for edge in zip(trace[:-1], trace[1:])):
+            graph.add_edge(pydot.Edge(activity_from,
+                                      activity,
+                                      label=edge_label(activity_from, activity),
                                       penwidth=Flowchart.EDGE_PENWIDTH.value,
-                                      id=edge[Flowchart.ACTIVITY_FROM.value] + '->' + edge[Flowchart.ACTIVITY.value],
+                                      id=activity_from + '->' + activity,
                                       color=Flowchart.EDGE_COLOR.value,
                                       arrowhead=Flowchart.EDGE_ARROWHEAD.value,
                                       arrowsize=Flowchart.EDGE_ARROWSIZE.value))
         # Step 3. Add END edge
-        graph_data[Flowchart.ACTIVITY_TO.value] = graph_data.groupby(Variant.KEY.value)[Flowchart.ACTIVITY.value].shift(-1).replace(np.nan, Flowchart.PROCESS_END.value)
-        conn_end = graph_data[graph_data[Flowchart.ACTIVITY_TO.value] == Flowchart.PROCESS_END.value].drop_duplicates(subset=[Flowchart.ACTIVITY.value])[[Flowchart.ACTIVITY.value]]
-        for index, edge in conn_end.iterrows():
-            graph.add_edge(pydot.Edge(edge[Flowchart.ACTIVITY.value],
+        for activity in dict.fromkeys(trace[-1] for trace in traces):
+            graph.add_edge(pydot.Edge(activity,
                                       Flowchart.PROCESS_END.value,
-                                      label=edge_label(edge[Flowchart.ACTIVITY.value], Flowchart.PROCESS_END.value),
+                                      label=edge_label(activity, Flowchart.PROCESS_END.value),
                                       penwidth=Flowchart.EDGE_PENWIDTH.value,
-                                      id=Flowchart.PROCESS_END.value + '->' + edge[Flowchart.ACTIVITY.value],
+                                      id=Flowchart.PROCESS_END.value + '->' + activity,
                                       color=Flowchart.EDGE_COLOR.value,
                                       arrowhead=Flowchart.EDGE_ARROWHEAD.value,
                                       arrowsize=Flowchart.EDGE_ARROWSIZE.value))
@@ -277,11 +486,7 @@ class Pepper():
             DataFrame with the KPI values.
         """
         try:
-            dfsummary = pd.DataFrame()
-            for kpi_id in kpi_list:
-                df_kpi = self.__kpi(kpi_id).get_kpi()
-                dfsummary = pd.concat([df_kpi, dfsummary.loc[:]])
-            return dfsummary
+            return self.__cached_kpi('summary', kpi_list, lambda: KpiEngine(self).get_summary(kpi_list))
         except Exception as e:
             raise TypeError(f'Only Pepper KPI are allowed.[{type(e)}]')
 
@@ -298,11 +503,8 @@ class Pepper():
             DataFrame with the cases data and KPI values.
         """
         try:
-            dfcase = self.case_data
-            for kpi_id in kpi_list:
-                df_kpi = self.__kpi(kpi_id).get_kpi_cases()
-                dfcase = dfcase.merge(df_kpi, how='left', on=EventColumn.CASE_ID.value).replace(np.nan, None)
-            return dfcase
+            return self.__cached_kpi('cases', kpi_list, lambda: self.get_cases().merge(KpiEngine(self).get_cases(kpi_list), how='left',
+                                                                                   on=EventColumn.CASE_ID.value).replace(np.nan, None))
         except Exception as e:
             raise TypeError(f'Only Pepper KPI are allowed.[{type(e)}]')
 
@@ -319,11 +521,8 @@ class Pepper():
             DataFrame with the activities data and KPI values.
         """
         try:
-            dfactivity = self.activity_data
-            for kpi_id in kpi_list:
-                df_kpi = self.__kpi(kpi_id).get_kpi_activities()
-                dfactivity = dfactivity.merge(df_kpi, how='left', on=EventColumn.ACTIVITY.value).replace(np.nan, None)
-            return dfactivity
+            return self.__cached_kpi('activities', kpi_list, lambda: self.activity_data.merge(KpiEngine(self).get_activities(kpi_list), how='left',
+                                                                                              on=EventColumn.ACTIVITY.value).replace(np.nan, None))
         except Exception as e:
             raise TypeError(f'Only Pepper KPI are allowed.[{type(e)}]')
 
@@ -340,49 +539,43 @@ class Pepper():
             DataFrame with the Variants data and KPI values.
         """
         try:
-            dfvariant = self.variant_data
-            for kpi_id in kpi_list:
-                df_kpi = self.__kpi(kpi_id).get_kpi_variants()
-                dfvariant = dfvariant.merge(df_kpi, how='left', on=Variant.KEY.value).replace(np.nan, None)
-            return dfvariant
+            return self.__cached_kpi('variants', kpi_list, lambda: self.variant_data.merge(KpiEngine(self).get_variants(kpi_list), how='left',
+                                                                                           on=Variant.KEY.value).replace(np.nan, None))
         except Exception as e:
             raise TypeError(f'Only Pepper KPI are allowed.[{type(e)}]')
 
     def __set_variants(self) -> pd.DataFrame:
         """Discovery all variants of a event logs.
 
+        The variants are the nodes with cases of the prefix tree of the traces.
+
         Returns
         -------
         DataFrame
             DataFrame with the Variants data.
         """
-        var = self.get_event_log()[[EventColumn.CASE_ID.value, EventColumn.ACTIVITY.value, EventColumn.EVENT_TIME.value]]
-        # Create a key for each variant
-        var = var.sort_values(EventColumn.EVENT_TIME.value).groupby(EventColumn.CASE_ID.value)[EventColumn.ACTIVITY.value].apply(lambda var: var.reset_index(drop=True)).unstack()
-        var = var.replace(np.nan, None)
-        var[Variant.KEY.value] = var[var.columns].apply(lambda row: Variant.SPLIT_SEP.value.join(row.values.astype(str)), axis=1).str.replace(str(Variant.SPLIT_SEP.value + 'None'), '')
-        # Variant Discovery
-        variant = var[Variant.KEY.value].reset_index().groupby(Variant.KEY.value)[EventColumn.CASE_ID.value].apply(list).reset_index().rename(columns={EventColumn.CASE_ID.value: Variant.CASES.value})
-        # Add Activities for each Variant
-        variant[Variant.ACTIVITIES.value] = variant[Variant.KEY.value].str.split(Variant.SPLIT_SEP.value)
-        # Add Cases for each Variant
-        variant[Variant.KEY.value] = variant[Variant.KEY.value].str.replace(Variant.SPLIT_SEP.value, Variant.ACT_CONN.value)
-        #
-        return variant
-
-    def __kpi(self, kpi_id: str) -> PepperKpi:
-        """ Return de object PepperKpi
+        if self.get_variant_trie() is None:
+            return variant_discovery(self.get_event_log())
+        return self.get_variant_trie().to_frame()
+
+    def __cached_kpi(self, grain: str, kpi_list: list, compute) -> pd.DataFrame:
+        """Return the KPI values of a grain from the KPI cache.
 
         Parameters
         ----------
-        kpi_id : str
-            From a id kpi return the object.
-            kpi_id = 'NumberOfCases'
+        grain : str
+            Grain of the KPI values (summary, cases, activities or variants).
+        kpi_list : list(str)
+            The a KPIs list.
+        compute
+            Function that computes the KPI values.
 
         Returns
         -------
-        PepperKpi
-            PepperKpi object.
+        DataFrame
+            DataFrame with the KPI values.
         """
-        kpi = globals()[kpi_id]
-        return kpi(self)
+        cache = self.get_kpi_cache()
+        if cache is None:
+            return compute()
+        return cache.get_or_compute((self.get_fingerprint(), self.get_filter(), tuple(kpi_list), grain, ()), compute)
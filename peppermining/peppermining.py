@@ -1,10 +1,18 @@
+import os
 import numpy as np
 import pandas as pd
 
-from pandas.api.types import is_datetime64_any_dtype
-from typing import Optional
-
-from peppermining.utils.enum import EventColumn
+from pandas.api.types import is_categorical_dtype, union_categoricals
+from typing import Callable, Optional
+
+from peppermining.utils.enum import EventColumn, Variant
+from peppermining.utils.case_index import CaseIndex
+from peppermining.utils.variant_discovery import update_variants
+from peppermining.utils.kpi_cache import KpiCache
+from peppermining.utils.parallel_backend import ParallelBackend
+from peppermining.utils.xes_reader import read_xes
+from peppermining.utils.timestamp_parser import TimestampParser
+from peppermining.utils.storage import write_frame, read_frame, write_arrays, read_arrays, write_metadata, read_metadata
 from peppermining.pepper import Pepper
 
 
@@ -14,20 +22,41 @@ class PepperMining(Pepper):
     Process mining refers to discovering knowledge about business processes from the automatic analysis of event logs.
     The first step to using the Pepper Mining is create the PepperMining object and add event logs.
 
+    Attributes
+    ----------
+    compact : bool
+        Compact storage mode. The columns 'case_id', 'activity' and 'user' are stored as pandas Categorical.
+    kpi_cache : KpiCache
+        Memoized KPI results of PepperMining and its filters, None if the cache is disabled.
+    kpi_backend : ParallelBackend
+        Process pool of the KPI aggregations of PepperMining and its filters, None if n_jobs is 1.
+
     Methods
     -------
     set_event_log
         Input the event logs data.
     set_cases
         Input the cases data.
+    append_events
+        Append new events to the event logs data.
     clear_datas
         Clear event log and cases.
     clear_cases
         Clear cases.
     read_event_log_csv
-        Import the CSV to event logs data.
+        Import the CSV to event logs data, at once or in chunks.
     read_cases_csv
         Import the CSV to cases data.
+    read_event_log_xes
+        Import the IEEE XES file to event logs and cases data.
+    save
+        Save the event logs, cases and indexes to Arrow IPC files.
+    load
+        Return a PepperMining object loaded from the files of save.
+    close
+        Shut down the process pool of the KPI aggregations.
+
+    PepperMining is a context manager, the process pool is shut down at the exit of the with block.
 
     Example
     -------
@@ -42,13 +71,28 @@ class PepperMining(Pepper):
     >>> pm.set_event_log(df)
     >>> pm.get_event_data()
     """
-    # TODO: Read IEEE XES files. http://www.xes-standard.org/
-
-    def __init__(self):
+    def __init__(self, compact: Optional[bool] = False, kpi_cache_size: Optional[int] = 128, n_jobs: Optional[int] = 1):
         """Created PepperMining object.
+
+        Parameters
+        ----------
+        compact : bool, Default: False
+            If True, the columns 'case_id', 'activity' and 'user' are stored as pandas Categorical (integer codes).
+            All filters, KPIs and violations share the same activity dictionary.
+            The memory usage drops several-fold and the groupbys are faster on large event logs.
+        kpi_cache_size : int, Default: 128
+            Maximum number of KPI results memoized for PepperMining and its filters. If 0, the KPI cache is disabled.
+        n_jobs : int, Default: 1
+            Number of processes of the KPI aggregations per case and per activity, -1 for the number of CPUs.
+            If 1, the KPIs are aggregated in this process. The event logs with less than 2 000 000 events are always
+            aggregated in this process.
         """
         super().__init__()
+        self.compact = compact
+        self.kpi_cache = KpiCache(kpi_cache_size) if kpi_cache_size else None
+        self.kpi_backend = ParallelBackend(n_jobs) if n_jobs != 1 else None
         self.__format_date_csv = None
+        self.__timestamp_parser = TimestampParser()
 
     def set_event_log(self, event_log: pd.DataFrame) -> None:
         """Input the event logs data.
@@ -77,6 +121,11 @@ class PepperMining(Pepper):
         """
         self.event_data = self.__validate_event_data(event_log)
         self.case_data = self.event_data[EventColumn.CASE_ID.value].drop_duplicates().reset_index(drop=True).to_frame()
+        self.activity_dictionary = self.__activity_dictionary(self.event_data)
+        self.case_index = CaseIndex(self.event_data, self.activity_dictionary)
+        self.dfg_data = None
+        self.variant_trie = None
+        self.__data_changed()
 
     def set_cases(self, cases: pd.DataFrame) -> None:
         """Input cases to event logs.
@@ -100,6 +149,73 @@ class PepperMining(Pepper):
         >>> pm.get_event_data()
         """
         self.case_data = self.__validate_case_data(cases)
+        self.__data_changed()
+
+    def append_events(self, event_log: pd.DataFrame) -> None:
+        """Append new events to the event logs data.
+
+        The new events can be of new cases or of cases already in the event logs.
+        The event logs are not loaded again: the case index sorts only the events of the cases with new events,
+        the new cases are added to the cases data and only the variants of the cases with new events are changed.
+        The KPI cache is cleared and the data version changes, so the filters are evaluated again on their next use.
+        The event_time of the new events is parsed with the format of the event logs, also when the format was inferred.
+
+        Parameters
+        ----------
+        event_log : pd.DataFrame
+            DataFrame with 'case_id', 'activity', and 'event_time' columns.
+
+        Example
+        -------
+        >>> pm = PepperMining()
+        >>> pm.read_event_log_csv("tests/data/eventlog-example.csv", separator=';', format_date='%d/%m/%Y %H:%M')
+        >>> data = {'case_id': [1, 9], 'activity': ['archive request', 'register request'],
+                    'event_time': ['2022-02-20 10:00:00', '2022-02-20 11:00:00'], 'user': ['Pete', 'Mike']}
+        >>> pm.append_events(pd.DataFrame(data, columns=['case_id', 'activity', 'event_time', 'user']))
+        >>> pm.get_variants()
+        """
+        if self.event_data.empty:
+            self.set_event_log(event_log)
+            return
+        events = self.__validate_event_data(event_log, append=True)
+        if events.empty:
+            return
+        # New cases, before the append
+        cases = pd.unique(np.asarray(events[EventColumn.CASE_ID.value]))
+        new_cases = cases[self.case_index.case_codes_of(cases) < 0]
+        # The variants are kept up to date with the prefix tree of the traces
+        if not self.variant_data.empty:
+            self.get_variant_trie()
+        indexed = len(self.case_index.case_codes)
+        # Event logs, activity dictionary and case index
+        self.event_data = self.__append_event_data(events)
+        if self.compact:
+            self.activity_dictionary = self.event_data[EventColumn.ACTIVITY.value].cat.categories
+        else:
+            activities = pd.Index(events[EventColumn.ACTIVITY.value].dropna().unique())
+            self.activity_dictionary = self.activity_dictionary.append(pd.Index(np.sort(activities[~activities.isin(self.activity_dictionary)])))
+        affected = self.case_index.append(self.event_data, self.activity_dictionary)
+        # Cases, activities and variants
+        if len(new_cases):
+            rows = pd.DataFrame({column: [None] * len(new_cases) for column in self.case_data.columns})
+            rows[EventColumn.CASE_ID.value] = new_cases
+            self.case_data = pd.concat([self.case_data, rows], ignore_index=True)
+            if self.compact:
+                self.case_data[EventColumn.CASE_ID.value] = self.case_data[EventColumn.CASE_ID.value].astype(self.event_data[EventColumn.CASE_ID.value].dtype)
+        if not self.activity_data.empty:
+            activities = events[EventColumn.ACTIVITY.value].dropna().drop_duplicates()
+            activities = activities[~activities.isin(self.activity_data[EventColumn.ACTIVITY.value])]
+            self.activity_data = pd.concat([self.activity_data, activities.to_frame()], ignore_index=True)
+            if self.compact:
+                self.activity_data[EventColumn.ACTIVITY.value] = self.activity_data[EventColumn.ACTIVITY.value].astype(self.event_data[EventColumn.ACTIVITY.value].dtype)
+        if self.variant_trie is not None:
+            old_nodes, new_nodes = self.variant_trie.update(self.case_index, affected, indexed)
+            if not self.variant_data.empty:
+                self.variant_data = update_variants(self.variant_data, self.case_index.case_ids[affected].tolist(),
+                                                    [self.variant_trie.trace_activities(node) if node >= 0 else None for node in old_nodes.tolist()],
+                                                    [self.variant_trie.trace_activities(node) for node in new_nodes.tolist()])
+        self.dfg_data = None
+        self.__data_changed()
 
     def clear_datas(self) -> None:
         """Clear event log and cases.
@@ -109,6 +225,13 @@ class PepperMining(Pepper):
         """
         self.event_data = pd.DataFrame()
         self.case_data = pd.DataFrame()
+        self.activity_data = pd.DataFrame()
+        self.variant_data = pd.DataFrame()
+        self.dfg_data = None
+        self.variant_trie = None
+        self.activity_dictionary = pd.Index([])
+        self.case_index = None
+        self.__data_changed()
 
     def clear_cases(self) -> None:
         """Clear cases.
@@ -116,9 +239,11 @@ class PepperMining(Pepper):
         Reset the case data.
         After this method is possible include a new cases to the peppermining object.
         """
-        self.case_data = self.event_data[EventColumn.CASE_ID.value].drop_duplicates().reset_index(drop=True)
+        self.case_data = self.event_data[EventColumn.CASE_ID.value].drop_duplicates().reset_index(drop=True).to_frame()
+        self.__data_changed()
 
-    def read_event_log_csv(self, file_path: str, separator: Optional[str] = ';', format_date: Optional[str] = None) -> None:
+    def read_event_log_csv(self, file_path: str, separator: Optional[str] = ';', format_date: Optional[str] = None,
+                           chunksize: Optional[int] = None, progress: Optional[Callable[[int, float], None]] = None) -> None:
         """Import the CSV to event logs data.
 
         Import the CSV into a pandas DataFrame.
@@ -126,6 +251,12 @@ class PepperMining(Pepper):
         The first step is to import the CSV file and internal API validate and convert it to the event log.
         See more infomation in the pandas documentation.
 
+        With chunksize, the CSV is read in chunks of rows, so the large files never are loaded as object columns.
+        The columns 'case_id', 'activity', 'user' and the strings of 'event_time' of each chunk are encoded as pandas Categorical.
+        The chunks are appended in a columnar store and the categories are united at the end.
+        The event_time is parsed once after the reading, so a format not informed is inferred from the timestamps of all chunks.
+        In the compact storage mode the event logs keep the Categorical columns, else they are decoded after the reading.
+
         Parameters
         ----------
         file_path : str
@@ -137,19 +268,29 @@ class PepperMining(Pepper):
             If None then is used pd.to_datetime without format.
             See strftime documentation for more information on choices.
             https://docs.python.org/3/library/datetime.html#strftime-and-strptime-behavior
+        chunksize : int, Default: None
+            Number of rows of each chunk. If None, the CSV is read at once.
+        progress : Callable[[int, float], None], Default: None
+            Function called after each chunk with the number of rows read and the fraction of the file read (0 to 1).
 
         Example
         -------
         >>> pm = PepperMining()
         >>> pm.read_event_log_csv("tests/data/eventlog-example.csv", separator=';', format_date='%d/%m/%Y %H:%M')
         >>> pm.get_event_data()
+        >>> pm = PepperMining(compact=True)
+        >>> pm.read_event_log_csv("tests/data/pizza_event.csv", separator=';', format_date='%d/%m/%Y %H:%M',
+                                  chunksize=1000, progress=lambda rows, fraction: print(f"{rows} rows ({fraction:.0%})"))
 
         See Also
         --------
         https://pandas.pydata.org/docs/reference/api/pandas.read_csv.html?highlight=read_csv#
         """
-        df = pd.read_csv(file_path, sep=separator)
         self.__format_date_csv = format_date
+        if chunksize is None:
+            df = pd.read_csv(file_path, sep=separator)
+        else:
+            df = self.__read_event_log_chunks(file_path, separator, chunksize, progress)
         self.set_event_log(df)
 
     def read_cases_csv(self, file_path: str, separator: Optional[str] = ';') -> None:
@@ -182,45 +323,296 @@ class PepperMining(Pepper):
         df = pd.read_csv(file_path, sep=separator)
         self.set_cases(df)
 
-    def __validate_event_data(self, p_df: pd.DataFrame) -> pd.DataFrame:
+    def read_event_log_xes(self, file_path: str) -> None:
+        """Import the IEEE XES file to event logs and cases data.
+
+        The XML is streamed, so the large files are read with memory proportional to the event logs.
+        The attributes of the events are mapped to the columns: 'concept:name' to 'activity', 'time:timestamp' to 'event_time'
+        and 'org:resource' to 'user', the others attributes are columns with the name of the key.
+        The attribute 'concept:name' of the trace is the 'case_id', the others attributes of the trace are the cases data.
+        The event_time is converted to UTC.
+
+        Parameters
+        ----------
+        file_path : str
+            Any valid string path is acceptable.
+
+        Example
+        -------
+        >>> pm = PepperMining()
+        >>> pm.read_event_log_xes("tests/data/eventlog-example.xes")
+        >>> pm.get_event_log()
+        >>> pm.get_cases()
+
+        See Also
+        --------
+        http://www.xes-standard.org/
+        """
+        event_log, cases = read_xes(file_path)
+        self.__format_date_csv = None
+        self.set_event_log(event_log)
+        if len(cases.columns) > 1:
+            self.set_cases(cases)
+
+    def save(self, path: str) -> None:
+        """Save the event logs, cases and indexes to Arrow IPC files.
+
+        The event logs and cases are written in the columnar Arrow IPC format (uncompressed), the Categorical columns
+        of the compact storage mode are written as dictionary-encoded columns. The activity dictionary, the case index
+        and the variants (if discovered) are saved too, so the load does not parse or sort the event logs again.
+        The format of the timestamps is saved, so the events appended after the load are parsed with the same format.
+        The pyarrow package is required: pip install peppermining[arrow]
+
+        Parameters
+        ----------
+        path : str
+            Directory of the files, it is created if not exists.
+
+        Raises
+        ------
+        ValueError
+            (1) Has not event logs data.
+
+        Example
+        -------
+        >>> pm = PepperMining(compact=True)
+        >>> pm.read_event_log_csv("tests/data/pizza_event.csv", separator=';', format_date='%d/%m/%Y %H:%M')
+        >>> pm.save("pizza")
+        >>> pm = PepperMining.load("pizza")
+        """
+        if self.event_data.empty:
+            raise TypeError("Has not event logs data. Before save, is required has event logs.")
+        os.makedirs(path, exist_ok=True)
+        write_frame(self.event_data, os.path.join(path, 'event_data.arrow'))
+        write_frame(self.case_data, os.path.join(path, 'case_data.arrow'))
+        write_arrays({EventColumn.ACTIVITY.value: np.asarray(self.activity_dictionary)}, os.path.join(path, 'activities.arrow'))
+        event_arrays, case_arrays = self.case_index.to_arrays()
+        write_arrays(event_arrays, os.path.join(path, 'case_index_events.arrow'))
+        write_arrays(case_arrays, os.path.join(path, 'case_index_cases.arrow'))
+        if not self.variant_data.empty:
+            write_frame(self.variant_data, os.path.join(path, 'variant_data.arrow'))
+        elif os.path.isfile(os.path.join(path, 'variant_data.arrow')):
+            os.remove(os.path.join(path, 'variant_data.arrow'))
+        write_metadata({'compact': self.compact, 'format_date': self.__timestamp_parser.format, 'unit': self.__timestamp_parser.unit},
+                       os.path.join(path, 'metadata.json'))
+
+    @classmethod
+    def load(cls, path: str, kpi_cache_size: Optional[int] = 128, n_jobs: Optional[int] = 1) -> 'PepperMining':
+        """Return a PepperMining object loaded from the files of save.
+
+        The files are memory mapped, the numeric columns and the arrays of the case index are not copied.
+        The pyarrow package is required: pip install peppermining[arrow]
+
+        Parameters
+        ----------
+        path : str
+            Directory of the files.
+        kpi_cache_size : int, Default: 128
+            Maximum number of KPI results memoized for PepperMining and its filters. If 0, the KPI cache is disabled.
+        n_jobs : int, Default: 1
+            Number of processes of the KPI aggregations per case and per activity, -1 for the number of CPUs.
+
+        Returns
+        -------
+        PepperMining
+            PepperMining object with the event logs, cases and indexes saved.
+
+        Raises
+        ------
+        ValueError
+            (1) Not exists the PepperMining files.
+            (2) The format of the files is not supported.
+
+        Example
+        -------
+        >>> pm = PepperMining.load("pizza")
+        >>> pm.get_summary()
+        """
+        metadata = read_metadata(os.path.join(path, 'metadata.json'))
+        pm = cls(compact=metadata['compact'], kpi_cache_size=kpi_cache_size, n_jobs=n_jobs)
+        pm.__timestamp_parser = TimestampParser(metadata.get('format_date'), metadata.get('unit'))
+        pm.event_data = read_frame(os.path.join(path, 'event_data.arrow'))
+        pm.case_data = read_frame(os.path.join(path, 'case_data.arrow'))
+        if pm.compact:
+            pm.activity_dictionary = pm.event_data[EventColumn.ACTIVITY.value].cat.categories
+        else:
+            pm.activity_dictionary = pd.Index(read_arrays(os.path.join(path, 'activities.arrow'))[EventColumn.ACTIVITY.value])
+        pm.case_index = CaseIndex.from_arrays(pm.activity_dictionary,
+                                              read_arrays(os.path.join(path, 'case_index_events.arrow')),
+                                              read_arrays(os.path.join(path, 'case_index_cases.arrow')))
+        if os.path.isfile(os.path.join(path, 'variant_data.arrow')):
+            variant = read_frame(os.path.join(path, 'variant_data.arrow'))
+            for column in [Variant.CASES.value, Variant.ACTIVITIES.value]:
+                variant[column] = [values.tolist() for values in variant[column]]
+            pm.variant_data = variant
+        pm.__data_changed()
+        return pm
+
+    def close(self) -> None:
+        """Shut down the process pool of the KPI aggregations.
+
+        The pool is created again if a KPI is aggregated in parallel after the close.
+
+        Example
+        -------
+        >>> pm = PepperMining(n_jobs=-1)
+        >>> pm.read_event_log_csv("tests/data/pizza_event.csv", separator=';', format_date='%d/%m/%Y %H:%M')
+        >>> pm.get_summary()
+        >>> pm.close()
+        """
+        if self.kpi_backend is not None:
+            self.kpi_backend.close()
+
+    def __enter__(self) -> 'PepperMining':
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        self.close()
+
+    def __read_event_log_chunks(self, file_path: str, separator: str, chunksize: int, progress: Optional[Callable[[int, float], None]]) -> pd.DataFrame:
+        """Read the CSV of event logs in chunks.
+
+        Each chunk is validated and its columns 'case_id', 'activity', 'user' and the strings of 'event_time' are encoded as Categorical.
+        The columns of the chunks are kept in a columnar store (a list of arrays per column) and they are concatenated once.
+        The event_time is not parsed here, it is parsed once with the unique timestamps of all chunks in the validation of the event logs.
+
+        Parameters
+        ----------
+        file_path : str
+            Any valid string path is acceptable.
+        separator : str
+            Delimiter used in CSV file.
+        chunksize : int
+            Number of rows of each chunk.
+        progress : Callable[[int, float], None]
+            Function called after each chunk with the number of rows read and the fraction of the file read.
+
+        Returns
+        -------
+        DataFrame
+            DataFrame with the event logs.
+
+        Raises
+        ------
+        ValueError
+            (1) The chunksize must be a positive integer.
+            (2) Not exists the column case_id, activity or event_time, the columns are mandatory.
+        """
+        if not (isinstance(chunksize, int)) or chunksize <= 0:
+            raise TypeError("The chunksize must be a positive integer.")
+        categorical_columns = [EventColumn.CASE_ID.value, EventColumn.ACTIVITY.value, EventColumn.USER.value]
+        store = {}
+        rows = 0
+        with open(file_path, 'rb') as file:
+            file_size = max(os.fstat(file.fileno()).st_size, 1)
+            for chunk in pd.read_csv(file, sep=separator, chunksize=chunksize):
+                for column in [EventColumn.CASE_ID.value, EventColumn.ACTIVITY.value, EventColumn.EVENT_TIME.value]:
+                    if not (column in chunk.columns):
+                        raise TypeError(f"Not exists the column {column}, the column {column} is mandatory.")
+                # The timestamps of a chunk are strings, they are repeated in many events
+                if chunk[EventColumn.EVENT_TIME.value].dtype == object:
+                    chunk[EventColumn.EVENT_TIME.value] = chunk[EventColumn.EVENT_TIME.value].astype('category')
+                for column in chunk.columns:
+                    values = chunk[column].astype('category') if column in categorical_columns else chunk[column]
+                    store.setdefault(column, []).append(values)
+                rows += len(chunk)
+                if progress is not None:
+                    progress(rows, min(file.tell() / file_size, 1.0))
+        if not store:
+            return pd.read_csv(file_path, sep=separator)
+        # Concatenate each column once, the chunks are released column by column
+        columns = {}
+        for column in list(store):
+            values = store.pop(column)
+            if column in categorical_columns:
+                values = self.__union_categoricals(values, sort_categories=True)
+                columns[column] = values if self.compact else pd.Series(np.asarray(values))
+            elif column == EventColumn.EVENT_TIME.value and all(is_categorical_dtype(value) for value in values):
+                columns[column] = self.__union_categoricals(values, sort_categories=False)
+            else:
+                columns[column] = pd.concat(values, ignore_index=True)
+        return pd.DataFrame(columns)
+
+    @staticmethod
+    def __union_categoricals(values: list, sort_categories: bool) -> pd.Series:
+        """Return the union of Categorical columns.
+
+        Without sort_categories, the categories of the first column keep their codes.
+        """
+        # The columns without values have other dtype of categories (e.g. float for a column of NaN)
+        if len(set(value.cat.categories.dtype for value in values)) > 1:
+            values = [value.astype(pd.CategoricalDtype(value.cat.categories.astype(object))) for value in values]
+        return pd.Series(union_categoricals(values, sort_categories=sort_categories))
+
+    def __append_event_data(self, events: pd.DataFrame) -> pd.DataFrame:
+        """Return the event logs with the new events at the end.
+
+        In the compact storage mode, the new categories are added after the categories of the event logs,
+        so the codes of the activities do not change.
+        """
+        event_data = pd.concat([self.event_data, events], ignore_index=True)
+        if self.compact:
+            for column in [EventColumn.CASE_ID.value, EventColumn.ACTIVITY.value, EventColumn.USER.value]:
+                if column in event_data.columns:
+                    parts = [df[column] if column in df.columns else pd.Series(pd.Categorical([None] * len(df))) for df in (self.event_data, events)]
+                    event_data[column] = self.__union_categoricals(parts, sort_categories=False)
+        return event_data
+
+    def __data_changed(self) -> None:
+        """Invalidate the KPI cache and the variant ids after a change of the event logs or cases.
+        """
+        self.data_version += 1
+        self.variant_id = None
+        if self.kpi_cache is not None:
+            self.kpi_cache.clear()
+
+    def __validate_event_data(self, p_df: pd.DataFrame, append: Optional[bool] = False) -> pd.DataFrame:
         """Validate event logs data.
 
         Parameters
         ----------
         p_df : pd.DataFrame
             DataFrame with case_id, activity, and event_time columns.
+        append : bool, Default: False
+            If True, the events are appended to the event logs data.
 
         Returns
         -------
         DataFrame
-            DataFrame with the data valid and datetime format.
+            DataFrame with the data valid, datetime format and a default index.
 
         Raises
         ------
         ValueError
             (1) Only Pandas DataFrame are allowed in Event logs.
-            (2) Has event logs data. It needs clear the event log.
+            (2) Has event logs data. It needs clear the event log (not checked to append events).
             (3) Not exists the column case_id, the column case_id is mandatory.
             (4) Not exists the column activity, the column activity is mandatory.
             (5) Not exists the column event_time, the column event_time is mandatory.
-            (6) The column event_time is a datetime type invalid.
+            (6) The column event_time is a datetime type invalid, the message has the first row that does not match the format.
         """
         if not (isinstance(p_df, pd.DataFrame)):
             raise TypeError("Only Pandas DataFrame are allowed in Event logs.")
-        if not (self.event_data.empty):
-            raise TypeError("Has event logs data. It needs clear the event logs. e.g. Use the method clear_datas.")
+        if not (self.event_data.empty) and not append:
+            raise TypeError("Has event logs data. It needs clear the event logs. e.g. Use the method clear_datas or append_events.")
         if not (EventColumn.CASE_ID.value in p_df.columns):
             raise TypeError(f"Not exists the column {EventColumn.CASE_ID.value}, the column {EventColumn.CASE_ID.value} is mandatory.")
         if not (EventColumn.ACTIVITY.value in p_df.columns):
             raise TypeError(f"Not exists the column {EventColumn.ACTIVITY.value}, the column {EventColumn.ACTIVITY.value} is mandatory.")
         if not (EventColumn.EVENT_TIME.value in p_df.columns):
             raise TypeError(f"Not exists the column {EventColumn.EVENT_TIME.value}, the column {EventColumn.EVENT_TIME.value} is mandatory.")
-        # Format event_time to datetime valid
-        p_df[EventColumn.EVENT_TIME.value] = pd.to_datetime(p_df[EventColumn.EVENT_TIME.value], format=self.__format_date_csv, errors='ignore')
-        if not (is_datetime64_any_dtype(p_df[EventColumn.EVENT_TIME.value])):
-            raise TypeError(f"The column {EventColumn.EVENT_TIME.value} is a datetime type invalid.")
-        #
-        return p_df
+        # Format event_time to datetime valid, the rows that do not match the format are reported
+        # The parser of the event logs is kept, so the events appended are parsed with the format found in the event logs
+        if not append:
+            self.__timestamp_parser = TimestampParser(self.__format_date_csv)
+        p_df[EventColumn.EVENT_TIME.value] = self.__timestamp_parser.parse(p_df[EventColumn.EVENT_TIME.value], EventColumn.EVENT_TIME.value)
+        # Compact storage: Categorical columns with a shared activity dictionary
+        if self.compact:
+            for column in [EventColumn.CASE_ID.value, EventColumn.ACTIVITY.value, EventColumn.USER.value]:
+                if column in p_df.columns:
+                    p_df[column] = p_df[column].astype('category')
+        # The row positions are used by the case index
+        return p_df.reset_index(drop=True)
 
     def __validate_case_data(self, p_df: pd.DataFrame) -> pd.DataFrame:
         """Validate Cases data.
@@ -258,4 +650,27 @@ class PepperMining(Pepper):
         # Exist event log without Case Then a merge is made
         if False in (self.event_data[EventColumn.CASE_ID.value].isin(p_df[EventColumn.CASE_ID.value])).values:
             p_df = p_df.merge(self.case_data, how='right', on='case_id').replace(np.nan, None)
+        # Compact storage: The cases share the categories of the event logs
+        if self.compact:
+            p_df[EventColumn.CASE_ID.value] = p_df[EventColumn.CASE_ID.value].astype(self.event_data[EventColumn.CASE_ID.value].dtype)
         return p_df
+
+    def __activity_dictionary(self, p_df: pd.DataFrame) -> pd.Index:
+        """Return the activity dictionary of event logs.
+
+        The position of each activity in the dictionary is the integer code of the activity.
+        The missing activities are not in the dictionary, their code is -1.
+
+        Parameters
+        ----------
+        p_df : pd.DataFrame
+            DataFrame with activity column.
+
+        Returns
+        -------
+        Index
+            Index with the activities sorted.
+        """
+        if self.compact:
+            return p_df[EventColumn.ACTIVITY.value].cat.categories
+        return pd.Index(p_df[EventColumn.ACTIVITY.value].dropna().unique()).sort_values()
@@ -1,3 +1,4 @@
-from peppermining.utils import enum
+from peppermining.utils import enum, variant_discovery
 
 from peppermining.utils.enum import EventColumn, KpiColumn, Variant, Flowchart, ModelColumn, ViolationColumn
+from peppermining.utils.variant_discovery import variant_discovery
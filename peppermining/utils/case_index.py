@@ -0,0 +1,411 @@
+import numpy as np
+import pandas as pd
+
+from pandas.api.types import is_categorical_dtype
+
+from peppermining.utils.enum import EventColumn
+
+
+class CaseIndex():
+    """Case-segmented index of an event log.
+
+    The index is built once when the event logs are loaded and it is shared by the PepperMining and all PepperFilter objects.
+    The events are sorted by case and event time, each case is a segment of the sorted events.
+    For each event the index keeps the previous and the next event of the same case, so the filters, KPIs and violations
+    find the start, end and directly-follows activities with array lookups instead of groupby-shift passes.
+
+    The positions are the row positions of the event logs of PepperMining.
+    Since the filters keep the index of the rows, the positions of a filtered event log are its index values.
+    A case mask is a boolean array over the case codes, the filters select the cases with case masks.
+
+    Attributes
+    ----------
+    case_ids : np.ndarray
+        Case identifier of each case code, sorted.
+    activities : pd.Index
+        Activity dictionary, the activity name of each activity code.
+    case_codes : np.ndarray
+        Case code of each event.
+    activity_codes : np.ndarray
+        Activity code of each event.
+    event_time : np.ndarray
+        Event time of each event, in UTC without time zone if the event time has a time zone.
+    order : np.ndarray
+        Positions of the events sorted by case and event time.
+    starts : np.ndarray
+        Offset in order of the first event of each case.
+    lengths : np.ndarray
+        Number of events of each case.
+    first_position : np.ndarray
+        Position of the first event of each case.
+    last_position : np.ndarray
+        Position of the last event of each case.
+    start_time : np.ndarray
+        Minimum event time of each case, NaT if the case has not event time.
+    end_time : np.ndarray
+        Maximum event time of each case, NaT if the case has not event time.
+    prev_position : np.ndarray
+        Position of the previous event of the same case, -1 for the start events.
+    next_position : np.ndarray
+        Position of the next event of the same case, -1 for the end events.
+    prev_activity : np.ndarray
+        Activity code of the previous event of the same case, -1 for the start events.
+    next_activity : np.ndarray
+        Activity code of the next event of the same case, -1 for the end events.
+
+    Methods
+    -------
+    append
+        Append to the index the events added at the end of the event logs.
+    to_arrays
+        Return the arrays of the index, per event and per case.
+    from_arrays
+        Return an index from the arrays of to_arrays, without sorting the events again.
+    positions
+        Return the positions of the events of an event log.
+    sorted_positions
+        Return the positions of the events of an event log sorted by case and event time.
+    activity_code
+        Return the activity code of an activity.
+    activity_codes_of
+        Return the activity codes of a list of activities.
+    case_list
+        Return the cases of a list of events.
+    case_codes_of
+        Return the case codes of a list of cases.
+    case_mask
+        Return the case mask of a list of cases.
+    case_mask_of_events
+        Return the case mask of the cases with at least one event of a list of events.
+    event_mask
+        Return the mask of the events of an event log that belong to the cases of a case mask.
+    cases_mask
+        Return the mask of the cases of a cases data that are in a case mask.
+    """
+
+    def __init__(self, event_log: pd.DataFrame, activities: pd.Index):
+        """Build the index of an event log.
+
+        Parameters
+        ----------
+        event_log : pd.DataFrame
+            DataFrame with 'case_id', 'activity', and 'event_time' columns and a default RangeIndex.
+        activities : pd.Index
+            Activity dictionary.
+        """
+        self.activities = activities
+        case_codes, case_ids = pd.factorize(event_log[EventColumn.CASE_ID.value], sort=True)
+        self.case_ids = np.asarray(case_ids)
+        self._case_lookup = pd.Index(self.case_ids)
+        self.case_codes = case_codes
+        if is_categorical_dtype(event_log[EventColumn.ACTIVITY.value]):
+            self.activity_codes = event_log[EventColumn.ACTIVITY.value].cat.codes.to_numpy(dtype=np.intp)
+        else:
+            self.activity_codes = activities.get_indexer(event_log[EventColumn.ACTIVITY.value])
+        self.event_time = _event_time(event_log[EventColumn.EVENT_TIME.value])
+        # Sort the events by case and event time, the events at the same time keep the order of the event log
+        self.__set_order(np.lexsort((self.event_time.view('i8'), case_codes)))
+
+    def __set_order(self, order: np.ndarray) -> None:
+        """Set the sorted events and compute the case segments and the previous and next events from them.
+        """
+        self.order = order
+        sorted_cases = self.case_codes[self.order]
+        self.starts = np.flatnonzero(np.r_[True, sorted_cases[1:] != sorted_cases[:-1]]) if len(sorted_cases) else np.array([], dtype=np.intp)
+        self.lengths = np.diff(np.r_[self.starts, len(sorted_cases)]).astype(np.intp)
+        self.first_position = self.order[self.starts]
+        self.last_position = self.order[self.starts + self.lengths - 1]
+        self.start_time = self.__segment_time(np.minimum)
+        self.end_time = self.__segment_time(np.maximum)
+        # Previous and next event of the same case
+        same_case = sorted_cases[1:] == sorted_cases[:-1]
+        self.prev_position = np.full(len(self.case_codes), -1, dtype=np.intp)
+        self.next_position = np.full(len(self.case_codes), -1, dtype=np.intp)
+        self.prev_position[self.order[1:]] = np.where(same_case, self.order[:-1], -1)
+        self.next_position[self.order[:-1]] = np.where(same_case, self.order[1:], -1)
+        self.prev_activity = np.where(self.prev_position >= 0, self.activity_codes[self.prev_position], -1)
+        self.next_activity = np.where(self.next_position >= 0, self.activity_codes[self.next_position], -1)
+
+    def append(self, event_log: pd.DataFrame, activities: pd.Index) -> np.ndarray:
+        """Append to the index the events added at the end of the event logs.
+
+        Only the events of the cases with new events are sorted again. The other cases keep their sorted events,
+        and the two sorted runs are merged. The case codes stay sorted by case, the new cases get codes among the others.
+        The activity dictionary must keep the codes of the activities already indexed.
+
+        Parameters
+        ----------
+        event_log : pd.DataFrame
+            Event logs of PepperMining, the new events are the rows after the events already indexed.
+        activities : pd.Index
+            Activity dictionary, with the new activities after the activities already indexed.
+
+        Returns
+        -------
+        np.ndarray
+            Case codes of the cases with new events.
+        """
+        indexed = len(self.case_codes)
+        events = event_log.iloc[indexed:]
+        self.activities = activities
+        # New cases, the codes are renumbered if a new case is not after the last case
+        new_cases = pd.unique(np.asarray(events[EventColumn.CASE_ID.value]))
+        new_cases = new_cases[self._case_lookup.get_indexer(new_cases) < 0]
+        if len(new_cases):
+            case_ids = np.concatenate([self.case_ids, np.sort(new_cases)])
+            if len(self.case_ids) and not (pd.Index(case_ids).is_monotonic_increasing):
+                sorting = np.argsort(case_ids, kind='stable')
+                recode = np.empty(len(case_ids), dtype=np.intp)
+                recode[sorting] = np.arange(len(case_ids))
+                self.case_codes = recode[self.case_codes]
+                case_ids = case_ids[sorting]
+            self.case_ids = case_ids
+            self._case_lookup = pd.Index(self.case_ids)
+        case_codes = self._case_lookup.get_indexer(events[EventColumn.CASE_ID.value])
+        if is_categorical_dtype(events[EventColumn.ACTIVITY.value]):
+            activity_codes = events[EventColumn.ACTIVITY.value].cat.codes.to_numpy(dtype=np.intp)
+        else:
+            activity_codes = activities.get_indexer(events[EventColumn.ACTIVITY.value])
+        self.case_codes = np.r_[self.case_codes, case_codes]
+        self.activity_codes = np.r_[self.activity_codes, activity_codes]
+        self.event_time = np.r_[self.event_time, _event_time(events[EventColumn.EVENT_TIME.value])]
+        # Sort the events of the affected cases, the events already indexed are before the new events at the same time
+        affected = np.unique(case_codes)
+        affected_events = np.isin(self.case_codes[self.order], affected)
+        positions = np.r_[self.order[affected_events], np.arange(indexed, len(self.case_codes))]
+        positions = positions[np.lexsort((self.event_time[positions].view('i8'), self.case_codes[positions]))]
+        # Merge the sorted runs by case code, the affected cases are not in the other run
+        kept = self.order[~affected_events]
+        self.__set_order(np.insert(kept, np.searchsorted(self.case_codes[kept], self.case_codes[positions]), positions))
+        return affected
+
+    # Arrays of the index per event and per case, saved by PepperMining.save
+    EVENT_ARRAYS = ['case_codes', 'activity_codes', 'event_time', 'order', 'prev_position', 'next_position', 'prev_activity', 'next_activity']
+    CASE_ARRAYS = ['case_ids', 'starts', 'lengths', 'first_position', 'last_position', 'start_time', 'end_time']
+
+    def to_arrays(self) -> tuple:
+        """Return the arrays of the index, per event and per case.
+
+        Returns
+        -------
+        tuple
+            Dictionary with the arrays per event and dictionary with the arrays per case.
+        """
+        return ({name: getattr(self, name) for name in self.EVENT_ARRAYS},
+                {name: getattr(self, name) for name in self.CASE_ARRAYS})
+
+    @classmethod
+    def from_arrays(cls, activities: pd.Index, event_arrays: dict, case_arrays: dict) -> 'CaseIndex':
+        """Return an index from the arrays of to_arrays, without sorting the events again.
+
+        Parameters
+        ----------
+        activities : pd.Index
+            Activity dictionary.
+        event_arrays : dict
+            Arrays per event, e.g. memory mapped arrays.
+        case_arrays : dict
+            Arrays per case.
+
+        Returns
+        -------
+        CaseIndex
+            Case-segmented index.
+        """
+        case_index = cls.__new__(cls)
+        case_index.activities = activities
+        for name in cls.EVENT_ARRAYS:
+            setattr(case_index, name, np.asarray(event_arrays[name]))
+        for name in cls.CASE_ARRAYS:
+            setattr(case_index, name, np.asarray(case_arrays[name]))
+        case_index._case_lookup = pd.Index(case_index.case_ids)
+        return case_index
+
+    def __segment_time(self, reduction: np.ufunc) -> np.ndarray:
+        """Return the minimum or maximum event time of each case with one segment reduction.
+
+        NaT is ignored as in the pandas min and max.
+        """
+        if len(self.starts) == 0:
+            return np.array([], dtype=self.event_time.dtype)
+        sorted_time = self.event_time[self.order]
+        nat = np.iinfo(np.int64).max if reduction is np.minimum else np.iinfo(np.int64).min + 1
+        segment_time = reduction.reduceat(np.where(np.isnat(sorted_time), nat, sorted_time.view('i8')), self.starts)
+        return np.where(segment_time == nat, np.iinfo(np.int64).min, segment_time).view(self.event_time.dtype)
+
+    def positions(self, event_log: pd.DataFrame) -> np.ndarray:
+        """Return the positions of the events of an event log.
+
+        Parameters
+        ----------
+        event_log : pd.DataFrame
+            Event logs of PepperMining or PepperFilter.
+
+        Returns
+        -------
+        np.ndarray
+            Positions of the events.
+        """
+        return event_log.index.to_numpy(dtype=np.intp)
+
+    def sorted_positions(self, event_log: pd.DataFrame) -> np.ndarray:
+        """Return the positions of the events of an event log sorted by case and event time.
+
+        Parameters
+        ----------
+        event_log : pd.DataFrame
+            Event logs of PepperMining or PepperFilter.
+
+        Returns
+        -------
+        np.ndarray
+            Positions of the events sorted by case and event time.
+        """
+        if len(event_log) == len(self.order):
+            return self.order
+        selected = np.zeros(len(self.order), dtype=bool)
+        selected[self.positions(event_log)] = True
+        return self.order[selected[self.order]]
+
+    def activity_code(self, activity: str) -> int:
+        """Return the activity code of an activity.
+
+        Parameters
+        ----------
+        activity : str
+            Activity name.
+
+        Returns
+        -------
+        int
+            Activity code, -2 if the activity is not in the event logs.
+        """
+        return self.activities.get_loc(activity) if activity in self.activities else -2
+
+    def activity_codes_of(self, activities: list) -> np.ndarray:
+        """Return the activity codes of a list of activities.
+
+        The activities that are not in the event logs are ignored.
+
+        Parameters
+        ----------
+        activities : list
+            List of activity names.
+
+        Returns
+        -------
+        np.ndarray
+            Activity codes.
+        """
+        codes = self.activities.get_indexer(pd.Index(list(activities)).unique())
+        return codes[codes >= 0]
+
+    def case_list(self, positions: np.ndarray) -> list:
+        """Return the cases of a list of events.
+
+        Parameters
+        ----------
+        positions : np.ndarray
+            Positions of the events.
+
+        Returns
+        -------
+        list
+            List of cases, sorted and without duplicates.
+        """
+        return self.case_ids[np.unique(self.case_codes[positions])].tolist()
+
+    def case_codes_of(self, cases: pd.Series) -> np.ndarray:
+        """Return the case codes of a list of cases.
+
+        Parameters
+        ----------
+        cases : pd.Series
+            Case identifiers.
+
+        Returns
+        -------
+        np.ndarray
+            Case codes, -1 if the case is not in the event logs.
+        """
+        return self._case_lookup.get_indexer(cases)
+
+    def case_mask(self, case_list: list) -> np.ndarray:
+        """Return the case mask of a list of cases.
+
+        The cases that are not in the event logs are ignored.
+
+        Parameters
+        ----------
+        case_list : list
+            List of cases.
+
+        Returns
+        -------
+        np.ndarray
+            Boolean mask over the case codes.
+        """
+        codes = self.case_codes_of(pd.Index(list(case_list)).unique())
+        mask = np.zeros(len(self.case_ids), dtype=bool)
+        mask[codes[codes >= 0]] = True
+        return mask
+
+    def case_mask_of_events(self, positions: np.ndarray) -> np.ndarray:
+        """Return the case mask of the cases with at least one event of a list of events.
+
+        Parameters
+        ----------
+        positions : np.ndarray
+            Positions of the events.
+
+        Returns
+        -------
+        np.ndarray
+            Boolean mask over the case codes.
+        """
+        mask = np.zeros(len(self.case_ids), dtype=bool)
+        mask[self.case_codes[positions]] = True
+        return mask
+
+    def event_mask(self, event_log: pd.DataFrame, case_mask: np.ndarray) -> np.ndarray:
+        """Return the mask of the events of an event log that belong to the cases of a case mask.
+
+        Parameters
+        ----------
+        event_log : pd.DataFrame
+            Event logs of PepperMining or PepperFilter.
+        case_mask : np.ndarray
+            Boolean mask over the case codes.
+
+        Returns
+        -------
+        np.ndarray
+            Boolean mask over the rows of the event log.
+        """
+        return case_mask[self.case_codes[self.positions(event_log)]]
+
+    def cases_mask(self, cases: pd.Series, case_mask: np.ndarray) -> np.ndarray:
+        """Return the mask of the cases of a cases data that are in a case mask.
+
+        Parameters
+        ----------
+        cases : pd.Series
+            Case identifiers of the cases data.
+        case_mask : np.ndarray
+            Boolean mask over the case codes.
+
+        Returns
+        -------
+        np.ndarray
+            Boolean mask over the rows of the cases data.
+        """
+        codes = self.case_codes_of(cases)
+        return (codes >= 0) & case_mask[codes]
+
+
+def _event_time(event_time: pd.Series) -> np.ndarray:
+    """Return the event time as datetime64 array, an event time with time zone is converted to UTC without time zone.
+    """
+    if getattr(event_time.dtype, 'tz', None) is not None:
+        event_time = event_time.dt.tz_convert('UTC').dt.tz_localize(None)
+    return event_time.to_numpy(dtype='datetime64[ns]')
@@ -0,0 +1,80 @@
+from collections import OrderedDict
+from typing import Callable, Hashable, Optional
+
+
+class KpiCache():
+    """Memoized KPI results with LRU eviction.
+
+    The cache is owned by PepperMining and shared by all PepperFilter and PepperKpi objects of the same event logs.
+    The results are keyed by the fingerprint of the data (version of the event logs and the case mask of the filters),
+    the filter chain, the KPI and the grain. PepperMining clears the cache when the event logs or cases change.
+    The results are copied in and out of the cache, so the caller can change the returned DataFrame.
+
+    Attributes
+    ----------
+    max_size : int
+        Maximum number of results in the cache. The least recently used result is evicted.
+    hits : int
+        Number of results returned from the cache.
+    misses : int
+        Number of results computed.
+
+    Methods
+    -------
+    get_or_compute
+        Return the result of a key, computing and storing it if it is not in the cache.
+    clear
+        Remove all results of the cache.
+    """
+
+    def __init__(self, max_size: Optional[int] = 128):
+        """KpiCache constructor.
+
+        Parameters
+        ----------
+        max_size : int, Default: 128
+            Maximum number of results in the cache.
+        """
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self.__results = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self.__results)
+
+    def get_or_compute(self, key: Hashable, compute: Callable):
+        """Return the result of a key, computing and storing it if it is not in the cache.
+
+        Parameters
+        ----------
+        key : Hashable
+            Key of the result.
+        compute : Callable
+            Function without parameters that computes the result.
+
+        Returns
+        -------
+            Copy of the result.
+        """
+        if key in self.__results:
+            self.hits += 1
+            self.__results.move_to_end(key)
+            return self.__copy(self.__results[key])
+        self.misses += 1
+        result = compute()
+        self.__results[key] = self.__copy(result)
+        if len(self.__results) > self.max_size:
+            self.__results.popitem(last=False)
+        return result
+
+    def clear(self) -> None:
+        """Remove all results of the cache.
+        """
+        self.__results.clear()
+
+    @staticmethod
+    def __copy(result):
+        """Return a copy of pandas objects, the others results are immutable values.
+        """
+        return result.copy() if hasattr(result, 'copy') else result
@@ -0,0 +1,258 @@
+import os
+import numpy as np
+import pandas as pd
+
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+from typing import Optional
+
+from peppermining.utils.case_index import CaseIndex
+from peppermining.utils.variant_discovery import _case_segments
+
+
+class ParallelBackend():
+    """Process pool that computes the case-local aggregations of the KPIs, partitioned by case.
+
+    The cases are split in partitions by the hash of the case_id, so all events of a case are in the same partition.
+    The events are sorted by partition in the calling process (a stable sort keeps the order by case and event time)
+    and copied once to shared memory, so each process reads a contiguous slice without copying the event logs.
+    The durations and the aggregations per case are computed by the processes. Each partition returns partial
+    aggregations, which are merged exactly:
+    (1) The aggregations per case are disjoint between partitions.
+    (2) The counts, sums, minimums and maximums per activity are added, or reduced, over the partitions.
+    (3) The standard deviation is merged from the count, mean and sum of squared deviations of each partition.
+    (4) The median is computed from the counts of each distinct value per activity, so it is exact and
+        the values are not sent back one by one.
+    The event logs smaller than min_events are aggregated in the calling process.
+    The pool is also used by the conformance alignments, with map.
+
+    Attributes
+    ----------
+    n_jobs : int
+        Number of processes, -1 for the number of CPUs.
+    min_events : int
+        Minimum number of events to use the process pool.
+
+    Methods
+    -------
+    accepts
+        Return True if an event logs is aggregated by the process pool.
+    aggregate
+        Return the aggregations per case and per activity of the events of a case index.
+    map
+        Return the results of a function applied to each task in the process pool.
+    close
+        Shut down the process pool.
+    """
+
+    def __init__(self, n_jobs: Optional[int] = -1, min_events: Optional[int] = 2000000):
+        """ParallelBackend constructor.
+
+        Parameters
+        ----------
+        n_jobs : int, Default: -1
+            Number of processes, -1 for the number of CPUs.
+        min_events : int, Default: 2000000
+            Minimum number of events to use the process pool. Below it, the start of the processes and the copy
+            to shared memory cost more than the aggregations in the calling process.
+        """
+        self.n_jobs = os.cpu_count() if n_jobs == -1 else n_jobs
+        self.min_events = min_events
+        self.__pool = None
+
+    def accepts(self, events: int) -> bool:
+        """Return True if an event logs is aggregated by the process pool.
+
+        Parameters
+        ----------
+        events : int
+            Number of events.
+
+        Returns
+        -------
+        bool
+            True if there is more than one process and enough events.
+        """
+        return self.n_jobs > 1 and events >= self.min_events
+
+    def aggregate(self, case_index: CaseIndex, positions: np.ndarray) -> dict:
+        """Return the aggregations per case and per activity of the events of a case index.
+
+        Parameters
+        ----------
+        case_index : CaseIndex
+            Case-segmented index of the event logs.
+        positions : np.ndarray
+            Positions of the events, the events of a case are all selected or not.
+
+        Returns
+        -------
+        dict
+            Arrays by case code: 'case_size', 'valid_size' (events with activity), 'nunique_activity' and 'throughput_time'.
+            Arrays by activity code: 'size', 'nunique_case' and the statistics 'min', 'max', 'mean', 'median', 'sum', 'std'
+            of the throughput time of the events until the next event of the case, NaN if the activity has no events.
+        """
+        n_cases, n_activities = len(case_index.case_ids), len(case_index.activities)
+        # Events sorted by case and event time, and then by partition
+        selected = np.zeros(len(case_index.order), dtype=bool)
+        selected[positions] = True
+        positions = case_index.order[selected[case_index.order]]
+        case_partition = (pd.util.hash_array(np.asarray(case_index.case_ids)) % np.uint64(self.n_jobs)).astype(np.int16)
+        partition = case_partition[case_index.case_codes[positions]]
+        positions = positions[np.argsort(partition, kind='stable')]
+        offsets = np.r_[0, np.cumsum(np.bincount(partition, minlength=self.n_jobs))]
+        arrays = {'case_codes': case_index.case_codes[positions].astype(np.int64),
+                  'activity_codes': case_index.activity_codes[positions].astype(np.int64),
+                  'event_time': case_index.event_time[positions].view('i8')}
+        blocks = {name: shared_memory.SharedMemory(create=True, size=max(array.nbytes, 1)) for name, array in arrays.items()}
+        try:
+            spec = {}
+            for name, array in arrays.items():
+                np.ndarray(array.shape, dtype=array.dtype, buffer=blocks[name].buf)[:] = array
+                spec[name] = (blocks[name].name, array.shape, array.dtype.str)
+            tasks = [(spec, offsets[partition], offsets[partition + 1], n_activities) for partition in range(self.n_jobs)]
+            partials = list(self.__get_pool().map(_partition_aggregates, tasks))
+        finally:
+            for block in blocks.values():
+                block.close()
+                block.unlink()
+        return _merge(partials, n_cases, n_activities)
+
+    def map(self, function, tasks: list) -> list:
+        """Return the results of a function applied to each task in the process pool.
+
+        Parameters
+        ----------
+        function : callable
+            Function of a module, so it can be sent to the processes.
+        tasks : list
+            Argument of each call of the function.
+
+        Returns
+        -------
+        list
+            Result of each task, in the order of the tasks.
+        """
+        return list(self.__get_pool().map(function, tasks))
+
+    def close(self) -> None:
+        """Shut down the process pool.
+        """
+        if self.__pool is not None:
+            self.__pool.shutdown()
+            self.__pool = None
+
+    def __get_pool(self) -> ProcessPoolExecutor:
+        """Return the process pool, it is created on the first use and reused.
+        """
+        if self.__pool is None:
+            self.__pool = ProcessPoolExecutor(max_workers=self.n_jobs)
+        return self.__pool
+
+
+def _partition_aggregates(task: tuple) -> dict:
+    """Return the partial aggregations of the events of a partition.
+
+    The partition is a slice of the arrays in the shared memory of the parent process,
+    the events are sorted by case and event time.
+    """
+    spec, start, stop, n_activities = task
+    blocks = {name: shared_memory.SharedMemory(name=block) for name, (block, _, _) in spec.items()}
+    try:
+        arrays = {name: np.ndarray(shape, dtype=np.dtype(dtype), buffer=blocks[name].buf)[start:stop].copy() for name, (_, shape, dtype) in spec.items()}
+    finally:
+        for block in blocks.values():
+            block.close()
+    case_codes, activity_codes = arrays['case_codes'], arrays['activity_codes']
+    event_time = arrays['event_time'].view('datetime64[ns]')
+    starts, lengths = _case_segments(case_codes)
+    # Throughput time of each event until the next event of the case, as in the KPI ThroughputTime
+    last = np.r_[case_codes[1:] != case_codes[:-1], True]
+    time = pd.Series(event_time)
+    seconds = np.where(last, 0.0, (time.shift(-1) - time).dt.seconds).astype(np.float64)
+    partial = {}
+    # Aggregations per case: number of events, throughput time from the minimum to the maximum event time as in CaseIndex
+    valid = activity_codes >= 0
+    partial['case_codes'] = case_codes[starts]
+    partial['case_size'] = lengths
+    partial['valid_size'] = np.add.reduceat(valid, starts) if len(starts) else np.array([], dtype=np.int64)
+    start_time, end_time = _segment_time(event_time, starts, np.minimum), _segment_time(event_time, starts, np.maximum)
+    partial['throughput_time'] = (pd.Series(start_time) - pd.Series(end_time)).dt.seconds.to_numpy(dtype=np.float64)
+    # Number of distinct activities per case and of distinct cases per activity, the pairs (case, activity) are unique
+    pairs = np.unique(case_codes[valid] * max(n_activities, 1) + activity_codes[valid])
+    nunique_activity = np.bincount(np.searchsorted(partial['case_codes'], pairs // max(n_activities, 1)), minlength=len(starts))
+    partial['nunique_activity'] = nunique_activity
+    partial['nunique_case'] = np.bincount(pairs % max(n_activities, 1), minlength=n_activities)
+    # Moments of the throughput time per activity
+    activity_codes, seconds = activity_codes[valid], seconds[valid]
+    partial['size'] = np.bincount(activity_codes, minlength=n_activities)
+    measured = ~np.isnan(seconds)
+    activity_codes, seconds = activity_codes[measured], seconds[measured]
+    partial['count'] = np.bincount(activity_codes, minlength=n_activities)
+    partial['sum'] = np.bincount(activity_codes, weights=seconds, minlength=n_activities)
+    mean = partial['sum'] / np.maximum(partial['count'], 1)
+    partial['m2'] = np.bincount(activity_codes, weights=(seconds - mean[activity_codes]) ** 2, minlength=n_activities)
+    # Distinct values per activity with their counts, sorted by activity and value
+    order = np.lexsort((seconds, activity_codes))
+    activity_codes, seconds = activity_codes[order], seconds[order]
+    first = np.r_[True, (activity_codes[1:] != activity_codes[:-1]) | (seconds[1:] != seconds[:-1])] if len(order) else np.array([], dtype=bool)
+    starts = np.flatnonzero(first)
+    partial['value_activity'] = activity_codes[starts]
+    partial['value'] = seconds[starts]
+    partial['value_count'] = np.diff(np.r_[starts, len(order)])
+    return partial
+
+
+def _segment_time(event_time: np.ndarray, starts: np.ndarray, reduction: np.ufunc) -> np.ndarray:
+    """Return the minimum or maximum event time of each case segment, NaT is ignored as in CaseIndex.
+    """
+    if len(starts) == 0:
+        return np.array([], dtype=event_time.dtype)
+    nat = np.iinfo(np.int64).max if reduction is np.minimum else np.iinfo(np.int64).min + 1
+    segment_time = reduction.reduceat(np.where(np.isnat(event_time), nat, event_time.view('i8')), starts)
+    return np.where(segment_time == nat, np.iinfo(np.int64).min, segment_time).view(event_time.dtype)
+
+
+def _merge(partials: list, n_cases: int, n_activities: int) -> dict:
+    """Merge the partial aggregations of the partitions.
+    """
+    aggregates = {name: np.zeros(n_cases, dtype=np.int64) for name in ['case_size', 'valid_size', 'nunique_activity']}
+    aggregates['throughput_time'] = np.full(n_cases, np.nan)
+    for partial in partials:
+        for name in ['case_size', 'valid_size', 'nunique_activity', 'throughput_time']:
+            aggregates[name][partial['case_codes']] = partial[name]
+    for name in ['size', 'nunique_case']:
+        aggregates[name] = np.sum([partial[name] for partial in partials], axis=0).astype(np.int64)
+    # Count, mean and sum of squared deviations merged partition by partition
+    count, mean, m2 = np.zeros(n_activities), np.zeros(n_activities), np.zeros(n_activities)
+    for partial in partials:
+        partial_count = partial['count'].astype(np.float64)
+        partial_mean = partial['sum'] / np.maximum(partial_count, 1)
+        total = count + partial_count
+        delta = partial_mean - mean
+        mean = np.where(total > 0, mean + delta * partial_count / np.maximum(total, 1), 0.0)
+        m2 = m2 + partial['m2'] + delta ** 2 * count * partial_count / np.maximum(total, 1)
+        count = total
+    measured = count > 0
+    aggregates['sum'] = np.sum([partial['sum'] for partial in partials], axis=0)
+    aggregates['mean'] = np.where(measured, aggregates['sum'] / np.maximum(count, 1), np.nan)
+    aggregates['std'] = np.where(count > 1, np.sqrt(m2 / np.maximum(count - 1, 1)), np.nan)
+    # Minimum, maximum and median from the distinct values of all partitions
+    value_activity = np.concatenate([partial['value_activity'] for partial in partials])
+    value = np.concatenate([partial['value'] for partial in partials])
+    value_count = np.concatenate([partial['value_count'] for partial in partials])
+    order = np.lexsort((value, value_activity))
+    value_activity, value, value_count = value_activity[order], value[order], value_count[order]
+    cumulative = np.cumsum(value_count)
+    first = np.searchsorted(value_activity, np.arange(n_activities), side='left')
+    last = np.searchsorted(value_activity, np.arange(n_activities), side='right') - 1
+    aggregates['min'] = np.where(measured, value[np.minimum(first, len(value) - 1)] if len(value) else np.nan, np.nan)
+    aggregates['max'] = np.where(measured, value[np.maximum(last, 0)] if len(value) else np.nan, np.nan)
+    before = np.where(first > 0, cumulative[np.maximum(first - 1, 0)] if len(value) else 0, 0)
+    count = count.astype(np.int64)
+    lower = np.searchsorted(cumulative, before + (count - 1) // 2, side='right')
+    upper = np.searchsorted(cumulative, before + count // 2, side='right')
+    median = (value[np.minimum(lower, len(value) - 1)] + value[np.minimum(upper, len(value) - 1)]) / 2 if len(value) else np.zeros(n_activities)
+    aggregates['median'] = np.where(measured, median, np.nan)
+    aggregates['sum'] = np.where(aggregates['size'] > 0, aggregates['sum'], np.nan)
+    return aggregates
@@ -0,0 +1,149 @@
+import json
+import os
+import numpy as np
+import pandas as pd
+
+# Version of the files written by PepperMining.save
+STORAGE_FORMAT = 1
+
+
+def _import_pyarrow():
+    """Return the pyarrow module.
+
+    The pyarrow package is an optional dependency, it is only required to save and load PepperMining.
+
+    Raises
+    ------
+    ImportError
+        The pyarrow package is not installed.
+    """
+    try:
+        import pyarrow
+        import pyarrow.ipc  # noqa: F401
+    except ImportError as e:
+        raise ImportError("The pyarrow package is required to save and load PepperMining. "
+                          "Use: pip install peppermining[arrow]") from e
+    return pyarrow
+
+
+def write_frame(df: pd.DataFrame, file_path: str) -> None:
+    """Write a DataFrame to an Arrow IPC file.
+
+    The Categorical columns are written as dictionary-encoded columns.
+
+    Parameters
+    ----------
+    df : pd.DataFrame
+        DataFrame with a default index.
+    file_path : str
+        Path of the Arrow IPC file.
+    """
+    pa = _import_pyarrow()
+    _write_table(pa, pa.Table.from_pandas(df, preserve_index=False), file_path)
+
+
+def read_frame(file_path: str) -> pd.DataFrame:
+    """Read a DataFrame from a memory mapped Arrow IPC file.
+
+    Parameters
+    ----------
+    file_path : str
+        Path of the Arrow IPC file.
+
+    Returns
+    -------
+    DataFrame
+        DataFrame with a default index, the dictionary-encoded columns are Categorical.
+    """
+    return _read_table(_import_pyarrow(), file_path).to_pandas()
+
+
+def write_arrays(arrays: dict, file_path: str) -> None:
+    """Write NumPy arrays with the same length to an Arrow IPC file.
+
+    Parameters
+    ----------
+    arrays : dict
+        Arrays by name.
+    file_path : str
+        Path of the Arrow IPC file.
+    """
+    pa = _import_pyarrow()
+    _write_table(pa, pa.table({name: pa.array(np.asarray(array)) for name, array in arrays.items()}), file_path)
+
+
+def read_arrays(file_path: str) -> dict:
+    """Read NumPy arrays from a memory mapped Arrow IPC file.
+
+    The numeric arrays without nulls are views of the memory map, the others arrays are copied.
+
+    Parameters
+    ----------
+    file_path : str
+        Path of the Arrow IPC file.
+
+    Returns
+    -------
+    dict
+        Arrays by name.
+    """
+    table = _read_table(_import_pyarrow(), file_path)
+    return {name: table.column(name).to_numpy() for name in table.column_names}
+
+
+def write_metadata(metadata: dict, file_path: str) -> None:
+    """Write the metadata of the saved files to a JSON file.
+
+    Parameters
+    ----------
+    metadata : dict
+        Metadata.
+    file_path : str
+        Path of the JSON file.
+    """
+    with open(file_path, 'w', encoding='utf-8') as file:
+        json.dump(dict(metadata, format=STORAGE_FORMAT), file)
+
+
+def read_metadata(file_path: str) -> dict:
+    """Read the metadata of the saved files from a JSON file.
+
+    Parameters
+    ----------
+    file_path : str
+        Path of the JSON file.
+
+    Returns
+    -------
+    dict
+        Metadata.
+
+    Raises
+    ------
+    ValueError
+        (1) Not exists the PepperMining files.
+        (2) The format of the files is not supported.
+    """
+    if not (os.path.isfile(file_path)):
+        raise TypeError(f"Not exists the PepperMining files in {os.path.dirname(file_path)}.")
+    with open(file_path, 'r', encoding='utf-8') as file:
+        metadata = json.load(file)
+    if metadata.get('format') != STORAGE_FORMAT:
+        raise TypeError(f"The format {metadata.get('format')} of the PepperMining files is not supported.")
+    return metadata
+
+
+def _write_table(pa, table, file_path: str) -> None:
+    """Write an Arrow table to an uncompressed Arrow IPC file, so it can be memory mapped.
+    """
+    with pa.OSFile(file_path, 'wb') as sink:
+        with pa.ipc.new_file(sink, table.schema) as writer:
+            writer.write_table(table)
+
+
+def _read_table(pa, file_path: str):
+    """Read an Arrow table from a memory mapped Arrow IPC file.
+
+    The buffers of the table keep the memory map open.
+    """
+    return pa.ipc.open_file(pa.memory_map(file_path, 'r')).read_all()
@@ -0,0 +1,145 @@
+import numpy as np
+import pandas as pd
+
+from pandas.api.types import is_datetime64_any_dtype, is_numeric_dtype, is_bool_dtype
+from typing import Optional
+
+
+class TimestampParser():
+    """Parser of the event_time column of the event logs.
+
+    The event logs repeat the same timestamps many times, so each unique string is parsed only once and the result
+    is mapped back to the rows with the codes of the unique strings.
+    If the format is not informed, the candidate formats are tried on a sample of the unique strings, and the first candidate
+    that parses all unique strings is the format. The format found is kept for the next parses of the same parser,
+    e.g. PepperMining keeps the parser of the event logs to parse the events appended.
+    The integer and float columns are epoch timestamps, the unit is inferred from the magnitude of the values.
+    The invalid rows are found from the unique strings that are not parsed, without a second pass over the rows.
+
+    Attributes
+    ----------
+    format : str
+        The strftime of the timestamps, inferred on the first parse if it is None.
+    unit : str
+        Unit of the epoch timestamps (s, ms, us or ns), inferred on the first parse if it is None.
+    sample_size : int
+        Number of unique strings used to infer the format.
+
+    Methods
+    -------
+    parse
+        Return the timestamps of a column.
+    infer_format
+        Return the first format that parses all strings.
+    """
+    # Formats tried to infer the format. As in the pandas parser, the month first formats are tried before the day first formats,
+    # the day first formats are found when a day of the sample is greater than 12
+    FORMATS = ['%Y-%m-%d %H:%M:%S', '%Y-%m-%dT%H:%M:%S', '%Y-%m-%d %H:%M:%S.%f', '%Y-%m-%dT%H:%M:%S.%f', '%Y-%m-%d %H:%M', '%Y-%m-%dT%H:%M',
+               '%Y-%m-%d', '%Y/%m/%d %H:%M:%S', '%Y/%m/%d %H:%M', '%Y/%m/%d',
+               '%m/%d/%Y %H:%M:%S', '%m/%d/%Y %H:%M', '%m/%d/%Y', '%d/%m/%Y %H:%M:%S', '%d/%m/%Y %H:%M', '%d/%m/%Y',
+               '%d-%m-%Y %H:%M:%S', '%d-%m-%Y %H:%M', '%d-%m-%Y', '%d.%m.%Y %H:%M:%S', '%d.%m.%Y %H:%M', '%d.%m.%Y', '%Y%m%d%H%M%S']
+    # Upper limit of the absolute epoch values for each unit
+    EPOCH_UNITS = [(1e11, 's'), (1e14, 'ms'), (1e17, 'us')]
+
+    def __init__(self, format: Optional[str] = None, unit: Optional[str] = None, sample_size: Optional[int] = 1000):
+        """TimestampParser constructor.
+
+        Parameters
+        ----------
+        format : str, Default: None
+            The strftime to parse time, e.g. "%d/%m/%Y %H:%M". If None, it is inferred from a sample.
+        unit : str, Default: None
+            Unit of the epoch timestamps (s, ms, us or ns). If None, it is inferred from the values.
+        sample_size : int, Default: 1000
+            Number of unique strings used to infer the format.
+        """
+        self.format = format
+        self.unit = unit
+        self.sample_size = sample_size
+
+    def parse(self, values: pd.Series, column: Optional[str] = 'event_time') -> pd.Series:
+        """Return the timestamps of a column.
+
+        Parameters
+        ----------
+        values : pd.Series
+            Strings, epoch timestamps or timestamps.
+        column : str, Default: 'event_time'
+            Name of the column in the error messages.
+
+        Returns
+        -------
+        pd.Series
+            Timestamps with the index of the values, NaT for the missing values.
+
+        Raises
+        ------
+        ValueError
+            (1) The values are not timestamps, e.g. boolean values.
+            (2) There are rows that do not match the format, the message has the number of rows and the first invalid row.
+        """
+        if is_datetime64_any_dtype(values):
+            return values
+        if is_bool_dtype(values):
+            raise TypeError(f"The column {column} is a datetime type invalid.")
+        if is_numeric_dtype(values):
+            return self.__parse_epoch(values)
+        codes, uniques = pd.factorize(values)
+        uniques = np.asarray(uniques, dtype=object)
+        if self.format is None and len(uniques):
+            self.format, timestamps = self.__infer(uniques)
+        else:
+            timestamps = self.__parse_unique(uniques)
+        invalid = timestamps.isna()
+        if invalid.any():
+            rows = np.flatnonzero(invalid[np.maximum(codes, 0)] & (codes >= 0))
+            raise TypeError(f"The column {column} is a datetime type invalid. {len(rows)} rows do not match the format {self.format}, "
+                            f"e.g. row {values.index[rows[0]]}: '{values.iloc[rows[0]]}'.")
+        return pd.Series(timestamps.take(codes, allow_fill=True, fill_value=pd.NaT), index=values.index, name=values.name)
+
+    def infer_format(self, uniques: np.ndarray) -> Optional[str]:
+        """Return the first format that parses all strings.
+
+        The formats are tried first on a sample spread over the unique strings, and the formats that parse the sample
+        are verified with all strings, e.g. a day greater than 12 out of the sample. If no format parses all strings,
+        None is returned and the strings are parsed by the pandas parser.
+
+        Parameters
+        ----------
+        uniques : np.ndarray
+            Unique strings.
+
+        Returns
+        -------
+        str
+            The strftime of the timestamps, None if it is not found.
+        """
+        return self.__infer(uniques)[0]
+
+    def __infer(self, uniques: np.ndarray) -> tuple:
+        """Return the format of infer_format and the timestamps of the unique strings parsed with it.
+        """
+        sample = uniques[np.unique(np.linspace(0, len(uniques) - 1, min(self.sample_size, len(uniques))).astype(np.intp))]
+        for candidate in self.FORMATS:
+            if pd.to_datetime(sample, format=candidate, errors='coerce').notna().all():
+                timestamps = pd.DatetimeIndex(pd.to_datetime(uniques, format=candidate, errors='coerce'))
+                if timestamps.notna().all():
+                    return candidate, timestamps
+        return None, self.__parse_unique(uniques)
+
+    def __parse_unique(self, uniques: np.ndarray) -> pd.DatetimeIndex:
+        """Return the timestamps of the unique strings, NaT for the invalid strings.
+        """
+        try:
+            return pd.DatetimeIndex(pd.to_datetime(uniques, format=self.format, errors='coerce'))
+        except (TypeError, ValueError):
+            # The mixed time zones are converted to UTC
+            return pd.DatetimeIndex(pd.to_datetime(uniques, format=self.format, errors='coerce', utc=True)).tz_localize(None)
+
+    def __parse_epoch(self, values: pd.Series) -> pd.Series:
+        """Return the timestamps of epoch values, the unit is inferred from the maximum absolute value.
+        """
+        if self.unit is None:
+            maximum = np.nanmax(np.abs(values.to_numpy(dtype=float))) if values.notna().any() else 0
+            self.unit = next((unit for limit, unit in self.EPOCH_UNITS if maximum < limit), 'ns')
+        return pd.to_datetime(values, unit=self.unit)
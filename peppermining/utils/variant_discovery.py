@@ -0,0 +1,188 @@
+import numpy as np
+import pandas as pd
+
+from typing import Optional
+
+from peppermining.utils.enum import EventColumn, Variant
+from peppermining.utils.case_index import CaseIndex
+
+# Moduli and bases of the two polynomial hashes used to identify a trace.
+# The moduli are below 2^31, so every product of a code and a power fits in an uint64.
+_HASH_MODULI = (np.uint64(2147483647), np.uint64(2147483629))
+_HASH_BASES = (np.uint64(1000003), np.uint64(999983))
+
+
+def variant_discovery(event_log: pd.DataFrame, case_index: Optional[CaseIndex] = None) -> pd.DataFrame:
+    """Discovery all variants of an event log.
+
+    The activities are categorized to integer codes and the event log is sorted once by case and event time.
+    Each case is identified by a hash of its activity code sequence computed with NumPy segment operations,
+    so the variants are discovered in near-linear time without pivoting the event log.
+
+    Parameters
+    ----------
+    event_log : pd.DataFrame
+        DataFrame with 'case_id', 'activity', and 'event_time' columns.
+    case_index : Optional[CaseIndex]
+        Case-segmented index of the event logs. If informed, the codes and the sorting of the index are used.
+
+    Returns
+    -------
+    DataFrame
+        DataFrame with the Variants data.
+        Columns:
+        key: Activities of the variant joined by '->'.
+        cases: List of cases of the variant.
+        activities: List of activities of the variant.
+
+    Example
+    -------
+    >>> pm = PepperMining()
+    >>> pm.read_event_log_csv("tests/data/eventlog-example.csv", separator=';', format_date='%d/%m/%Y %H:%M')
+    >>> variant_discovery(pm.get_event_log())
+    """
+    if event_log.empty:
+        return pd.DataFrame(columns=[Variant.KEY.value, Variant.CASES.value, Variant.ACTIVITIES.value])
+    if case_index is not None:
+        positions = case_index.sorted_positions(event_log)
+        return variant_discovery_from_codes(case_index.case_codes[positions], case_index.activity_codes[positions],
+                                            case_index.case_ids, np.asarray(case_index.activities).astype(str))
+    case_codes, case_ids = pd.factorize(event_log[EventColumn.CASE_ID.value], sort=True)
+    activity_codes, activities = pd.factorize(event_log[EventColumn.ACTIVITY.value])
+    event_time = event_log[EventColumn.EVENT_TIME.value].values.view('i8')
+    # Sort once by case and event time, the sort is stable for events at the same time
+    order = np.lexsort((event_time, case_codes))
+    return variant_discovery_from_codes(case_codes[order], activity_codes[order], np.asarray(case_ids), np.asarray(activities).astype(str))
+
+
+def variant_discovery_from_codes(case_codes: np.ndarray, activity_codes: np.ndarray, case_ids: np.ndarray, activities: np.ndarray) -> pd.DataFrame:
+    """Discovery all variants from integer coded events sorted by case and event time.
+
+    Parameters
+    ----------
+    case_codes : np.ndarray
+        Case code of each event, the events of a case must be contiguous and the cases sorted by code.
+        The codes of a filtered event log do not need to be consecutive.
+    activity_codes : np.ndarray
+        Activity code of each event.
+    case_ids : np.ndarray
+        Case identifier of each case code.
+    activities : np.ndarray
+        Activity name of each activity code.
+
+    Returns
+    -------
+    DataFrame
+        DataFrame with the Variants data.
+    """
+    # The events without activity are not in the traces
+    valid = activity_codes >= 0
+    case_codes, activity_codes = case_codes[valid], activity_codes[valid]
+    if len(case_codes) == 0:
+        return pd.DataFrame(columns=[Variant.KEY.value, Variant.CASES.value, Variant.ACTIVITIES.value])
+    starts, lengths = _case_segments(case_codes)
+    case_ids = case_ids[case_codes[starts]]
+    variant_codes = _trace_codes(activity_codes, starts, lengths)
+    # A representative case for each variant, the first case found
+    _, representative = np.unique(variant_codes, return_index=True)
+    keys = [Variant.SPLIT_SEP.value.join(activities[activity_codes[starts[case]:starts[case] + lengths[case]]]) for case in representative]
+    # Cases of each variant, sorted by case
+    case_order = np.argsort(variant_codes, kind='stable')
+    cases = np.split(case_ids[case_order], np.cumsum(np.bincount(variant_codes))[:-1])
+    variant = pd.DataFrame({Variant.KEY.value: keys,
+                            Variant.CASES.value: [case_list.tolist() for case_list in cases]})
+    variant = variant.sort_values(Variant.KEY.value, kind='stable').reset_index(drop=True)
+    # Add Activities for each Variant
+    variant[Variant.ACTIVITIES.value] = variant[Variant.KEY.value].str.split(Variant.SPLIT_SEP.value)
+    variant[Variant.KEY.value] = variant[Variant.KEY.value].str.replace(Variant.SPLIT_SEP.value, Variant.ACT_CONN.value, regex=False)
+    return variant
+
+
+def update_variants(variant: pd.DataFrame, cases: list, old_traces: list, new_traces: list) -> pd.DataFrame:
+    """Move cases from their variants to the variants of their new traces.
+
+    Only the variants of the cases moved are changed, the variants without cases are removed
+    and the new variants are added in the order of the keys.
+
+    Parameters
+    ----------
+    variant : pd.DataFrame
+        DataFrame with the Variants data of variant_discovery.
+    cases : list
+        List of cases moved.
+    old_traces : list
+        Activities of each case before the move, None for a new case.
+    new_traces : list
+        Activities of each case after the move.
+
+    Returns
+    -------
+    DataFrame
+        DataFrame with the Variants data.
+    """
+    removed, added, added_activities = {}, {}, {}
+    for case, old_trace, new_trace in zip(cases, old_traces, new_traces):
+        if old_trace is not None:
+            removed.setdefault(_variant_key(old_trace), set()).add(case)
+        key = _variant_key(new_trace)
+        added.setdefault(key, []).append(case)
+        added_activities[key] = Variant.SPLIT_SEP.value.join(new_trace).split(Variant.SPLIT_SEP.value)
+    rows = pd.Index(variant[Variant.KEY.value])
+    keys = variant[Variant.KEY.value].tolist()
+    case_lists = variant[Variant.CASES.value].tolist()
+    activities = variant[Variant.ACTIVITIES.value].tolist()
+    for key, case_set in removed.items():
+        row = rows.get_loc(key)
+        case_lists[row] = [case for case in case_lists[row] if case not in case_set]
+    for key, case_list in added.items():
+        if key in rows:
+            row = rows.get_loc(key)
+            case_lists[row] = sorted(case_lists[row] + case_list)
+        else:
+            keys.append(key)
+            case_lists.append(sorted(case_list))
+            activities.append(added_activities[key])
+    variant = pd.DataFrame({Variant.KEY.value: keys, Variant.CASES.value: case_lists, Variant.ACTIVITIES.value: activities})
+    variant = variant[variant[Variant.CASES.value].str.len() > 0]
+    return variant.sort_values(Variant.KEY.value, kind='stable').reset_index(drop=True)
+
+
+def _variant_key(trace: list) -> str:
+    """Return the key of the variant of a trace, as in variant_discovery_from_codes.
+    """
+    return Variant.SPLIT_SEP.value.join(trace).replace(Variant.SPLIT_SEP.value, Variant.ACT_CONN.value)
+
+
+def _case_segments(case_codes: np.ndarray) -> tuple:
+    """Return the start offset and the length of each case segment.
+    """
+    starts = np.flatnonzero(np.r_[True, case_codes[1:] != case_codes[:-1]])
+    lengths = np.diff(np.r_[starts, len(case_codes)])
+    return starts, lengths
+
+
+def _trace_codes(activity_codes: np.ndarray, starts: np.ndarray, lengths: np.ndarray) -> np.ndarray:
+    """Return a variant code (0..n-1) for each case segment.
+
+    The cases are grouped by two polynomial hashes of the activity codes and the length of the trace.
+    The grouping is verified against the representative trace of each group, a hash collision fall back to an exact grouping.
+    """
+    position = np.arange(len(activity_codes)) - np.repeat(starts, lengths)
+    symbols = activity_codes.astype(np.uint64) + np.uint64(1)
+    hashes = []
+    for modulus, base in zip(_HASH_MODULI, _HASH_BASES):
+        powers = np.ones(lengths.max(), dtype=np.uint64)
+        for i in range(1, len(powers)):
+            powers[i] = (powers[i - 1] * base) % modulus
+        hashes.append(np.add.reduceat((symbols * powers[position]) % modulus, starts) % modulus)
+    trace_hash = pd.MultiIndex.from_arrays([hashes[0], hashes[1], lengths])
+    variant_codes, _ = pd.factorize(trace_hash)
+    # Verify each trace against the representative trace of its variant
+    _, representative = np.unique(variant_codes, return_index=True)
+    case_representative = representative[variant_codes]
+    event_representative = np.repeat(starts[case_representative], lengths) + position
+    if np.array_equal(activity_codes[event_representative], activity_codes):
+        return variant_codes
+    traces = [activity_codes[start:start + length].tobytes() for start, length in zip(starts, lengths)]
+    variant_codes, _ = pd.factorize(pd.Series(traces))
+    return variant_codes
@@ -0,0 +1,152 @@
+import numpy as np
+import pandas as pd
+
+from xml.etree.ElementTree import iterparse
+
+from peppermining.utils.enum import EventColumn
+
+# Standard XES attribute keys mapped to the columns of the event logs
+XES_COLUMNS = {'concept:name': EventColumn.ACTIVITY.value,
+               'time:timestamp': EventColumn.EVENT_TIME.value,
+               'org:resource': EventColumn.USER.value}
+# Conversion of the XES attribute types
+_XES_TYPES = {'string': str,
+              'id': str,
+              'int': int,
+              'float': float,
+              'boolean': lambda value: value.lower() == 'true',
+              'date': str}
+
+
+def read_xes(file_path: str) -> tuple:
+    """Read the event logs and cases of an IEEE XES file.
+
+    The XML is streamed with iterparse, each element is removed from the tree when it is read,
+    so the memory is proportional to the event logs and not to the XML tree.
+    The attributes are appended to columns (one list per attribute) instead of one dictionary per event.
+    The attribute 'concept:name' of the trace is the case_id, the others attributes of the trace are the cases data.
+    The attributes 'concept:name', 'time:timestamp' and 'org:resource' of the event are the activity, event_time and user.
+    The dates are converted to UTC. The nested attributes, the global attributes and the classifiers are ignored.
+
+    Parameters
+    ----------
+    file_path : str
+        Any valid string path of a XES file.
+
+    Returns
+    -------
+    tuple
+        DataFrame with the event logs and DataFrame with the cases data.
+
+    See Also
+    --------
+    http://www.xes-standard.org/
+    """
+    event_columns = _Columns()
+    case_columns = _Columns()
+    case_ids = []
+    trace_events = 0
+    stack = []
+    for action, element in iterparse(file_path, events=('start', 'end')):
+        if action == 'start':
+            stack.append(element)
+            continue
+        stack.pop()
+        tag = _local_name(element.tag)
+        parent = _local_name(stack[-1].tag) if stack else None
+        if tag in _XES_TYPES and parent in ('event', 'trace'):
+            key, value = element.get('key'), _xes_value(tag, element.get('value'))
+            if parent == 'event':
+                event_columns.set(XES_COLUMNS.get(key, key), value, tag)
+            else:
+                case_columns.set(EventColumn.CASE_ID.value if key == 'concept:name' else key, value, tag)
+        elif tag == 'event' and parent == 'trace':
+            event_columns.next_row()
+            trace_events += 1
+        elif tag == 'trace':
+            # The case_id of the events is known at the end of the trace
+            if case_columns.get(EventColumn.CASE_ID.value) is None:
+                case_columns.set(EventColumn.CASE_ID.value, str(len(case_columns)), 'string')
+            case_ids.extend([case_columns.get(EventColumn.CASE_ID.value)] * trace_events)
+            case_columns.next_row()
+            trace_events = 0
+        # Remove the element read from the tree
+        if stack and tag != 'log':
+            stack[-1].remove(element)
+    event_log = event_columns.to_frame()
+    event_log.insert(0, EventColumn.CASE_ID.value, pd.Series(case_ids, dtype=object).infer_objects())
+    for column in [EventColumn.ACTIVITY.value, EventColumn.EVENT_TIME.value]:
+        if not (column in event_log.columns):
+            event_log[column] = pd.NaT if column == EventColumn.EVENT_TIME.value else None
+    cases = case_columns.to_frame()
+    if EventColumn.CASE_ID.value in cases.columns:
+        cases[EventColumn.CASE_ID.value] = cases[EventColumn.CASE_ID.value].astype(event_log[EventColumn.CASE_ID.value].dtype)
+    return event_log, cases
+
+
+class _Columns():
+    """Columns of a table built row by row, one list per column.
+
+    A column found after the first row is filled with None for the previous rows.
+    """
+
+    def __init__(self):
+        self.__values = {}
+        self.__types = {}
+        self.__rows = 0
+
+    def __len__(self) -> int:
+        return self.__rows
+
+    def set(self, column: str, value, xes_type: str) -> None:
+        """Set the value of a column in the current row.
+        """
+        if not (column in self.__values):
+            self.__values[column] = [None] * self.__rows
+            self.__types[column] = xes_type
+        values = self.__values[column]
+        if len(values) > self.__rows:
+            values[self.__rows] = value
+        else:
+            values.append(value)
+
+    def get(self, column: str):
+        """Return the value of a column in the current row, None if it is not set.
+        """
+        values = self.__values.get(column, [])
+        return values[self.__rows] if len(values) > self.__rows else None
+
+    def next_row(self) -> None:
+        """Close the current row, the columns without value are None.
+        """
+        self.__rows += 1
+        for values in self.__values.values():
+            if len(values) < self.__rows:
+                values.append(None)
+
+    def to_frame(self) -> pd.DataFrame:
+        """Return the columns as a DataFrame, the dates are converted to UTC without time zone.
+        """
+        columns = {}
+        for column, values in self.__values.items():
+            values = values[:self.__rows]
+            if self.__types[column] == 'date':
+                columns[column] = pd.to_datetime(pd.Series(values, dtype=object), utc=True).dt.tz_localize(None)
+            else:
+                columns[column] = pd.Series(values, dtype=object).infer_objects()
+        return pd.DataFrame(columns, index=np.arange(self.__rows))
+
+
+def _local_name(tag: str) -> str:
+    """Return the tag without the XML namespace.
+    """
+    return tag.rsplit('}', 1)[-1]
+
+
+def _xes_value(xes_type: str, value: str):
+    """Return the value of a XES attribute converted by its type, the string value if it is not valid.
+    """
+    try:
+        return _XES_TYPES[xes_type](value)
+    except (TypeError, ValueError):
+        return value
@@ -11,7 +11,8 @@ setup(name='peppermining',
       long_description="PepperMining is a open source Process Mining platform written in Python.",
       license='MIT',
       long_description_content_type='text/markdown',
-      install_requires=['numpy', 'pandas', 'pydot', 'deepdiff'],
+      install_requires=['numpy', 'pandas', 'pydot'],
+      extras_require={'arrow': ['pyarrow']},
       url='https://github.com/ThoberDetofeno/peppermining',
       project_urls={
           'Bug Tracker': 'https://github.com/ThoberDetofeno/peppermining/issues',
@@ -0,0 +1,85 @@
+import os
+import unittest
+from unittest import mock
+
+import numpy as np
+import pandas as pd
+
+from peppermining import Alignment, PepperMining, ProcessModel
+from peppermining.conformance.alignment import align_trace
+
+DATA = os.path.join(os.path.dirname(__file__), 'data')
+
+
+def brute_force_cost(trace, model, insertion_cost, deletion_cost):
+    """Return the minimum cost over all the alignments of a trace with a process model."""
+    if len(trace) == 0 or len(model) == 0:
+        return len(trace) * deletion_cost + len(model) * insertion_cost
+    costs = [brute_force_cost(trace[1:], model, insertion_cost, deletion_cost) + deletion_cost,
+             brute_force_cost(trace, model[1:], insertion_cost, deletion_cost) + insertion_cost]
+    if trace[0] == model[0]:
+        costs.append(brute_force_cost(trace[1:], model[1:], insertion_cost, deletion_cost))
+    return min(costs)
+
+
+class TestAlignment(unittest.TestCase):
+
+    def process_model(self, activities, model_id=1):
+        model = ProcessModel()
+        model.id = model_id
+        model.set_process_model(pd.DataFrame({'activity': activities, 'sorting': range(1, len(activities) + 1)}))
+        return model
+
+    def models(self):
+        model = pd.read_csv(os.path.join(DATA, 'processmodel-example.csv'), sep=';')
+        # The ProcessModel objects have the same id
+        return [self.process_model(model.activity.tolist()),
+                self.process_model(['register request', 'check ticket', 'decide', 'reject request']),
+                self.process_model(['Unknown'])]
+
+    def pepper_mining(self, n_jobs=1):
+        p = PepperMining(n_jobs=n_jobs)
+        p.read_event_log_csv(os.path.join(DATA, 'eventlog-example.csv'), format_date='%d/%m/%Y %H:%M')
+        return p
+
+    def test_align_trace(self):
+        rng = np.random.default_rng(0)
+        for insertion_cost, deletion_cost in [(1.0, 1.0), (1.0, 2.0), (1.5, 0.5)]:
+            for _ in range(100):
+                trace, model = rng.integers(0, 3, rng.integers(0, 5)), rng.integers(0, 4, rng.integers(0, 5))
+                with self.subTest(trace=trace.tolist(), model=model.tolist(), insertion_cost=insertion_cost, deletion_cost=deletion_cost):
+                    cost, deviations = align_trace(trace, model, insertion_cost, deletion_cost)
+                    self.assertAlmostEqual(cost, brute_force_cost(trace.tolist(), model.tolist(), insertion_cost, deletion_cost))
+                    # The deviations transform the trace into the model with the cost of the alignment
+                    aligned = []
+                    for position in range(len(trace) + 1):
+                        aligned += [expected for at, expected, actual in deviations.tolist() if at == position and actual < 0]
+                        if position < len(trace) and not any(at == position and expected < 0 for at, expected, _ in deviations.tolist()):
+                            aligned.append(trace[position])
+                    self.assertEqual(aligned, model.tolist())
+                    insertions = int((deviations[:, 2] < 0).sum())
+                    self.assertAlmostEqual(cost, insertions * insertion_cost + (len(deviations) - insertions) * deletion_cost)
+
+    def test_models_with_same_id(self):
+        alignment = Alignment(self.pepper_mining(), [ProcessModel()] + self.models())
+        fitness = alignment.get_fitness()
+        self.assertEqual(fitness.columns.tolist(), ['case_id', 'model', 'id', 'cost', 'fitness'])
+        self.assertEqual(sorted(fitness.model.unique().tolist()), [1, 2])
+        self.assertTrue(alignment.get_deviations().model.equals(fitness.model))
+        summary = alignment.get_summary()
+        self.assertEqual(summary.model.tolist(), [1, 2, 3])
+        self.assertEqual(summary.cases.tolist(), [int((fitness.model == model).sum()) for model in [1, 2, 3]])
+        self.assertEqual(summary.fitting_cases.tolist(), [int(((fitness.model == model) & (fitness.fitness == 1)).sum()) for model in [1, 2, 3]])
+
+    def test_parallel_equals_serial(self):
+        serial = Alignment(self.pepper_mining(), self.models())
+        # The example event logs are small, the process pool is used anyway
+        with mock.patch.object(Alignment, 'MIN_PARALLEL_CELLS', 0), self.pepper_mining(n_jobs=2) as p:
+            parallel = Alignment(p, self.models())
+            pd.testing.assert_frame_equal(parallel.get_fitness(), serial.get_fitness())
+            pd.testing.assert_frame_equal(parallel.get_deviations(), serial.get_deviations())
+            pd.testing.assert_frame_equal(parallel.get_summary(), serial.get_summary())
+
+
+if __name__ == '__main__':
+    unittest.main()
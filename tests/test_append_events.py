@@ -0,0 +1,86 @@
+import os
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from peppermining import CaseSizeFilter, PepperMining
+
+DATA = os.path.join(os.path.dirname(__file__), 'data')
+KPI_LIST = ['NumberOfEvents', 'NumberOfActivities', 'NumberOfCases', 'ThroughputTime']
+
+
+class TestAppendEvents(unittest.TestCase):
+
+    def setUp(self):
+        event_log = pd.read_csv(os.path.join(DATA, 'pizza_event.csv'), sep=';')
+        event_log['event_time'] = pd.to_datetime(event_log['event_time'], format='%d/%m/%Y %H:%M')
+        # The appended events are of cases already loaded and of new cases, and an activity is only in the appended events
+        appended = np.random.default_rng(0).random(len(event_log)) < 0.3
+        appended |= (event_log['activity'] == event_log['activity'].value_counts().index[-1]).to_numpy()
+        self.first, self.appended = event_log[~appended], event_log[appended]
+
+    def pepper_minings(self, compact):
+        """Return the event logs loaded at once and the event logs loaded in two steps."""
+        full = PepperMining(compact=compact)
+        full.set_event_log(pd.concat([self.first, self.appended], ignore_index=True))
+        incremental = PepperMining(compact=compact)
+        incremental.set_event_log(self.first.copy())
+        incremental.get_variants()
+        incremental.get_activities()
+        incremental.append_events(self.appended.copy())
+        return incremental, full
+
+    def test_variants(self):
+        for compact in [False, True]:
+            with self.subTest(compact=compact):
+                incremental, full = self.pepper_minings(compact)
+                pd.testing.assert_frame_equal(incremental.get_variants(KPI_LIST), full.get_variants(KPI_LIST))
+
+    def test_summary_and_cases(self):
+        for compact in [False, True]:
+            with self.subTest(compact=compact):
+                incremental, full = self.pepper_minings(compact)
+                pd.testing.assert_frame_equal(incremental.get_summary(KPI_LIST + ['Rework']), full.get_summary(KPI_LIST + ['Rework']))
+                cases = ['NumberOfEvents', 'NumberOfActivities', 'ThroughputTime', 'Rework']
+                pd.testing.assert_frame_equal(incremental.get_cases(cases).sort_values('case_id').reset_index(drop=True).astype({'case_id': str}),
+                                              full.get_cases(cases).sort_values('case_id').reset_index(drop=True).astype({'case_id': str}))
+
+    def test_dfg(self):
+        for compact in [False, True]:
+            with self.subTest(compact=compact):
+                incremental, full = self.pepper_minings(compact)
+                pd.testing.assert_frame_equal(incremental.get_dfg().to_frame().sort_values(['source', 'target']).reset_index(drop=True),
+                                              full.get_dfg().to_frame().sort_values(['source', 'target']).reset_index(drop=True))
+
+    def test_filter_after_append(self):
+        for compact in [False, True]:
+            with self.subTest(compact=compact):
+                p = PepperMining(compact=compact)
+                p.set_event_log(self.first.copy())
+                f = CaseSizeFilter(p, 5, 9)
+                f.get_variants(KPI_LIST)
+                p.append_events(self.appended.copy())
+                full = PepperMining(compact=compact)
+                full.set_event_log(pd.concat([self.first, self.appended], ignore_index=True))
+                pd.testing.assert_frame_equal(f.get_variants(KPI_LIST), CaseSizeFilter(full, 5, 9).get_variants(KPI_LIST))
+                self.assertEqual(len(f.get_event_log()), len(CaseSizeFilter(full, 5, 9).get_event_log()))
+
+    def test_string_timestamps(self):
+        first = pd.DataFrame({'case_id': [1, 1], 'activity': ['A', 'B'], 'event_time': ['13/02/2022 10:00', '28/02/2022 10:00']})
+        # The appended timestamp is a valid month first date, it is parsed with the day first format of the event logs
+        appended = pd.DataFrame({'case_id': [1], 'activity': ['C'], 'event_time': ['01/03/2022 10:00']})
+        for compact in [False, True]:
+            with self.subTest(compact=compact):
+                p = PepperMining(compact=compact)
+                p.set_event_log(first.copy())
+                p.get_variants()
+                p.append_events(appended.copy())
+                self.assertEqual(p.get_event_log()['event_time'].max(), pd.Timestamp('2022-03-01 10:00'))
+                self.assertEqual(p.get_variants()['activities'].tolist(), [['A', 'B', 'C']])
+                edges = p.get_dfg().to_frame().dropna(subset=['source', 'target'])
+                self.assertEqual(list(zip(edges['source'].astype(str), edges['target'].astype(str))), [('A', 'B'), ('B', 'C')])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,47 @@
+import unittest
+
+import pandas as pd
+
+from peppermining import PepperMining, ThroughputTime
+
+
+class TestCaseIndex(unittest.TestCase):
+
+    def setUp(self):
+        self.event_log = pd.DataFrame({'case_id': [1, 1, 2, 2, 1],
+                                       'activity': ['A', 'B', 'A', 'C', 'C'],
+                                       'event_time': pd.to_datetime(['2022-01-01 10:00', '2022-01-01 11:30', '2022-01-02 08:00',
+                                                                     '2022-01-02 09:00', '2022-01-01 13:00'])})
+
+    def pepper_mining(self, event_log, compact):
+        p = PepperMining(compact=compact)
+        p.set_event_log(event_log.copy())
+        return p
+
+    def test_event_time_with_time_zone(self):
+        aware = self.event_log.copy()
+        aware['event_time'] = aware['event_time'].dt.tz_localize('America/Sao_Paulo')
+        for compact in [False, True]:
+            with self.subTest(compact=compact):
+                naive, p = self.pepper_mining(self.event_log, compact), self.pepper_mining(aware, compact)
+                self.assertEqual(p.get_variants()['key'].tolist(), naive.get_variants()['key'].tolist())
+                pd.testing.assert_frame_equal(p.get_cases(['ThroughputTime']), naive.get_cases(['ThroughputTime']))
+                event_log = ThroughputTime(p).get_kpi_event_log()
+                self.assertEqual(event_log['event_time'].dt.tz, aware['event_time'].dt.tz)
+                self.assertEqual(event_log['ThroughputTime'].tolist(), ThroughputTime(naive).get_kpi_event_log()['ThroughputTime'].tolist())
+
+    def test_append_events_with_time_zone(self):
+        aware = self.event_log.copy()
+        aware['event_time'] = aware['event_time'].dt.tz_localize('UTC')
+        for compact in [False, True]:
+            with self.subTest(compact=compact):
+                p = self.pepper_mining(aware.iloc[:3], compact)
+                p.append_events(aware.iloc[3:].copy())
+                full = self.pepper_mining(aware, compact)
+                self.assertEqual(p.get_variants()['key'].tolist(), full.get_variants()['key'].tolist())
+                self.assertEqual(p.get_cases(['ThroughputTime'])['ThroughputTime'].tolist(),
+                                 full.get_cases(['ThroughputTime'])['ThroughputTime'].tolist())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,55 @@
+import importlib.util
+import os
+import unittest
+
+import pandas as pd
+
+from peppermining import Conformance, PepperMining, ProcessModel
+
+DATA = os.path.join(os.path.dirname(__file__), 'data')
+HAS_DEEPDIFF = importlib.util.find_spec('deepdiff') is not None
+
+
+class TestConformance(unittest.TestCase):
+
+    def setUp(self):
+        self.event_log = pd.DataFrame({'case_id': [1, 1, 1, 2, 2, 3, 3, 3, 3, 4, 4, 4],
+                                       'activity': ['A', 'B', 'C', 'B', 'C', 'A', 'X', 'C', 'D', 'C', 'B', 'A'],
+                                       'event_time': pd.date_range('2022-01-01', periods=12, freq='H')})
+
+    def process_model(self, activities):
+        model = ProcessModel()
+        model.set_process_model(pd.DataFrame({'activity': activities, 'sorting': range(1, len(activities) + 1)}))
+        return model
+
+    def test_diagnostics(self):
+        expected = {1: {},
+                    2: {'iterable_item_added': {'root[0]': 'A'}},
+                    3: {'values_changed': {'root[1]': {'new_value': 'B', 'old_value': 'X'}}, 'iterable_item_removed': {'root[3]': 'D'}},
+                    4: {'values_changed': {'root[0]': {'new_value': 'A', 'old_value': 'C'}, 'root[2]': {'new_value': 'C', 'old_value': 'A'}}}}
+        for compact in [False, True]:
+            with self.subTest(compact=compact):
+                p = PepperMining(compact=compact)
+                p.set_event_log(self.event_log.copy())
+                c = Conformance(p, self.process_model(['A', 'B', 'C']))
+                diagnostics = c.diagnostics()
+                self.assertEqual(dict(zip(diagnostics.case_id.tolist(), diagnostics.diagnostic.tolist())), expected)
+                self.assertEqual(c.get_cases().case_id.tolist(), [1])
+
+    @unittest.skipUnless(HAS_DEEPDIFF, 'deepdiff is not installed')
+    def test_diagnostics_equal_deepdiff(self):
+        from deepdiff import DeepDiff
+        model = pd.read_csv(os.path.join(DATA, 'processmodel-example.csv'), sep=';')
+        for compact in [False, True]:
+            p = PepperMining(compact=compact)
+            p.read_event_log_csv(os.path.join(DATA, 'eventlog-example.csv'), format_date='%d/%m/%Y %H:%M')
+            traces = p.get_event_log().groupby('case_id', observed=True)['activity'].apply(lambda activity: activity.astype(str).tolist())
+            for activities in [model.activity.tolist(), model.activity.tolist()[::-1] + ['Unknown'], traces.iloc[0][1:]]:
+                with self.subTest(compact=compact, model=activities):
+                    diagnostics = Conformance(p, self.process_model(activities)).diagnostics()
+                    for case_id, diagnostic in zip(diagnostics.case_id.tolist(), diagnostics.diagnostic.tolist()):
+                        self.assertEqual(diagnostic, DeepDiff(traces[case_id], activities).to_dict())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,54 @@
+import os
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from peppermining import CaseSizeFilter, PepperMining
+
+DATA = os.path.join(os.path.dirname(__file__), 'data')
+
+
+class TestDFG(unittest.TestCase):
+
+    def pepper_mining(self, file_name, compact):
+        p = PepperMining(compact=compact)
+        p.read_event_log_csv(os.path.join(DATA, file_name), separator=';', format_date='%d/%m/%Y %H:%M')
+        return p
+
+    def expected_edges(self, event_log):
+        """Return the edges of an event log computed with a pandas groupby."""
+        df = event_log.astype({'case_id': object, 'activity': object}).sort_values(['case_id', 'event_time'], kind='stable')
+        df['target'] = df.groupby('case_id')['activity'].shift(-1)
+        df['duration'] = (df.groupby('case_id')['event_time'].shift(-1) - df['event_time']).dt.seconds.fillna(0)
+        starts = df.groupby('case_id').head(1).assign(target=df.groupby('case_id').head(1)['activity'], activity=None, duration=np.nan)
+        edges = pd.concat([starts, df]).fillna({'activity': 'START', 'target': 'END'})
+        return edges.groupby(['activity', 'target']).agg(frequency=('case_id', 'size'), case_count=('case_id', 'nunique'),
+                                                           min=('duration', 'min'), max=('duration', 'max'),
+                                                           mean=('duration', 'mean'), sum=('duration', 'sum'))
+
+    def assert_dfg(self, data):
+        expected = self.expected_edges(data.get_event_log())
+        result = data.get_dfg().to_frame().fillna({'source': 'START', 'target': 'END'}).set_index(['source', 'target'])
+        result = result.rename_axis(['activity', 'target']).reindex(expected.index)
+        np.testing.assert_array_equal(result['frequency'], expected['frequency'])
+        np.testing.assert_array_equal(result['case_count'], expected['case_count'])
+        for statistic in ['min', 'max', 'mean', 'sum']:
+            np.testing.assert_allclose(result[statistic].astype(float), expected[statistic].astype(float), equal_nan=True)
+
+    def test_edges(self):
+        for file_name in ['eventlog-example.csv', 'pizza_event.csv']:
+            for compact in [False, True]:
+                with self.subTest(file_name=file_name, compact=compact):
+                    p = self.pepper_mining(file_name, compact)
+                    self.assertEqual(len(p.get_dfg()), len(self.expected_edges(p.get_event_log())))
+                    self.assert_dfg(p)
+
+    def test_edges_of_filter(self):
+        for compact in [False, True]:
+            with self.subTest(compact=compact):
+                self.assert_dfg(CaseSizeFilter(self.pepper_mining('pizza_event.csv', compact), 5, 9))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,82 @@
+import unittest
+
+import pandas as pd
+
+from peppermining import NumberOfActivities, NumberOfEvents, PepperMining, ThroughputTime
+
+
+class TestMissingActivity(unittest.TestCase):
+
+    def setUp(self):
+        self.event_log = pd.DataFrame({'case_id': [1, 1, 1, 2, 2],
+                                       'activity': ['A', None, 'B', 'A', 'B'],
+                                       'event_time': pd.to_datetime(['2022-01-01 10:00', '2022-01-01 11:00', '2022-01-01 12:00',
+                                                                     '2022-01-01 10:00', '2022-01-01 11:00'])})
+
+    def pepper_mining(self, compact):
+        p = PepperMining(compact=compact)
+        p.set_event_log(self.event_log.copy())
+        return p
+
+    def test_activity_dictionary(self):
+        for compact in [False, True]:
+            with self.subTest(compact=compact):
+                p = self.pepper_mining(compact)
+                self.assertEqual(p.get_activity_dictionary().tolist(), ['A', 'B'])
+
+    def test_variants(self):
+        for compact in [False, True]:
+            with self.subTest(compact=compact):
+                variants = self.pepper_mining(compact).get_variants(['NumberOfCases'])
+                self.assertEqual(variants['key'].tolist(), ['A->B'])
+                self.assertEqual(variants['cases'].tolist(), [[1, 2]])
+
+    def test_rework(self):
+        for compact in [False, True]:
+            with self.subTest(compact=compact):
+                p = self.pepper_mining(compact)
+                self.assertEqual(p.get_cases(['Rework'])['Rework'].tolist(), [0, 0])
+                self.assertEqual(p.get_summary(['Rework']).loc['Rework', 'Value'], 0)
+
+    def test_activity_and_case_kpis(self):
+        for compact in [False, True]:
+            with self.subTest(compact=compact):
+                p = self.pepper_mining(compact)
+                activities = p.get_activities(['NumberOfEvents', 'NumberOfCases', 'ThroughputTime', 'Rework'])
+                self.assertEqual(activities['activity'].astype(str).tolist(), ['A', 'B'])
+                self.assertEqual(activities['NumberOfEvents'].tolist(), [2, 2])
+                self.assertEqual(activities['NumberOfCases'].tolist(), [2, 2])
+                cases = p.get_cases(['NumberOfEvents', 'NumberOfActivities'])
+                self.assertEqual(cases['NumberOfEvents'].tolist(), [3, 2])
+                self.assertEqual(cases['NumberOfActivities'].tolist(), [2, 2])
+                summary = p.get_summary(['NumberOfEvents', 'NumberOfActivities'])
+                self.assertEqual(summary.loc['NumberOfEvents', 'Value'], 5)
+                self.assertEqual(summary.loc['NumberOfActivities', 'Value'], 2)
+                # The appended events without activity are not an activity
+                p.append_events(pd.DataFrame({'case_id': [2, 3], 'activity': [None, 'C'],
+                                              'event_time': pd.to_datetime(['2022-01-01 12:00', '2022-01-01 13:00'])}))
+                self.assertEqual(p.get_activities(['NumberOfCases'])['activity'].astype(str).tolist(), ['A', 'B', 'C'])
+
+    def test_variant_kpis(self):
+        # The case 3 has not activities, so it has not a variant
+        event_log = pd.DataFrame({'case_id': [1, 1, 1, 2, 2, 3], 'activity': ['A', None, 'B', 'A', 'C', None],
+                                  'event_time': pd.date_range('2022-01-01 10:00', periods=6, freq='10min')})
+        for compact in [False, True]:
+            with self.subTest(compact=compact):
+                p = PepperMining(compact=compact)
+                p.set_event_log(event_log.copy())
+                variants = p.get_variants(['NumberOfEvents', 'NumberOfActivities', 'NumberOfCases', 'ThroughputTime'])
+                self.assertEqual(variants['key'].tolist(), ['A->B', 'A->C'])
+                self.assertEqual(variants['NumberOfEvents'].tolist(), [3, 2])
+                self.assertEqual(variants['NumberOfActivities'].tolist(), [2, 2])
+                self.assertEqual(variants['NumberOfCases'].tolist(), [1, 1])
+                cases = p.get_cases(['ThroughputTime'])
+                throughput_time = dict(zip(cases['case_id'].astype(int), cases['ThroughputTime']))
+                self.assertEqual(variants['ThroughputTimeSum'].tolist(), [throughput_time[1], throughput_time[2]])
+                self.assertEqual(NumberOfActivities(p).get_kpi_variants()['NumberOfActivities'].tolist(), [2, 2])
+                self.assertEqual(NumberOfEvents(p).get_kpi_variants()['NumberOfEvents'].tolist(), [3, 2])
+                self.assertEqual(ThroughputTime(p).get_kpi_variants()['ThroughputTimeSum'].tolist(), [throughput_time[1], throughput_time[2]])
+
+
+if __name__ == '__main__':
+    unittest.main()
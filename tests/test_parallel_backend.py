@@ -0,0 +1,54 @@
+import os
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from peppermining import CaseSizeFilter, PepperMining, ThroughputTime
+
+DATA = os.path.join(os.path.dirname(__file__), 'data')
+
+
+class TestParallelBackend(unittest.TestCase):
+
+    def pepper_mining(self, compact, n_jobs):
+        p = PepperMining(compact=compact, kpi_cache_size=0, n_jobs=n_jobs)
+        p.read_event_log_csv(os.path.join(DATA, 'pizza_event.csv'), separator=';', format_date='%d/%m/%Y %H:%M')
+        if p.kpi_backend is not None:
+            # The example event logs are small, the process pool is used anyway
+            p.kpi_backend.min_events = 0
+        return p
+
+    def assert_frame_close(self, result, expected):
+        self.assertTrue(result.columns.equals(expected.columns))
+        self.assertTrue(result.dtypes.equals(expected.dtypes))
+        for column in expected.columns:
+            if pd.api.types.is_numeric_dtype(expected[column]):
+                np.testing.assert_allclose(result[column].astype(float), expected[column].astype(float), equal_nan=True)
+            else:
+                self.assertEqual(result[column].astype(str).tolist(), expected[column].astype(str).tolist())
+
+    def test_parallel_equals_serial(self):
+        functions = [lambda p: p.get_cases(['NumberOfEvents', 'NumberOfActivities', 'ThroughputTime', 'Rework']),
+                     lambda p: p.get_activities(['NumberOfEvents', 'NumberOfCases', 'ThroughputTime', 'Rework']),
+                     lambda p: p.get_summary(['NumberOfEvents', 'NumberOfActivities', 'ThroughputTime', 'Rework']),
+                     lambda p: p.get_variants(['NumberOfActivities', 'ThroughputTime']),
+                     lambda p: ThroughputTime(p).get_kpi_activities()]
+        for compact in [False, True]:
+            with self.subTest(compact=compact), self.pepper_mining(compact, 2) as parallel:
+                serial = self.pepper_mining(compact, 1)
+                for function in functions:
+                    self.assert_frame_close(function(parallel), function(serial))
+                    self.assert_frame_close(function(CaseSizeFilter(parallel, 5, 9)), function(CaseSizeFilter(serial, 5, 9)))
+
+    def test_close(self):
+        with self.pepper_mining(False, 2) as p:
+            p.get_cases(['Rework'])
+        p.close()
+        # The pool is created again after the close
+        self.assertEqual(p.get_cases(['Rework'])['Rework'].sum(), p.get_summary(['Rework']).loc['Rework', 'Value'])
+        p.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
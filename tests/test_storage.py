@@ -0,0 +1,58 @@
+import importlib.util
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+import numpy as np
+import pandas as pd
+
+from peppermining import CaseSizeFilter, PepperMining
+from peppermining.utils.storage import write_metadata
+
+DATA = os.path.join(os.path.dirname(__file__), 'data')
+HAS_PYARROW = importlib.util.find_spec('pyarrow') is not None
+
+
+class TestStorage(unittest.TestCase):
+
+    def pepper_mining(self, compact):
+        p = PepperMining(compact=compact)
+        p.read_event_log_csv(os.path.join(DATA, 'pizza_event.csv'), separator=';', format_date='%d/%m/%Y %H:%M')
+        p.read_cases_csv(os.path.join(DATA, 'pizza_case.csv'), separator=';')
+        return p
+
+    @unittest.skipUnless(HAS_PYARROW, 'pyarrow is not installed')
+    def test_save_load(self):
+        kpi_list = ['NumberOfEvents', 'NumberOfActivities', 'NumberOfCases', 'ThroughputTime']
+        for compact in [False, True]:
+            with self.subTest(compact=compact), tempfile.TemporaryDirectory() as path:
+                p = self.pepper_mining(compact)
+                p.get_variants()
+                p.save(path)
+                loaded = PepperMining.load(path)
+                self.assertEqual(loaded.compact, compact)
+                pd.testing.assert_frame_equal(loaded.get_event_log(), p.get_event_log())
+                pd.testing.assert_frame_equal(loaded.get_cases(), p.get_cases())
+                self.assertTrue(loaded.get_activity_dictionary().equals(p.get_activity_dictionary()))
+                if compact:
+                    self.assertEqual(loaded.get_event_log()['activity'].dtype, p.get_event_log()['activity'].dtype)
+                    self.assertEqual(loaded.get_event_log()['case_id'].dtype, p.get_event_log()['case_id'].dtype)
+                pd.testing.assert_frame_equal(loaded.get_variants(kpi_list), p.get_variants(kpi_list))
+                pd.testing.assert_frame_equal(loaded.get_summary(kpi_list + ['Rework']), p.get_summary(kpi_list + ['Rework']))
+                pd.testing.assert_frame_equal(CaseSizeFilter(loaded, 5, 9).get_variants(kpi_list), CaseSizeFilter(p, 5, 9).get_variants(kpi_list))
+                for name in p.case_index.EVENT_ARRAYS + p.case_index.CASE_ARRAYS:
+                    np.testing.assert_array_equal(getattr(loaded.case_index, name), getattr(p.case_index, name))
+
+    def test_save_without_pyarrow(self):
+        p = self.pepper_mining(False)
+        with tempfile.TemporaryDirectory() as path, mock.patch.dict('sys.modules', {'pyarrow': None, 'pyarrow.ipc': None}):
+            with self.assertRaisesRegex(ImportError, 'pyarrow package is required'):
+                p.save(path)
+            write_metadata({'compact': False}, os.path.join(path, 'metadata.json'))
+            with self.assertRaisesRegex(ImportError, 'pyarrow package is required'):
+                PepperMining.load(path)
+
+
+if __name__ == '__main__':
+    unittest.main()
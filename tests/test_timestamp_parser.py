@@ -0,0 +1,40 @@
+import os
+import tempfile
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from peppermining import PepperMining
+from peppermining.utils.timestamp_parser import TimestampParser
+
+
+class TestTimestampParser(unittest.TestCase):
+
+    def test_infer_format_out_of_sample(self):
+        uniques = np.array(['01/02/2022', '02/02/2022', '13/02/2022', '03/02/2022', '04/02/2022'], dtype=object)
+        self.assertEqual(TimestampParser(sample_size=2).infer_format(uniques), '%d/%m/%Y')
+
+    def test_invalid_rows(self):
+        values = pd.Series(['2022-02-01 10:00:00', 'invalid', '2022-02-02 10:00:00'])
+        with self.assertRaisesRegex(TypeError, "row 1: 'invalid'"):
+            TimestampParser('%Y-%m-%d %H:%M:%S').parse(values)
+
+    def test_read_chunks_infer_format(self):
+        # The first chunk has only days lower than 13, the day first format is found in the last chunk
+        event_log = pd.DataFrame({'case_id': [1, 1, 2, 2],
+                                  'activity': ['A', 'B', 'A', 'B'],
+                                  'event_time': ['01/02/2022 10:00', '02/02/2022 10:00', '03/02/2022 10:00', '25/02/2022 10:00']})
+        with tempfile.TemporaryDirectory() as path:
+            file_path = os.path.join(path, 'eventlog.csv')
+            event_log.to_csv(file_path, sep=';', index=False)
+            for compact in [False, True]:
+                with self.subTest(compact=compact):
+                    p = PepperMining(compact=compact)
+                    p.read_event_log_csv(file_path, chunksize=2)
+                    expected = pd.to_datetime(event_log['event_time'], format='%d/%m/%Y %H:%M')
+                    pd.testing.assert_series_equal(p.get_event_log()['event_time'], expected)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,66 @@
+import os
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from peppermining import PepperMining
+
+DATA = os.path.join(os.path.dirname(__file__), 'data')
+
+
+class TestVariantTrie(unittest.TestCase):
+
+    def pepper_mining(self, file_name, compact):
+        p = PepperMining(compact=compact)
+        p.read_event_log_csv(os.path.join(DATA, file_name), separator=';', format_date='%d/%m/%Y %H:%M')
+        return p
+
+    def traces(self, p):
+        """Return the trace and the elapsed seconds of each event of each case, by brute force over the sorted event logs."""
+        df = p.get_event_log().astype({'case_id': object, 'activity': object}).sort_values(['case_id', 'event_time'], kind='stable')
+        df['elapsed'] = (df['event_time'] - df.groupby('case_id')['event_time'].transform('min')).dt.total_seconds()
+        return {case: (group['activity'].tolist(), group['elapsed'].tolist()) for case, group in df.groupby('case_id')}
+
+    def test_variants(self):
+        for file_name in ['eventlog-example.csv', 'pizza_event.csv']:
+            for compact in [False, True]:
+                with self.subTest(file_name=file_name, compact=compact):
+                    p = self.pepper_mining(file_name, compact)
+                    pd.testing.assert_frame_equal(p.get_variant_trie().to_frame(), p.get_variants())
+
+    def test_prefix_counts_and_cases(self):
+        for file_name in ['eventlog-example.csv', 'pizza_event.csv']:
+            for compact in [False, True]:
+                with self.subTest(file_name=file_name, compact=compact):
+                    p = self.pepper_mining(file_name, compact)
+                    trie, traces = p.get_variant_trie(), self.traces(p)
+                    for node in range(len(trie)):
+                        prefix = trie.trace_activities(node)
+                        cases = sorted(case for case, (trace, _) in traces.items() if trace[:len(prefix)] == prefix)
+                        self.assertEqual(trie.prefix_count[node], len(cases))
+                        self.assertEqual(trie.count_with_prefix(prefix), len(cases))
+                        self.assertEqual(sorted(trie.cases_with_prefix(prefix)), cases)
+                        self.assertEqual(trie.case_count[node], sum(trace == prefix for trace, _ in traces.values()))
+
+    def test_duration_statistics(self):
+        for file_name in ['eventlog-example.csv', 'pizza_event.csv']:
+            for compact in [False, True]:
+                with self.subTest(file_name=file_name, compact=compact):
+                    p = self.pepper_mining(file_name, compact)
+                    trie, traces = p.get_variant_trie(), self.traces(p)
+                    statistics = trie.node_statistics()
+                    for node in range(1, len(trie)):
+                        prefix = trie.trace_activities(node)
+                        durations = [elapsed[-1] for trace, elapsed in traces.values() if trace == prefix]
+                        prefix_durations = [elapsed[len(prefix) - 1] for trace, elapsed in traces.values() if trace[:len(prefix)] == prefix]
+                        for statistic, function in [('min', np.min), ('max', np.max), ('mean', np.mean), ('sum', np.sum)]:
+                            if durations:
+                                self.assertAlmostEqual(statistics.loc[node, 'duration_' + statistic], function(durations))
+                            else:
+                                self.assertTrue(np.isnan(statistics.loc[node, 'duration_' + statistic]))
+                            self.assertAlmostEqual(statistics.loc[node, 'prefix_duration_' + statistic], function(prefix_durations))
+
+
+if __name__ == '__main__':
+    unittest.main()
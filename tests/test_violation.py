@@ -0,0 +1,34 @@
+import os
+import unittest
+
+from peppermining import PepperMining, ProcessModel, UndesiredActivity
+
+DATA = os.path.join(os.path.dirname(__file__), 'data')
+
+
+class TestViolation(unittest.TestCase):
+
+    def setUp(self):
+        self.pepper_mining = PepperMining()
+        self.pepper_mining.read_event_log_csv(os.path.join(DATA, 'eventlog-example.csv'), format_date='%d/%m/%Y %H:%M')
+        self.model = ProcessModel()
+        self.model.read_process_model_csv(os.path.join(DATA, 'processmodel-example.csv'))
+
+    def test_add_violation_after_detection(self):
+        violation = UndesiredActivity(self.pepper_mining, self.model)
+        detected = violation.get_violation()
+        violation.add_violation('manual violation', ['decide'], [1, 2])
+        violation.add_violation('empty violation', None, [])
+        result = violation.get_violation()
+        # The last violation added is the first row
+        self.assertEqual(result.name.tolist(), ['empty violation', 'manual violation'] + detected.name.tolist())
+        self.assertEqual(result.cases.tolist(), [[], [1, 2]] + detected.cases.tolist())
+        self.assertEqual(result.index.tolist(), list(range(len(detected) + 2)))
+        kpi = violation.get_violation(['NumberOfCases'])
+        self.assertEqual(kpi.NumberOfCases.tolist()[1:], [len(cases) for cases in result.cases.tolist()[1:]])
+        # The violations are added once
+        self.assertEqual(len(violation.get_violation()), len(detected) + 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
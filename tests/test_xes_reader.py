@@ -0,0 +1,48 @@
+import os
+import unittest
+
+import pandas as pd
+
+from peppermining import PepperMining
+
+DATA = os.path.join(os.path.dirname(__file__), 'data')
+KPI_LIST = ['NumberOfEvents', 'NumberOfActivities', 'NumberOfCases', 'AverageEventsPerCase', 'ThroughputTime', 'Rework']
+
+
+class TestXesReader(unittest.TestCase):
+
+    def pepper_minings(self, compact):
+        """Return the example event log read from the XES file and from the equivalent CSV file."""
+        xes = PepperMining(compact=compact)
+        xes.read_event_log_xes(os.path.join(DATA, 'eventlog-example.xes'))
+        csv = PepperMining(compact=compact)
+        csv.read_event_log_csv(os.path.join(DATA, 'eventlog-example.csv'), separator=';', format_date='%d/%m/%Y %H:%M')
+        csv.read_cases_csv(os.path.join(DATA, 'case-example.csv'), separator=';')
+        return xes, csv
+
+    def test_event_log(self):
+        for compact in [False, True]:
+            with self.subTest(compact=compact):
+                xes, csv = self.pepper_minings(compact)
+                columns = ['case_id', 'activity', 'event_time', 'user']
+                expected = csv.get_event_log()[columns].astype({'case_id': str, 'activity': str})
+                pd.testing.assert_frame_equal(xes.get_event_log()[columns].astype({'case_id': str, 'activity': str}), expected)
+                self.assertEqual(xes.get_cases()['product'].tolist(), csv.get_cases()['product'].tolist())
+
+    def test_variants(self):
+        for compact in [False, True]:
+            with self.subTest(compact=compact):
+                xes, csv = self.pepper_minings(compact)
+                variants, expected = xes.get_variants(KPI_LIST[:3]), csv.get_variants(KPI_LIST[:3])
+                pd.testing.assert_frame_equal(variants.drop(columns='cases'), expected.drop(columns='cases'))
+                self.assertEqual(variants['cases'].tolist(), [[str(case) for case in cases] for cases in expected['cases']])
+
+    def test_summary(self):
+        for compact in [False, True]:
+            with self.subTest(compact=compact):
+                xes, csv = self.pepper_minings(compact)
+                pd.testing.assert_frame_equal(xes.get_summary(KPI_LIST), csv.get_summary(KPI_LIST))
+
+
+if __name__ == '__main__':
+    unittest.main()